@@ -1,17 +1,36 @@
+from typing import Optional
+
 from fastapi import HTTPException, status
-from database.autoawake_db import Database
+from database.autoawake_async_db import AsyncDatabase
+from database.autoawake_db import Database, PoolTimeoutError
 from services.auth_service import AuthService
 
 
 class AuthController:
-    def __init__(self, db: Database):
-        self.auth_service = AuthService(db)
+    def __init__(self, db: Database, async_db: Optional[AsyncDatabase] = None):
+        self.auth_service = AuthService(db, async_db)
 
     def login(self, email: str, password: str):
         try:
             return self.auth_service.login(email, password)
         except HTTPException as e:
             raise e
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            print(f"Error in login: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal Server Error"
+            )
+
+    async def login_async(self, email: str, password: str):
+        try:
+            return await self.auth_service.login_async(email, password)
+        except HTTPException as e:
+            raise e
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             print(f"Error in login: {e}")
             raise HTTPException(
@@ -24,6 +43,8 @@ class AuthController:
             return self.auth_service.register(name, email, password, role_name)
         except HTTPException as e:
             raise e
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             print(f"Error in register: {e}")
             raise HTTPException(
@@ -36,6 +57,8 @@ class AuthController:
             return self.auth_service.logout(token)
         except HTTPException as e:
             raise e
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             print(f"Error in logout: {e}")
             raise HTTPException(
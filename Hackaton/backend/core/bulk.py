@@ -0,0 +1,81 @@
+"""
+Request handling shared by the bulk import endpoints (POST /drivers/bulk,
+/vehicles/bulk, /assignments/bulk): the body is either a JSON array of
+objects or CSV with a header row, picked by Content-Type. The import runs
+in the threadpool, since it issues blocking queries.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, List, Type
+
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from database.autoawake_db import Database, PoolTimeoutError
+from services.bulk_import_service import BulkValidationError
+
+CSV_TYPES = ("text/csv", "application/csv")
+
+
+def bulk_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """openapi_extra documenting both accepted bodies for `model` rows."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": model.model_json_schema()}},
+                "text/csv": {"schema": {"type": "string", "description": "CSV con fila de encabezados"}},
+            },
+        }
+    }
+
+
+def parse_rows(body: bytes, content_type: str) -> List[Any]:
+    media_type = content_type.split(";")[0].strip().lower()
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be UTF-8") from e
+    if media_type in CSV_TYPES:
+        try:
+            return list(csv.DictReader(io.StringIO(text)))
+        except csv.Error as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid CSV: {e}") from e
+    if media_type in ("", "application/json"):
+        try:
+            rows = json.loads(text)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON: {e}") from e
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array of rows")
+        return rows
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Use application/json (array of objects) or text/csv",
+    )
+
+
+async def run_bulk_import(
+    request: Request,
+    importer: Callable[[Database, List[Any], bool], Dict[str, Any]],
+    db: Database,
+    dry_run: bool,
+) -> Dict[str, Any]:
+    rows = parse_rows(await request.body(), request.headers.get("content-type", ""))
+    try:
+        return await run_in_threadpool(importer, db, rows, dry_run)
+    except BulkValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": str(e), "errors": e.errors},
+        ) from e
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    except PoolTimeoutError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
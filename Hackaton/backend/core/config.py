@@ -17,6 +17,17 @@ class Settings:
     db_user: str = os.getenv("DB_USER", "autoawake_user")
     db_pass: str = os.getenv("DB_PASS", "super_secret")
     db_name: str = os.getenv("DB_NAME", "AutoAwakeAI")
+    db_async_pool_size: int = int(os.getenv("DB_ASYNC_POOL_SIZE", "20"))
+    # Pools mysql-connector separados por carga: API (lecturas de las rutas)
+    # e ingesta (MQTT, BPM y jobs de mantenimiento); máximo 32 cada uno
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    db_ingest_pool_size: int = int(os.getenv("DB_INGEST_POOL_SIZE", "4"))
+    db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "5"))
+    # Réplicas de lectura del pool de la API ("host:puerto" separados por coma)
+    db_replicas: List[str] = field(default_factory=lambda: _split_csv(os.getenv("DB_REPLICAS", "")))
+    db_replica_max_lag_seconds: float = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "10"))
+    db_replica_check_seconds: float = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "5"))
+    db_replica_sticky_seconds: float = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "2"))
 
     # Auth
     auth_disable: bool = os.getenv("DISABLE_AUTH", "").lower() in ("1", "true", "yes")
@@ -28,10 +39,67 @@ class Settings:
     mqtt_password: str | None = os.getenv("MQTT_PASSWORD")
     mqtt_topic_alerts: str = os.getenv("MQTT_TOPIC_ALERTS", "autoawake/alerts")
     mqtt_topic_control: str = os.getenv("MQTT_TOPIC_CONTROL", "autoawake/control")
+    mqtt_topic_bpm: str = os.getenv("MQTT_TOPIC_BPM", "autoawake/bpm")
 
     # Telegram
     telegram_bot_token: str | None = os.getenv("TELEGRAM_BOT_TOKEN")
     telegram_chat_id: str | None = os.getenv("TELEGRAM_CHAT_ID")
+    # Base de la Bot API; se cambia para apuntar a un stand-in (tests/load_fleet.py)
+    telegram_api_url: str = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+
+    # Fleet state (estado en memoria para dashboards)
+    fleet_state_window_minutes: int = int(os.getenv("FLEET_STATE_WINDOW_MINUTES", "60"))
+    fleet_state_resync_seconds: int = int(os.getenv("FLEET_STATE_RESYNC_SECONDS", "300"))
+
+    # Índice en memoria de conductores/vehículos (resolución de alertas TRIP)
+    reference_index_resync_seconds: int = int(os.getenv("REFERENCE_INDEX_RESYNC_SECONDS", "300"))
+
+    # Live events (SSE /events/stream)
+    events_client_queue_size: int = int(os.getenv("EVENTS_CLIENT_QUEUE_SIZE", "256"))
+    events_replay_size: int = int(os.getenv("EVENTS_REPLAY_SIZE", "1000"))
+    events_heartbeat_seconds: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+    # Alert rollups (job incremental para /reports)
+    alert_rollup_interval_seconds: float = float(os.getenv("ALERT_ROLLUP_INTERVAL_SECONDS", "60"))
+    alert_rollup_batch_size: int = int(os.getenv("ALERT_ROLLUP_BATCH_SIZE", "5000"))
+    alert_rollup_lag_seconds: int = int(os.getenv("ALERT_ROLLUP_LAG_SECONDS", "5"))
+    alert_rollup_rescan_ids: int = int(os.getenv("ALERT_ROLLUP_RESCAN_IDS", "10000"))
+
+    # Alerts partitioning (particiones mensuales + archivo)
+    alerts_partition_months_ahead: int = int(os.getenv("ALERTS_PARTITION_MONTHS_AHEAD", "3"))
+    alerts_partition_interval_hours: float = float(os.getenv("ALERTS_PARTITION_INTERVAL_HOURS", "24"))
+    # 0 = conservar todo el historial
+    alerts_retention_months: int = int(os.getenv("ALERTS_RETENTION_MONTHS", "0"))
+    # exchange = mover el mes a alerts_archive_YYYYMM; parquet = exportarlo
+    # a almacenamiento frío (COLD_STORAGE_DIR) y borrarlo; drop = borrarlo
+    alerts_archive_mode: str = os.getenv("ALERTS_ARCHIVE_MODE", "exchange").lower()
+
+    # Cold storage (Parquet por mes / vehículo)
+    cold_storage_dir: str = os.getenv("COLD_STORAGE_DIR", "data/cold_alerts")
+    cold_storage_compression: str = os.getenv("COLD_STORAGE_COMPRESSION", "zstd")
+
+    # BPM (telemetría del reloj, bpm_samples / bpm_minute)
+    bpm_flush_seconds: float = float(os.getenv("BPM_FLUSH_SECONDS", "2"))
+    bpm_batch_size: int = int(os.getenv("BPM_BATCH_SIZE", "500"))
+    bpm_buffer_max: int = int(os.getenv("BPM_BUFFER_MAX", "20000"))
+    bpm_raw_retention_hours: int = int(os.getenv("BPM_RAW_RETENTION_HOURS", "72"))
+    bpm_purge_interval_minutes: float = float(os.getenv("BPM_PURGE_INTERVAL_MINUTES", "60"))
+
+    # Dashboard (/dashboard/overview)
+    dashboard_cache_seconds: float = float(os.getenv("DASHBOARD_CACHE_SECONDS", "5"))
+
+    # Listados: con true serializa filas de la BD con orjson sin validar cada fila con pydantic (opt-in)
+    fast_json_responses: bool = os.getenv("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+    # ETag de datos de referencia: el token rota cada N segundos (0 = sólo cambia al escribir)
+    reference_etag_max_age_seconds: float = float(os.getenv("REFERENCE_ETAG_MAX_AGE_SECONDS", "300"))
+
+    # Lotes de alertas (POST /alerts/batch y payloads con lista en MQTT)
+    alert_batch_max_items: int = int(os.getenv("ALERT_BATCH_MAX_ITEMS", "500"))
+
+    # Importación masiva (POST /drivers/bulk, /vehicles/bulk, /assignments/bulk)
+    bulk_import_chunk_size: int = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "1000"))
+    bulk_import_max_rows: int = int(os.getenv("BULK_IMPORT_MAX_ROWS", "50000"))
 
     # API
     cors_origins: List[str] = field(
@@ -1,27 +1,68 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from core.config import settings
-from database.autoawake_db import Database, get_active_session
+from database.autoawake_db import Database, DBConfig, collection_versions, write_scope
+from database.autoawake_async_db import AsyncDatabase, get_active_session
+
+# Singleton DB instance for the API routes (mysql-connector pool inside)
+db_instance = Database(DBConfig(
+    pool_name="autoawake_api",
+    pool_size=settings.db_pool_size,
+    pool_timeout=settings.db_pool_timeout_seconds,
+    replicas=settings.db_replicas,
+    replica_max_lag=settings.db_replica_max_lag_seconds,
+    replica_check_interval=settings.db_replica_check_seconds,
+    replica_sticky_seconds=settings.db_replica_sticky_seconds,
+))
+
+# Separate pool for ingest writes (MQTT, BPM writer, rollup/partition jobs),
+# so an ingest burst can't starve the API and vice versa
+ingest_db_instance = Database(DBConfig(
+    pool_name="autoawake_ingest",
+    pool_size=settings.db_ingest_pool_size,
+    pool_timeout=settings.db_pool_timeout_seconds,
+))
+
+# Reference-data ETags rotate after this many seconds (see CollectionVersions)
+collection_versions.max_age = settings.reference_etag_max_age_seconds
 
-# Singleton DB instance (mysql-connector pool inside)
-db_instance = Database()
+# Singleton async DB instance (aiomysql pool, connected in the app lifespan)
+async_db_instance = AsyncDatabase(DBConfig(pool_size=settings.db_async_pool_size))
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware: each HTTP request gets its own write_scope, so
+    after a write the rest of that request reads from the primary, no matter
+    which threadpool thread runs the endpoint or the dependencies.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with write_scope():
+            await self.app(scope, receive, send)
 
 
 def get_db() -> Database:
     return db_instance
 
 
+def get_async_db() -> AsyncDatabase:
+    return async_db_instance
+
+
 security_scheme = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
-    db: Database = Depends(get_db),
-):
-    """
-    Validates a session token against user_sessions.
-    """
+async def _authenticate(token: Optional[str], db: AsyncDatabase) -> dict:
     if settings.auth_disable:
         return {
             "id": 0,
@@ -30,15 +71,14 @@ def get_current_user(
             "token": "dev-token",
         }
 
-    if credentials is None:
+    if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Missing credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    token = credentials.credentials
-    session = get_active_session(db, token)
+    session = await get_active_session(db, token)
     if not session:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -55,6 +95,29 @@ def get_current_user(
     }
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    db: AsyncDatabase = Depends(get_async_db),
+):
+    """
+    Validates a session token against user_sessions.
+    Runs on the event loop (async DB) so auth never takes a worker thread.
+    """
+    return await _authenticate(credentials.credentials if credentials else None, db)
+
+
+async def get_stream_user(
+    token: Optional[str] = Query(None),
+    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    db: AsyncDatabase = Depends(get_async_db),
+):
+    """
+    Same as get_current_user, but also accepts ?token= because the browser
+    EventSource API can't send an Authorization header.
+    """
+    return await _authenticate(credentials.credentials if credentials else token, db)
+
+
 def require_roles(*roles: str):
     """
     Dependency factory to enforce role-based access.
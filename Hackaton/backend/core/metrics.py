@@ -0,0 +1,290 @@
+"""
+In-process metrics in the Prometheus text format (GET /metrics).
+
+Counters and histograms are plain dicts keyed by label values, updated under
+a per-metric lock, so recording on the hot path costs a dict lookup and a
+bisect. Values that services already track (pool stats, query stats, event
+hub, BPM writer...) are read at scrape time through collectors instead of
+being duplicated.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+# (name, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count por bucket (no acumulado) + overflow, suma]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        samples: List[Sample] = []
+        for key, counts, total in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: Histogram, labels: LabelValues) -> None:
+        self._histogram = histogram
+        self._labels = labels
+        self._started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._histogram.observe(time.perf_counter() - self._started, *self._labels)
+
+
+class Family:
+    """Metric family produced by a collector at scrape time."""
+
+    def __init__(self, name: str, kind: str, help_text: str) -> None:
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self._samples: List[Sample] = []
+
+    def add(self, value: Optional[float], **labels: str) -> "Family":
+        if value is not None:
+            self._samples.append((self.name, labels, float(value)))
+        return self
+
+    def samples(self) -> List[Sample]:
+        return self._samples
+
+
+Collector = Callable[[], Iterable[Family]]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[object] = []
+        self._collectors: List[Collector] = []
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        families = list(self._metrics)
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                print(f"Error collecting metrics from {getattr(collector, '__name__', collector)}: {e}")
+
+        lines: List[str] = []
+        for family in families:
+            samples = family.samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+# -----------------------------
+# HTTP
+# -----------------------------
+HTTP_REQUESTS = metrics.counter(
+    "autoawake_http_requests_total",
+    "HTTP requests by route template, method and status.",
+    ("method", "route", "status"),
+)
+HTTP_LATENCY = metrics.histogram(
+    "autoawake_http_request_duration_seconds",
+    "HTTP request latency by route template, method and status.",
+    ("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware overhead). Labels requests
+    with the matched route template (/trips/{trip_id}/bpm), never the raw
+    path, so the label set stays bounded. Streaming responses (SSE, exports)
+    are timed until the body ends.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            labels = (scope["method"], path, str(status_code))
+            HTTP_REQUESTS.inc(*labels)
+            HTTP_LATENCY.observe(time.perf_counter() - started, *labels)
+
+
+# -----------------------------
+# Caches
+# -----------------------------
+CACHE_REQUESTS = metrics.counter(
+    "autoawake_cache_requests_total",
+    "In-process cache lookups by cache and result (hit/miss).",
+    ("cache", "result"),
+)
+
+
+# -----------------------------
+# MQTT
+# -----------------------------
+MQTT_RECEIVED = metrics.counter(
+    "autoawake_mqtt_messages_received_total",
+    "MQTT messages received by topic.",
+    ("topic",),
+)
+MQTT_PROCESSED = metrics.counter(
+    "autoawake_mqtt_messages_processed_total",
+    "MQTT messages processed by topic and result (ok/invalid/error).",
+    ("topic", "result"),
+)
+MQTT_PROCESSING = metrics.histogram(
+    "autoawake_mqtt_processing_seconds",
+    "Time spent handling one MQTT message, by topic.",
+    ("topic",),
+)
+MQTT_INGEST_LAG = metrics.histogram(
+    "autoawake_mqtt_ingest_lag_seconds",
+    "Delay between the device timestamp in the payload and its processing, by topic.",
+    ("topic",),
+    buckets=LAG_BUCKETS,
+)
+
+
+# -----------------------------
+# Telegram
+# -----------------------------
+TELEGRAM_SENT = metrics.counter(
+    "autoawake_telegram_notifications_total",
+    "Telegram notifications by result (ok/http_error/error/skipped).",
+    ("result",),
+)
+TELEGRAM_LATENCY = metrics.histogram(
+    "autoawake_telegram_send_duration_seconds",
+    "Latency of Telegram sendMessage calls.",
+)
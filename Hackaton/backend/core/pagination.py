@@ -0,0 +1,51 @@
+"""Keyset (cursor) pagination helpers for list endpoints."""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Keyset = Tuple[datetime, int]
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """
+    Opaque token for the position (sort_value, row_id) of the last row served.
+    """
+    raw = json.dumps([sort_value.isoformat(), int(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Keyset]:
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from exc
+
+
+def set_next_cursor(
+    response: Response,
+    rows: List[Dict[str, Any]],
+    limit: int,
+    sort_key: str,
+    id_key: str,
+) -> None:
+    """
+    Adds the X-Next-Cursor header when the page is full (there may be more rows).
+    The body keeps its list shape so existing clients are unaffected.
+    """
+    if limit > 0 and len(rows) >= limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last[sort_key], last[id_key])
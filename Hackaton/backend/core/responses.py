@@ -0,0 +1,102 @@
+"""
+Fast JSON path for list endpoints.
+
+FastAPI validates every row of a `response_model=List[...]` through pydantic
+and then encodes it with the standard encoder. For rows that come straight
+from MySQL that work is redundant: `model_rows` keeps only the model's
+fields and encodes the list with orjson (native datetime support) in one
+call. Returning a Response makes FastAPI skip response_model validation,
+while the route keeps its response_model, so the OpenAPI schema is unchanged.
+
+Enable with FAST_JSON_RESPONSES=true (off by default: pydantic serialization).
+
+`not_modified` adds conditional GET (ETag / If-None-Match) to reference-data
+lists whose collection version is tracked by `collection_versions`.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from core.config import settings
+
+# Los listados de referencia se revalidan en cada uso (sin servir de la caché sin preguntar)
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+# Headers de la respuesta inyectada que no deben pisar los de la rápida
+_SKIP_HEADERS = {"content-length", "content-type"}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+@lru_cache(maxsize=None)
+def _fields(model: Type[BaseModel]) -> Tuple[str, ...]:
+    return tuple(model.model_fields)
+
+
+def model_rows(
+    rows: Iterable[Dict[str, Any]],
+    model: Type[BaseModel],
+    response: Optional[Response] = None,
+) -> Union[List[Dict[str, Any]], Response]:
+    """
+    Rows projected onto `model`'s fields as a FastJSONResponse. `response`
+    is the route's injected Response: its headers (X-Next-Cursor) are copied.
+    Unless FAST_JSON_RESPONSES is on (default off), returns the rows for
+    pydantic to validate.
+    """
+    if not settings.fast_json_responses:
+        return rows if isinstance(rows, list) else list(rows)
+    fields = _fields(model)
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k not in _SKIP_HEADERS}
+    return FastJSONResponse(
+        [{name: row.get(name) for name in fields} for row in rows],
+        headers=headers,
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Comparación débil (RFC 9110): se ignora el prefijo W/
+    if if_none_match.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Conditional GET for a list route. Sets ETag/Cache-Control on the
+    injected `response` (copied by `model_rows`) and returns a bodyless 304
+    when the request's If-None-Match already matches, so the route can
+    return it before querying the database. Returns None otherwise.
+    """
+    headers = {"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
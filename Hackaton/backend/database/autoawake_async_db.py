@@ -0,0 +1,240 @@
+"""
+autoawake_async_db.py
+
+Variante asyncio de la capa de acceso a datos para AutoAwakeAI (aiomysql).
+
+Expone `AsyncDatabase` con la misma superficie que `Database`
+(fetch_one / fetch_all / execute / executemany / call_procedure /
+select_from_view), pero con métodos awaitables. Está pensada para rutas
+`async def` que no deben bloquear el event loop (login, validación de
+sesión) y para endpoints con mucha concurrencia.
+
+El pool se crea dentro del event loop, por eso hay que llamar
+`await db.connect()` al iniciar la app (ver lifespan en main.py).
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiomysql
+
+from database.autoawake_db import ACTIVE_SESSION_QUERY, OUT, DBConfig, build_procedure_call
+from database.query_stats import query_stats
+
+
+# =====================================================
+# 1. Clase base de conexión (async)
+# =====================================================
+
+class AsyncDatabase:
+    """
+    Wrapper simple sobre aiomysql con pool.
+
+    Las conexiones trabajan en autocommit: aiomysql cierra (en vez de
+    devolver al pool) cualquier conexión que siga dentro de una
+    transacción, así que un SELECT sin commit destruiría el pool.
+    """
+
+    def __init__(self, config: Optional[DBConfig] = None) -> None:
+        self.config = config or DBConfig()
+        self.pool: Optional[aiomysql.Pool] = None
+
+    async def connect(self) -> None:
+        if self.pool is not None:
+            return
+        try:
+            self.pool = await aiomysql.create_pool(
+                minsize=1,
+                maxsize=self.config.pool_size,
+                host=self.config.host,
+                port=self.config.port,
+                user=self.config.user,
+                password=self.config.password,
+                db=self.config.database,
+                charset="utf8mb4",
+                autocommit=True,
+            )
+        except Exception as e:
+            raise RuntimeError(f"Error creando pool async de conexiones: {e}") from e
+
+    async def close(self) -> None:
+        if self.pool is None:
+            return
+        self.pool.close()
+        await self.pool.wait_closed()
+        self.pool = None
+
+    # -----------------------------
+    # Métodos internos de utilidad
+    # -----------------------------
+    @asynccontextmanager
+    async def _get_connection(self) -> AsyncIterator[aiomysql.Connection]:
+        if self.pool is None:
+            raise RuntimeError("AsyncDatabase no inicializada: llama a connect() primero")
+        async with self.pool.acquire() as conn:
+            yield conn
+
+    # -----------------------------
+    # SELECT genéricos
+    # -----------------------------
+    async def fetch_one(
+        self,
+        query: str,
+        params: Optional[Tuple[Any, ...]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        started = time.perf_counter()
+        async with self._get_connection() as conn:
+            with query_stats.track(query, params, time.perf_counter() - started) as timer:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(query, params or ())
+                    row = await cursor.fetchone()
+                    timer.rows = 1 if row else 0
+                    return row
+
+    async def fetch_all(
+        self,
+        query: str,
+        params: Optional[Tuple[Any, ...]] = None,
+    ) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        async with self._get_connection() as conn:
+            with query_stats.track(query, params, time.perf_counter() - started) as timer:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(query, params or ())
+                    rows = list(await cursor.fetchall())
+                    timer.rows = len(rows)
+                    return rows
+
+    # -----------------------------
+    # INSERT/UPDATE/DELETE genéricos
+    # -----------------------------
+    async def execute(
+        self,
+        query: str,
+        params: Optional[Tuple[Any, ...]] = None,
+        *,
+        commit: bool = True,
+        return_lastrowid: bool = False,
+    ) -> Optional[int]:
+        started = time.perf_counter()
+        async with self._get_connection() as conn:
+            with query_stats.track(query, params, time.perf_counter() - started) as timer:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query, params or ())
+                    if commit:
+                        await conn.commit()
+                    timer.rows = cursor.rowcount
+                    if return_lastrowid:
+                        return cursor.lastrowid
+                    return None
+
+    async def executemany(
+        self,
+        query: str,
+        param_list: Iterable[Tuple[Any, ...]],
+        *,
+        commit: bool = True,
+    ) -> None:
+        params = list(param_list)
+        started = time.perf_counter()
+        async with self._get_connection() as conn:
+            with query_stats.track(query, params[0] if params else None, time.perf_counter() - started) as timer:
+                async with conn.cursor() as cursor:
+                    await cursor.executemany(query, params)
+                    if commit:
+                        await conn.commit()
+                    timer.rows = cursor.rowcount
+
+    # -----------------------------
+    # Stored Procedures
+    # -----------------------------
+    async def call_procedure(
+        self,
+        name: str,
+        args: Optional[List[Any]] = None,
+    ) -> Tuple[List[Any], List[List[Dict[str, Any]]]]:
+        """
+        Llama un SP en un solo round trip y devuelve:
+          (args, [resultset1, resultset2, ...])
+
+        Mismo contrato que `Database.call_procedure`: los OUT se marcan con
+        `OUT` y los valores generados llegan como result set del SP.
+        """
+        query, params = build_procedure_call(name, args)
+        started = time.perf_counter()
+        async with self._get_connection() as conn:
+            with query_stats.track(query, params, time.perf_counter() - started) as timer:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(query, params)
+                    result_sets: List[List[Dict[str, Any]]] = []
+                    while True:
+                        if cursor.description:
+                            result_sets.append(list(await cursor.fetchall()))
+                        if not await cursor.nextset():
+                            break
+                    timer.rows = sum(len(rows) for rows in result_sets)
+                    return list(args or []), result_sets
+
+    # -----------------------------
+    # Vistas
+    # -----------------------------
+    async def select_from_view(
+        self,
+        view_name: str,
+        where_clause: str = "",
+        params: Optional[Tuple[Any, ...]] = None,
+    ) -> List[Dict[str, Any]]:
+        query = f"SELECT * FROM {view_name} {where_clause}"
+        return await self.fetch_all(query, params)
+
+
+# =====================================================
+# 2. Funciones async para el camino caliente (auth)
+# =====================================================
+
+async def register_user(
+    db: AsyncDatabase,
+    full_name: str,
+    email: str,
+    password_plain: str,
+    role_name: str = "DRIVER",
+) -> int:
+    args: List[Any] = [full_name, email, password_plain, role_name, OUT]
+    _, result_sets = await db.call_procedure("sp_register_user", args)
+    return int(result_sets[-1][0]["user_id"])
+
+
+async def login_user(
+    db: AsyncDatabase,
+    email: str,
+    password_plain: str,
+) -> Dict[str, Any]:
+    args: List[Any] = [email, password_plain, OUT, OUT, OUT]
+    _, result_sets = await db.call_procedure("sp_login_user", args)
+    row = result_sets[-1][0]
+    return {
+        "user_id": int(row["user_id"]),
+        "role_name": row["role_name"],
+        "session_token": row["session_token"],
+        "email": row["email"],
+        "expires_at": row["expires_at"],
+    }
+
+
+async def logout_session(db: AsyncDatabase, session_token: str) -> None:
+    await db.call_procedure("sp_logout_session", [session_token])
+
+
+async def get_user_by_email(db: AsyncDatabase, email: str) -> Optional[Dict[str, Any]]:
+    query = "SELECT * FROM users WHERE email = %s"
+    return await db.fetch_one(query, (email.lower(),))
+
+
+async def get_active_session(db: AsyncDatabase, token: str) -> Optional[Dict[str, Any]]:
+    """
+    Igual que autoawake_db.get_active_session, sin bloquear el event loop.
+    """
+    return await db.fetch_one(ACTIVE_SESSION_QUERY, (token,))
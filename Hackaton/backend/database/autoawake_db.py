@@ -5,23 +5,37 @@ Capa de acceso a datos para la base de datos AutoAwakeAI (MySQL).
 
 Usa:
 - Tablas: drivers, vehicles, driver_vehicle_assignments, trips,
-          alerts, issues, devices, roles, users, user_sessions
+          alerts, issues, devices, roles, users, user_sessions,
+          vehicle_status (última alerta / issues abiertos, por triggers),
+          alert_rollup_hourly / alert_rollup_daily (conteos por bucket),
+          alerts_archive_YYYYMM (meses archivados de alerts),
+          bpm_samples / bpm_minute (ritmo cardíaco crudo / por minuto)
 - Vistas: v_active_trips, v_driver_current_assignment, v_vehicle_last_alert,
           v_open_issues, v_trip_alerts_summary, v_vehicle_health,
           v_users, v_active_sessions
 - SPs:   sp_start_trip, sp_end_trip, sp_log_alert,
          sp_open_issue, sp_close_issue, sp_update_device_status,
-         sp_register_user, sp_login_user, sp_logout_session
+         sp_register_user, sp_login_user, sp_logout_session,
+         sp_rollup_alerts
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 import os
+import threading
+import time
+import weakref
+import zlib
 import mysql.connector
-from mysql.connector import Error, pooling
+from mysql.connector import Error, errorcode, errors, pooling
+
+from database.query_stats import query_stats
 
 
 # =====================================================
@@ -36,21 +50,260 @@ class DBConfig:
     password: str = os.getenv("DB_PASS", "super_secret")
     database: str = os.getenv("DB_NAME", "AutoAwakeAI")
     pool_name: str = "autoawake_pool"
-    pool_size: int = 5
+    pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    # Segundos que se espera una conexión libre antes de fallar (PoolTimeoutError)
+    pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "5"))
+    # Prepared statements del lado del servidor para las consultas calientes
+    # (fetch_one/fetch_all/execute con prepared=True).
+    prepared_statements: bool = os.getenv("DB_PREPARED_STATEMENTS", "true").lower() in ("1", "true", "yes")
+    prepared_cache_size: int = 64
+    # Réplicas de lectura ("host:puerto"), mismo usuario/clave/base que el
+    # primario. Sólo las lecturas con replica=True van a ellas.
+    replicas: List[str] = field(default_factory=list)
+    # Una réplica con más atraso que esto (Seconds_Behind_Source) no recibe lecturas
+    replica_max_lag: float = 10.0
+    replica_check_interval: float = 5.0
+    # Tras escribir, las lecturas del mismo request (write_scope) van al primario estos segundos
+    replica_sticky_seconds: float = 2.0
+
+
+class _OutParam:
+    """Marca un argumento OUT en call_procedure."""
+
+    def __repr__(self) -> str:
+        return "OUT"
+
+
+OUT = _OutParam()
+
+
+class PoolTimeoutError(RuntimeError):
+    """El pool no liberó ninguna conexión dentro de pool_timeout."""
+
+
+class _PooledConnection:
+    """
+    Conexión prestada por Database._get_connection. Delega todo en la
+    conexión del pool; close() la devuelve y libera el cupo del semáforo
+    (una sola vez), registrando cuánto tiempo estuvo tomada.
+    """
+
+    def __init__(self, db: "Database", conn: Any, acquired_at: float, waited: float) -> None:
+        self._db = db
+        self._conn = conn
+        self._acquired_at = acquired_at
+        self._closed = False
+        self.waited = waited  # segundos de espera por un cupo del pool
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if not self._db.pool.reset_session and self._conn.in_transaction:
+                # Sin reset de sesión, una transacción abierta pasaría al próximo préstamo
+                self._conn.rollback()
+            self._conn.close()
+        finally:
+            self._db._release(self._acquired_at)
+
+    def discard(self) -> None:
+        """
+        Devuelve el cupo sin reutilizar la sesión: cierra el socket sin
+        leer lo pendiente y el pool reconecta en el próximo préstamo. Para
+        cursores sin buffer cortados a mitad del resultado, que de otro
+        modo habría que drenar completos.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            cnx = self._conn._cnx
+            try:
+                cnx.shutdown()
+            except Error as e:
+                print(f"[DB] Error cerrando conexión descartada: {e}")
+            self._conn._cnx_pool.add_connection(cnx)
+            self._conn._cnx = None
+        finally:
+            self._db._release(self._acquired_at)
+
+
+class _WriteMarker:
+    """Momento de la última escritura (time.monotonic) del request en curso."""
+
+    __slots__ = ("last_write",)
+
+    def __init__(self) -> None:
+        self.last_write: Optional[float] = None
+
+
+# Un marcador mutable por request (write_scope). Starlette copia el contexto
+# al threadpool: la copia apunta al mismo marcador, así una escritura en un
+# hilo del pool se ve en las lecturas siguientes del mismo request y no en
+# las de otro request que reutilice el hilo.
+_write_marker: ContextVar[Optional[_WriteMarker]] = ContextVar("db_write_marker", default=None)
+
+
+@contextmanager
+def write_scope() -> Iterator[None]:
+    """
+    Abre un ámbito de read-your-writes (un request HTTP): las lecturas con
+    replica=True posteriores a una escritura dentro del ámbito van al
+    primario durante replica_sticky_seconds.
+    """
+    token = _write_marker.set(_WriteMarker())
+    try:
+        yield
+    finally:
+        _write_marker.reset(token)
+
+
+class RowBatch(list):
+    """
+    Lote de filas de Database.stream_all; `columns` trae los nombres de
+    columna del cursor, incluso en el lote vacío de un resultado sin filas.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = (), columns: Iterable[str] = ()) -> None:
+        super().__init__(rows)
+        self.columns: List[str] = list(columns)
+
+
+class Transaction:
+    """
+    Conexión tomada por Database.transaction(): todo lo que se ejecuta con
+    ella se confirma junto al salir del bloque, o se deshace si sale por
+    una excepción.
+    """
+
+    def __init__(self, conn: _PooledConnection) -> None:
+        self._conn = conn
+        self._wait = conn.waited  # la espera por el cupo se cuenta una vez
+        self.lastrowid: Optional[int] = None
+
+    def _track(self, query: str, params: Any):
+        wait, self._wait = self._wait, 0.0
+        return query_stats.track(query, params, wait)
+
+    def execute(self, query: str, params: Optional[Tuple[Any, ...]] = None) -> int:
+        """Ejecuta una sentencia y devuelve las filas afectadas."""
+        with self._track(query, params) as timer:
+            with self._conn.cursor() as cursor:
+                cursor.execute(query, params or ())
+                timer.rows = cursor.rowcount
+                return cursor.rowcount
+
+    def executemany(self, query: str, param_list: Iterable[Tuple[Any, ...]]) -> int:
+        """
+        Para INSERT ... VALUES mysql-connector arma un único INSERT
+        multi-fila. Devuelve las filas afectadas; `lastrowid` queda con el
+        AUTO_INCREMENT de la primera fila insertada.
+        """
+        params = list(param_list)
+        if not params:
+            return 0
+        with self._track(query, params[0]) as timer:
+            with self._conn.cursor() as cursor:
+                cursor.executemany(query, params)
+                timer.rows = cursor.rowcount
+                self.lastrowid = cursor.lastrowid
+                return cursor.rowcount
+
+    def fetch_all(self, query: str, params: Optional[Tuple[Any, ...]] = None) -> List[Dict[str, Any]]:
+        with self._track(query, params) as timer:
+            with self._conn.cursor(dictionary=True) as cursor:
+                cursor.execute(query, params or ())
+                rows = cursor.fetchall()
+                timer.rows = len(rows)
+                return rows
+
+
+def build_procedure_call(
+    name: str,
+    args: Optional[List[Any]] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    Arma `CALL name(...)` en una sola sentencia: los IN viajan como
+    parámetros y cada OUT se pasa como variable de sesión (@_<sp>_argN),
+    sin SET previo ni SELECT posterior. Los SPs devuelven sus valores
+    generados como result set.
+    """
+    placeholders: List[str] = []
+    params: List[Any] = []
+    for idx, arg in enumerate(args or []):
+        if arg is OUT:
+            placeholders.append(f"@_{name}_arg{idx + 1}")
+        else:
+            placeholders.append("%s")
+            params.append(arg)
+    return f"CALL {name}({', '.join(placeholders)})", params
+
+
+def keyset_condition(
+    sort_col: str,
+    id_col: str,
+    before: Optional[Tuple[Any, int]],
+) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Condición de keyset pagination para listados ordenados por
+    (sort_col DESC, id_col DESC): filas estrictamente anteriores a `before`.
+
+    Se escribe expandida en vez de `(sort_col, id_col) < (%s, %s)` para que
+    el optimizador arme un range scan sobre el índice (…, sort_col) + PK
+    implícita. Sin cursor devuelve una condición neutra.
+    """
+    if before is None:
+        return "1=1", ()
+    sort_value, row_id = before
+    condition = f"({sort_col} < %s OR ({sort_col} = %s AND {id_col} < %s))"
+    return condition, (sort_value, sort_value, row_id)
 
 
 class Database:
     """
     Wrapper simple sobre mysql-connector con pool.
+
+    MySQLConnectionPool falla en el acto si no hay conexiones libres; acá un
+    semáforo con pool_size cupos hace esperar hasta pool_timeout segundos y
+    recién entonces lanza PoolTimeoutError (la API responde 503).
+    pool_stats() expone esperas, tiempo de préstamo y agotamientos.
+
+    Con config.replicas, las lecturas marcadas replica=True (listados,
+    dashboard, reportes, exports) se reparten round-robin entre las réplicas
+    sanas (ReplicaSet). Escrituras, SPs y el resto de las lecturas quedan en
+    el primario, igual que cualquier lectura del request que acaba de
+    escribir (read-your-writes por write_scope, replica_sticky_seconds).
+    Si una réplica falla, la lectura se repite en el primario y la réplica
+    sale de rotación hasta que el health check la vuelva a ver sana.
+
+    Con prepared_statements activo, cada conexión del pool guarda sus
+    statements preparados (clave: texto SQL). Para que sobrevivan entre
+    préstamos, el pool no resetea la sesión al devolver la conexión y
+    trabaja en autocommit (una lectura no deja transacción ni snapshot
+    abierto en la conexión). Por eso, con la opción activa, el código no
+    debe dejar estado de sesión (SET SESSION, variables de usuario) del
+    que dependa otro préstamo; una transacción que quedó abierta se
+    deshace al devolver la conexión. Con la opción apagada el pool se
+    comporta como antes: reset de sesión y sin autocommit.
     """
 
     def __init__(self, config: Optional[DBConfig] = None) -> None:
         self.config = config or DBConfig()
+        # Sólo los prepared statements necesitan sesiones persistentes
+        session_options = (
+            {"pool_reset_session": False, "autocommit": True}
+            if self.config.prepared_statements
+            else {"pool_reset_session": True}
+        )
         try:
             self.pool = pooling.MySQLConnectionPool(
                 pool_name=self.config.pool_name,
                 pool_size=self.config.pool_size,
-                pool_reset_session=True,
+                **session_options,
                 host=self.config.host,
                 port=self.config.port,
                 user=self.config.user,
@@ -60,15 +313,202 @@ class Database:
         except Error as e:
             raise RuntimeError(f"Error creando pool de conexiones: {e}") from e
 
+        # conexión real -> (connection_id, {query: (cursor, query)})
+        self._prepared_cache: "weakref.WeakKeyDictionary[Any, Tuple[int, Dict[str, Any]]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._prepared_lock = threading.Lock()
+        self._prepared_executions: Dict[str, int] = {}
+        self._prepared_prepares: Dict[str, int] = {}
+
+        # Cupos del pool y métricas de préstamo
+        self._slots = threading.BoundedSemaphore(self.config.pool_size)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._in_use = 0
+        self._in_use_max = 0
+        self._checkout_total = 0.0
+        self._checkout_max = 0.0
+
+        self.replicas: Optional[ReplicaSet] = ReplicaSet(self.config) if self.config.replicas else None
+
     # -----------------------------
     # Métodos internos de utilidad
     # -----------------------------
     def _get_connection(self):
+        started = time.monotonic()
+        waited = 0.0
+        if not self._slots.acquire(blocking=False):
+            # Pool agotado: esperamos a que alguien devuelva una conexión
+            if not self._slots.acquire(timeout=self.config.pool_timeout):
+                with self._stats_lock:
+                    self._timeouts += 1
+                raise PoolTimeoutError(
+                    f"Pool {self.config.pool_name} agotado: sin conexión libre "
+                    f"en {self.config.pool_timeout:g}s"
+                )
+            waited = time.monotonic() - started
         try:
-            return self.pool.get_connection()
+            conn = self.pool.get_connection()
         except Error as e:
+            self._slots.release()
             raise RuntimeError(f"No se pudo obtener conexión del pool: {e}") from e
 
+        with self._stats_lock:
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            self._in_use += 1
+            self._in_use_max = max(self._in_use_max, self._in_use)
+        return _PooledConnection(self, conn, time.monotonic(), waited)
+
+    def _release(self, acquired_at: float) -> None:
+        held = time.monotonic() - acquired_at
+        with self._stats_lock:
+            self._in_use -= 1
+            self._checkout_total += held
+            self._checkout_max = max(self._checkout_max, held)
+        self._slots.release()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Métricas del pool desde el arranque: préstamos, cuántos tuvieron que
+        esperar (y cuánto), agotamientos (timeouts) y tiempo que cada
+        conexión estuvo tomada. Tiempos en milisegundos.
+        """
+        with self._stats_lock:
+            checkouts = self._checkouts
+            return {
+                "pool_name": self.config.pool_name,
+                "pool_size": self.config.pool_size,
+                "timeout_seconds": self.config.pool_timeout,
+                "in_use": self._in_use,
+                "in_use_max": self._in_use_max,
+                "checkouts": checkouts,
+                "waits": self._waits,
+                "wait_ms_total": round(self._wait_total * 1000, 3),
+                "wait_ms_avg": round(self._wait_total * 1000 / self._waits, 3) if self._waits else 0.0,
+                "wait_ms_max": round(self._wait_max * 1000, 3),
+                "timeouts": self._timeouts,
+                "checkout_ms_avg": (
+                    round(self._checkout_total * 1000 / (checkouts - self._in_use), 3)
+                    if checkouts > self._in_use else 0.0
+                ),
+                "checkout_ms_max": round(self._checkout_max * 1000, 3),
+                "checkout_ms_total": round(self._checkout_total * 1000, 3),
+            }
+
+    def _mark_write(self) -> None:
+        marker = _write_marker.get()
+        if marker is None:
+            # Fuera de write_scope (jobs, scripts): el ámbito es el contexto actual
+            marker = _WriteMarker()
+            _write_marker.set(marker)
+        marker.last_write = time.monotonic()
+
+    def _read_target(self, replica: bool) -> Optional["Database"]:
+        """
+        Réplica a la que mandar una lectura, o None para usar el primario.
+        """
+        if not replica or self.replicas is None:
+            return None
+        marker = _write_marker.get()
+        last_write = marker.last_write if marker is not None else None
+        if last_write is not None and time.monotonic() - last_write < self.config.replica_sticky_seconds:
+            return None
+        return self.replicas.pick()
+
+    def _replica_failed(self, target: "Database", exc: Exception) -> bool:
+        """
+        True si la lectura fallida se puede repetir en el primario: réplica
+        caída (se saca de rotación) u ocupada. Un error de SQL se propaga.
+        """
+        if isinstance(exc, PoolTimeoutError):
+            return True
+        if isinstance(exc, (RuntimeError, errors.InterfaceError, errors.OperationalError)):
+            self.replicas.mark_down(target, exc)
+            return True
+        return False
+
+    def _prepared_cursor(self, conn, query: str):
+        """
+        Devuelve el cursor preparado de `query` para esta conexión, o None si
+        no se deben usar prepared statements (desactivados o caché llena).
+
+        mysql-connector solo reutiliza el statement si recibe el mismo objeto
+        str, por eso se guarda la clave original junto al cursor.
+        """
+        if not self.config.prepared_statements:
+            return None
+        cnx = getattr(conn, "_cnx", conn)  # PooledMySQLConnection envuelve la real
+        with self._prepared_lock:
+            entry = self._prepared_cache.get(cnx)
+            if entry is None or entry[0] != cnx.connection_id:
+                # Conexión nueva o reconectada: los statements previos ya no existen
+                entry = (cnx.connection_id, {})
+                self._prepared_cache[cnx] = entry
+            statements = entry[1]
+            cached = statements.get(query)
+            if cached is None:
+                if len(statements) >= self.config.prepared_cache_size:
+                    return None
+                cached = (cnx.cursor(prepared=True, dictionary=True), query)
+                statements[query] = cached
+                self._prepared_prepares[query] = self._prepared_prepares.get(query, 0) + 1
+            self._prepared_executions[query] = self._prepared_executions.get(query, 0) + 1
+        return cached
+
+    def _forget_prepared(self, conn, query: str) -> None:
+        cnx = getattr(conn, "_cnx", conn)
+        with self._prepared_lock:
+            entry = self._prepared_cache.get(cnx)
+            cached = entry[1].pop(query, None) if entry is not None else None
+        if cached is not None:
+            # Cerrar el cursor libera el statement en el servidor
+            try:
+                cached[0].close()
+            except Error as e:
+                print(f"Error cerrando statement preparado: {e}")
+
+    def _execute_prepared(self, conn, query: str, params: Optional[Tuple[Any, ...]]):
+        """
+        Ejecuta `query` con su statement preparado y devuelve el cursor, o None
+        si hay que usar el protocolo de texto.
+        """
+        cached = self._prepared_cursor(conn, query)
+        if cached is None:
+            return None
+        cursor, query_key = cached
+        try:
+            cursor.execute(query_key, params or ())
+        except Error:
+            self._forget_prepared(conn, query)
+            raise
+        return cursor
+
+    def prepared_statement_stats(self) -> List[Dict[str, Any]]:
+        """
+        Ejecuciones por statement preparado (y cuántas veces se preparó,
+        i.e. una por conexión del pool salvo reconexiones).
+        """
+        with self._prepared_lock:
+            stats = [
+                {
+                    "query": " ".join(query.split()),
+                    "executions": executions,
+                    "prepares": self._prepared_prepares.get(query, 0),
+                }
+                for query, executions in self._prepared_executions.items()
+            ]
+        stats.sort(key=lambda s: s["executions"], reverse=True)
+        return stats
+
     # -----------------------------
     # SELECT genéricos
     # -----------------------------
@@ -76,12 +516,32 @@ class Database:
         self,
         query: str,
         params: Optional[Tuple[Any, ...]] = None,
+        *,
+        prepared: bool = False,
+        replica: bool = False,
     ) -> Optional[Dict[str, Any]]:
+        target = self._read_target(replica)
+        if target is not None:
+            try:
+                return target.fetch_one(query, params, prepared=prepared)
+            except (Error, RuntimeError) as e:
+                if not self._replica_failed(target, e):
+                    raise
         conn = self._get_connection()
         try:
-            with conn.cursor(dictionary=True) as cursor:
-                cursor.execute(query, params or ())
-                return cursor.fetchone()
+            with query_stats.track(query, params, conn.waited) as timer:
+                if prepared:
+                    cursor = self._execute_prepared(conn, query, params)
+                    if cursor is not None:
+                        # Consumimos todo: el cursor sigue vivo en la caché
+                        rows = cursor.fetchall()
+                        timer.rows = len(rows)
+                        return rows[0] if rows else None
+                with conn.cursor(dictionary=True) as cursor:
+                    cursor.execute(query, params or ())
+                    row = cursor.fetchone()
+                    timer.rows = 1 if row else 0
+                    return row
         finally:
             conn.close()
 
@@ -89,12 +549,93 @@ class Database:
         self,
         query: str,
         params: Optional[Tuple[Any, ...]] = None,
+        *,
+        prepared: bool = False,
+        replica: bool = False,
     ) -> List[Dict[str, Any]]:
+        target = self._read_target(replica)
+        if target is not None:
+            try:
+                return target.fetch_all(query, params, prepared=prepared)
+            except (Error, RuntimeError) as e:
+                if not self._replica_failed(target, e):
+                    raise
         conn = self._get_connection()
         try:
-            with conn.cursor(dictionary=True) as cursor:
-                cursor.execute(query, params or ())
-                return cursor.fetchall()
+            with query_stats.track(query, params, conn.waited) as timer:
+                rows = None
+                if prepared:
+                    cursor = self._execute_prepared(conn, query, params)
+                    if cursor is not None:
+                        rows = cursor.fetchall()
+                if rows is None:
+                    with conn.cursor(dictionary=True) as cursor:
+                        cursor.execute(query, params or ())
+                        rows = cursor.fetchall()
+                timer.rows = len(rows)
+                return rows
+        finally:
+            conn.close()
+
+    def stream_all(
+        self,
+        query: str,
+        params: Optional[Tuple[Any, ...]] = None,
+        *,
+        batch_size: int = 1000,
+        replica: bool = False,
+    ) -> Iterator[RowBatch]:
+        """
+        SELECT con cursor sin buffer: MySQL envía las filas por el socket y se
+        leen de a `batch_size`, así la memoria no depende del tamaño del
+        resultado (exports). La conexión queda tomada del pool hasta que el
+        generador se agota o se cierra. El tiempo registrado en query_stats
+        incluye el del consumidor entre lotes.
+
+        Cada lote es un RowBatch con los nombres de columna; un resultado
+        sin filas produce un único lote vacío.
+
+        Si el consumidor corta el stream antes del final, la conexión se
+        descarta (socket cerrado) en vez de drenar el resto del resultado
+        con el cupo del pool tomado.
+
+        En una réplica, sólo se puede pasar al primario si falla antes del
+        primer lote; a mitad del stream el error se propaga.
+        """
+        target = self._read_target(replica)
+        if target is not None:
+            started = False
+            try:
+                for rows in target.stream_all(query, params, batch_size=batch_size):
+                    started = True
+                    yield rows
+                return
+            except (Error, RuntimeError) as e:
+                if started or not self._replica_failed(target, e):
+                    raise
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor(dictionary=True, buffered=False)
+            try:
+                with query_stats.track(query, params, conn.waited) as timer:
+                    cursor.execute(query, params or ())
+                    columns = cursor.column_names
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            if not timer.rows:
+                                yield RowBatch(columns=columns)
+                            break
+                        timer.rows += len(rows)
+                        yield RowBatch(rows, columns)
+            finally:
+                # Si el cliente cortó el stream quedan filas sin leer en el
+                # socket: drenarlas leería el resto del export con el cupo
+                # tomado, así que la conexión se descarta.
+                if conn.unread_result:
+                    conn.discard()
+                else:
+                    cursor.close()
         finally:
             conn.close()
 
@@ -108,16 +649,31 @@ class Database:
         *,
         commit: bool = True,
         return_lastrowid: bool = False,
+        return_rowcount: bool = False,
+        prepared: bool = False,
     ) -> Optional[int]:
+        self._mark_write()
         conn = self._get_connection()
         try:
-            with conn.cursor() as cursor:
-                cursor.execute(query, params or ())
-                if commit:
-                    conn.commit()
-                if return_lastrowid:
-                    return cursor.lastrowid
-                return None
+            with query_stats.track(query, params, conn.waited) as timer:
+                cursor = self._execute_prepared(conn, query, params) if prepared else None
+                if cursor is not None:
+                    if commit:
+                        conn.commit()
+                    timer.rows = cursor.rowcount
+                    if return_rowcount:
+                        return cursor.rowcount
+                    return cursor.lastrowid if return_lastrowid else None
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params or ())
+                    if commit:
+                        conn.commit()
+                    timer.rows = cursor.rowcount
+                    if return_lastrowid:
+                        return cursor.lastrowid
+                    if return_rowcount:
+                        return cursor.rowcount
+                    return None
         finally:
             conn.close()
 
@@ -128,12 +684,43 @@ class Database:
         *,
         commit: bool = True,
     ) -> None:
+        self._mark_write()
+        params = list(param_list)
         conn = self._get_connection()
         try:
-            with conn.cursor() as cursor:
-                cursor.executemany(query, list(param_list))
-                if commit:
-                    conn.commit()
+            with query_stats.track(query, params[0] if params else None, conn.waited) as timer:
+                with conn.cursor() as cursor:
+                    cursor.executemany(query, params)
+                    if commit:
+                        conn.commit()
+                    timer.rows = cursor.rowcount
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[Transaction]:
+        """
+        Transacción explícita sobre una conexión del pool (con prepared
+        statements activos las conexiones trabajan en autocommit):
+
+            with db.transaction() as tx:
+                tx.executemany(INSERT, rows)
+
+        COMMIT al salir del bloque; ROLLBACK y se relanza si hay excepción.
+        """
+        self._mark_write()
+        conn = self._get_connection()
+        try:
+            conn.start_transaction()
+            try:
+                yield Transaction(conn)
+            except BaseException:
+                try:
+                    conn.rollback()
+                except Error as e:
+                    print(f"Error en rollback: {e}")
+                raise
+            conn.commit()
         finally:
             conn.close()
 
@@ -146,44 +733,29 @@ class Database:
         args: Optional[List[Any]] = None,
     ) -> Tuple[List[Any], List[List[Dict[str, Any]]]]:
         """
-        Llama un SP y devuelve:
-          (lista_args_modificados, [resultset1, resultset2, ...])
+        Llama un SP en un solo round trip y devuelve:
+          (args, [resultset1, resultset2, ...])
 
-        args debe ser una lista (NO tupla) para poder leer OUT params.
+        Los OUT params se marcan con `OUT` en args. Su valor no se lee de
+        vuelta (evita el SELECT @_... extra): los SPs que generan IDs/tokens
+        los devuelven en su último result set.
         """
+        query, params = build_procedure_call(name, args)
+        self._mark_write()
         conn = self._get_connection()
         try:
-            with conn.cursor(dictionary=True) as cursor:
-                proc_args = args or []
-                proc_result = cursor.callproc(name, proc_args)
-                result_list = list(proc_result)
-                # Algunas versiones del conector devuelven placeholders como
-                # 'sp_login_user_arg3' en vez del valor del OUT param. Los
-                # recuperamos con un SELECT a las variables de sesión.
-                placeholders: List[Tuple[int, str]] = []
-                for idx, val in enumerate(result_list):
-                    if not isinstance(val, str):
-                        continue
-                    if val.startswith(f"{name}_arg"):
-                        placeholders.append((idx, val))
-                    elif val.startswith(f"@_{name}_"):
-                        # Algunos conectores devuelven el prefijo '@_' incluido
-                        placeholders.append((idx, val[2:]))
-
-                if placeholders:
-                    select_expr = ", ".join(
-                        f"@_{ph} AS `{ph}`" for _, ph in placeholders
-                    )
-                    cursor.execute(f"SELECT {select_expr}")
-                    row = cursor.fetchone()
-                    for idx, ph in placeholders:
-                        result_list[idx] = row[ph]
-
-                result_sets: List[List[Dict[str, Any]]] = []
-                for rs in cursor.stored_results():
-                    result_sets.append(rs.fetchall())
-                conn.commit()
-                return result_list, result_sets
+            with query_stats.track(query, params, conn.waited) as timer:
+                with conn.cursor(dictionary=True) as cursor:
+                    cursor.execute(query, params)
+                    result_sets: List[List[Dict[str, Any]]] = []
+                    while True:
+                        if cursor.description:
+                            result_sets.append(cursor.fetchall())
+                        if not cursor.nextset():
+                            break
+                    conn.commit()
+                    timer.rows = sum(len(rows) for rows in result_sets)
+                    return list(args or []), result_sets
         finally:
             conn.close()
 
@@ -195,9 +767,179 @@ class Database:
         view_name: str,
         where_clause: str = "",
         params: Optional[Tuple[Any, ...]] = None,
+        *,
+        replica: bool = False,
     ) -> List[Dict[str, Any]]:
         query = f"SELECT * FROM {view_name} {where_clause}"
-        return self.fetch_all(query, params)
+        return self.fetch_all(query, params, replica=replica)
+
+
+class _Replica:
+    def __init__(self, address: str, config: DBConfig) -> None:
+        self.address = address
+        self.config = config
+        self.db: Optional[Database] = None
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.reads = 0
+        self.failures = 0
+
+
+class ReplicaSet:
+    """
+    Réplicas de lectura de un Database: un pool por réplica (mismo tamaño y
+    timeout que el primario), round-robin entre las sanas y un health check
+    en segundo plano cada replica_check_interval segundos: SELECT 1 y, si el
+    usuario tiene permiso para SHOW REPLICA STATUS, el atraso de replicación.
+    Hasta el primer check (start()) ninguna réplica recibe lecturas.
+    """
+
+    def __init__(self, config: DBConfig) -> None:
+        self.config = config
+        self._replicas: List[_Replica] = []
+        for idx, address in enumerate(config.replicas):
+            host, _, port = address.rpartition(":")
+            if not host:
+                host, port = port, ""
+            replica_config = replace(
+                config,
+                host=host,
+                port=int(port) if port else config.port,
+                pool_name=f"{config.pool_name}_replica{idx + 1}",
+                replicas=[],
+            )
+            self._replicas.append(_Replica(address, replica_config))
+        self._lock = threading.Lock()
+        self._next = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def pick(self) -> Optional[Database]:
+        with self._lock:
+            for _ in range(len(self._replicas)):
+                replica = self._replicas[self._next % len(self._replicas)]
+                self._next += 1
+                if replica.healthy and replica.db is not None:
+                    replica.reads += 1
+                    return replica.db
+        return None
+
+    def mark_down(self, db: Database, exc: Exception) -> None:
+        with self._lock:
+            for replica in self._replicas:
+                if replica.db is db:
+                    replica.healthy = False
+                    replica.failures += 1
+                    replica.last_error = str(exc)
+                    print(f"Replica {replica.address} out of rotation: {exc}")
+
+    def _check(self, replica: _Replica) -> None:
+        try:
+            if replica.db is None:
+                # El pool se crea recién cuando la réplica responde
+                replica.db = Database(replica.config)
+            replica.db.fetch_one("SELECT 1 AS ok")
+            lag: Optional[float] = None
+            try:
+                status = replica.db.fetch_one("SHOW REPLICA STATUS")
+            except Error:
+                status = None  # sin permiso REPLICATION CLIENT: sólo liveness
+            if status is not None:
+                lag = status.get("Seconds_Behind_Source")
+                if lag is None:
+                    raise RuntimeError("replication is not running")
+                if lag > self.config.replica_max_lag:
+                    raise RuntimeError(f"replication lag {lag}s")
+            healthy, error = True, None
+        except (Error, RuntimeError) as e:
+            healthy, error, lag = False, str(e), None
+        with self._lock:
+            if healthy and not replica.healthy:
+                print(f"Replica {replica.address} in rotation")
+            replica.healthy = healthy
+            replica.lag = lag
+            replica.last_error = error
+
+    def check(self) -> None:
+        for replica in self._replicas:
+            self._check(replica)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.config.replica_check_interval):
+            self.check()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self.check()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-replica-checks", daemon=True)
+        self._thread.start()
+        print(f"Replica health checks started ({len(self._replicas)} replicas)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "address": replica.address,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag,
+                    "reads": replica.reads,
+                    "failures": replica.failures,
+                    "last_error": replica.last_error,
+                    "pool": replica.db.pool_stats() if replica.db else None,
+                }
+                for replica in self._replicas
+            ]
+
+
+class CollectionVersions:
+    """
+    Versión en memoria por colección de datos de referencia ("drivers",
+    "vehicles", "assignments"). Las funciones de esta capa que las modifican
+    la incrementan después del commit; las rutas de listado la usan como
+    ETag para responder 304 sin consultar la BD.
+
+    Es por proceso: el token de arranque hace que un ETag emitido por otro
+    proceso (u otro arranque) nunca coincida. Con varios workers una
+    escritura sólo incrementa la versión del que la atendió, así que el
+    token además rota cada `max_age` segundos (0 = no rota): un 304
+    desactualizado dura como mucho ese tiempo.
+    """
+
+    def __init__(self, max_age: float = 0.0) -> None:
+        self.max_age = max_age
+        self._boot = f"{os.getpid():x}{int(time.time()):x}"
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *collections: str) -> None:
+        with self._lock:
+            for name in collections:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+    def get(self, collection: str) -> int:
+        return self._versions.get(collection, 0)
+
+    def etag(self, collection: str, *variant: Any) -> str:
+        """
+        ETag débil de la colección. `variant` son los filtros de la consulta
+        (status, active_only...): cada combinación tiene su propio ETag.
+        """
+        epoch = int(time.time() // self.max_age) if self.max_age > 0 else 0
+        key = zlib.crc32(repr(variant).encode()) if variant else 0
+        return f'W/"{collection}-{self._boot}-{epoch:x}-{self.get(collection)}-{key:x}"'
+
+
+# max_age lo fija core/deps.py desde settings (REFERENCE_ETAG_MAX_AGE_SECONDS)
+collection_versions = CollectionVersions()
 
 
 # =====================================================
@@ -217,11 +959,11 @@ def register_user(
 ) -> int:
     """
     Crea un usuario usando sp_register_user (hash+salt en BD).
+    El SP devuelve el user_id generado como result set.
     """
-    args: List[Any] = [full_name, email, password_plain, role_name, 0]
-    result_args, _ = db.call_procedure("sp_register_user", args)
-    user_id = result_args[4]
-    return int(user_id)
+    args: List[Any] = [full_name, email, password_plain, role_name, OUT]
+    _, result_sets = db.call_procedure("sp_register_user", args)
+    return int(result_sets[-1][0]["user_id"])
 
 
 def login_user(
@@ -230,14 +972,18 @@ def login_user(
     password_plain: str,
 ) -> Dict[str, Any]:
     """
-    Ejecuta sp_login_user y devuelve user_id, role_name y session_token.
+    Ejecuta sp_login_user y devuelve user_id, role_name, session_token,
+    email y expires_at (result set del SP, sin consultas extra).
     """
-    args: List[Any] = [email, password_plain, 0, "", ""]
-    result_args, _ = db.call_procedure("sp_login_user", args)
+    args: List[Any] = [email, password_plain, OUT, OUT, OUT]
+    _, result_sets = db.call_procedure("sp_login_user", args)
+    row = result_sets[-1][0]
     return {
-        "user_id": int(result_args[2]),
-        "role_name": result_args[3],
-        "session_token": result_args[4],
+        "user_id": int(row["user_id"]),
+        "role_name": row["role_name"],
+        "session_token": row["session_token"],
+        "email": row["email"],
+        "expires_at": row["expires_at"],
     }
 
 
@@ -258,30 +1004,33 @@ def list_users(db: Database, status: Optional[str] = None) -> List[Dict[str, Any
     return db.fetch_all(query)
 
 
+ACTIVE_SESSION_QUERY = """
+    SELECT
+        s.session_id,
+        s.user_id,
+        s.token,
+        s.created_at,
+        s.expires_at,
+        u.full_name,
+        u.email,
+        u.status,
+        r.name AS role_name
+    FROM user_sessions s
+    JOIN users u ON u.user_id = s.user_id
+    JOIN roles r ON r.role_id = u.role_id
+    WHERE s.token = %s
+      AND s.revoked_at IS NULL
+      AND s.expires_at > NOW()
+    LIMIT 1
+"""
+
+
 def get_active_session(db: Database, token: str) -> Optional[Dict[str, Any]]:
     """
     Recupera una sesión activa (no expirada ni revocada) y datos del usuario.
+    La consulta se comparte con la variante async (autoawake_async_db).
     """
-    query = """
-        SELECT
-            s.session_id,
-            s.user_id,
-            s.token,
-            s.created_at,
-            s.expires_at,
-            u.full_name,
-            u.email,
-            u.status,
-            r.name AS role_name
-        FROM user_sessions s
-        JOIN users u ON u.user_id = s.user_id
-        JOIN roles r ON r.role_id = u.role_id
-        WHERE s.token = %s
-          AND s.revoked_at IS NULL
-          AND s.expires_at > NOW()
-        LIMIT 1
-    """
-    return db.fetch_one(query, (token,))
+    return db.fetch_one(ACTIVE_SESSION_QUERY, (token,), prepared=True)
 
 # ---------------------------
 # DRIVERS
@@ -303,6 +1052,8 @@ def create_driver(
     """
     params = (first_name, last_name, license_number, status)
     new_id = db.execute(query, params, return_lastrowid=True)
+    # Las asignaciones muestran nombre y estado del conductor
+    collection_versions.bump("drivers", "assignments")
     return new_id or 0
 
 
@@ -327,6 +1078,7 @@ def list_drivers(db: Database, status: Optional[str] = None) -> List[Dict[str, A
 def deactivate_driver(db: Database, driver_id: int) -> None:
     query = "UPDATE drivers SET status = 'INACTIVE' WHERE driver_id = %s"
     db.execute(query, (driver_id,))
+    collection_versions.bump("drivers", "assignments")
 
 
 def update_driver(
@@ -363,6 +1115,7 @@ def update_driver(
     params.append(driver_id)
     query = f"UPDATE drivers SET {', '.join(fields)} WHERE driver_id = %s"
     db.execute(query, tuple(params))
+    collection_versions.bump("drivers", "assignments")
 
 
 # ---------------------------
@@ -382,6 +1135,8 @@ def create_vehicle(
     """
     params = (plate, brand, model, status)
     new_id = db.execute(query, params, return_lastrowid=True)
+    # Las asignaciones muestran patente y estado del vehículo
+    collection_versions.bump("vehicles", "assignments")
     return new_id or 0
 
 
@@ -406,6 +1161,7 @@ def list_vehicles(db: Database, status: Optional[str] = None) -> List[Dict[str,
 def update_vehicle_status(db: Database, vehicle_id: int, status: str) -> None:
     query = "UPDATE vehicles SET status = %s WHERE vehicle_id = %s"
     db.execute(query, (status, vehicle_id))
+    collection_versions.bump("vehicles", "assignments")
 
 
 # ---------------------------
@@ -446,6 +1202,7 @@ def create_assignment(
         params = (driver_id, vehicle_id, assigned_from)
 
     new_id = db.execute(query, params, return_lastrowid=True)
+    collection_versions.bump("assignments")
     return new_id or 0
 
 
@@ -473,6 +1230,7 @@ def close_assignment(
         params = (assigned_to, assignment_id)
 
     db.execute(query, params)
+    collection_versions.bump("assignments")
 
 
 def get_current_assignment_by_driver(
@@ -556,6 +1314,152 @@ def list_assignments(
     return db.fetch_all(query)
 
 
+# ---------------------------
+# IMPORTACIÓN MASIVA (drivers, vehicles, asignaciones)
+# ---------------------------
+
+BULK_LOOKUP_CHUNK = 1000
+
+# Filas que chocan con un índice único o con los triggers de asignaciones
+_CONFLICT_ERRNOS = (errorcode.ER_DUP_ENTRY, errorcode.ER_SIGNAL_EXCEPTION)
+
+INSERT_DRIVER_QUERY = """
+    INSERT INTO drivers (first_name, last_name, license_number, status)
+    VALUES (%s, %s, %s, %s)
+"""
+INSERT_VEHICLE_QUERY = """
+    INSERT INTO vehicles (plate, brand, model, status)
+    VALUES (%s, %s, %s, %s)
+"""
+INSERT_ASSIGNMENT_QUERY = """
+    INSERT INTO driver_vehicle_assignments (driver_id, vehicle_id, assigned_from, assigned_to)
+    VALUES (%s, %s, NOW(), NULL)
+"""
+
+
+def _select_in(db: Database, query: str, values: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Ejecuta `query` (con `{placeholders}` dentro de un IN) en bloques de
+    BULK_LOOKUP_CHUNK valores.
+    """
+    rows: List[Dict[str, Any]] = []
+    for start in range(0, len(values), BULK_LOOKUP_CHUNK):
+        chunk = values[start:start + BULK_LOOKUP_CHUNK]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        rows.extend(db.fetch_all(query.format(placeholders=placeholders), tuple(chunk)))
+    return rows
+
+
+def find_drivers_by_license(db: Database, licenses: List[str]) -> Dict[str, int]:
+    """licencia (en minúsculas) -> driver_id de las que ya existen."""
+    rows = _select_in(
+        db,
+        "SELECT driver_id, license_number FROM drivers WHERE license_number IN ({placeholders})",
+        licenses,
+    )
+    return {row["license_number"].lower(): row["driver_id"] for row in rows}
+
+
+def find_vehicles_by_plate(db: Database, plates: List[str]) -> Dict[str, int]:
+    """patente (en minúsculas) -> vehicle_id de las que ya existen."""
+    rows = _select_in(
+        db,
+        "SELECT vehicle_id, plate FROM vehicles WHERE plate IN ({placeholders})",
+        plates,
+    )
+    return {row["plate"].lower(): row["vehicle_id"] for row in rows}
+
+
+def find_existing_driver_ids(db: Database, driver_ids: List[int]) -> Set[int]:
+    rows = _select_in(db, "SELECT driver_id FROM drivers WHERE driver_id IN ({placeholders})", driver_ids)
+    return {row["driver_id"] for row in rows}
+
+
+def find_existing_vehicle_ids(db: Database, vehicle_ids: List[int]) -> Set[int]:
+    rows = _select_in(db, "SELECT vehicle_id FROM vehicles WHERE vehicle_id IN ({placeholders})", vehicle_ids)
+    return {row["vehicle_id"] for row in rows}
+
+
+def find_active_assignments(
+    db: Database,
+    driver_ids: List[int],
+    vehicle_ids: List[int],
+) -> Tuple[Dict[int, int], Dict[int, int]]:
+    """
+    Asignaciones activas (assigned_to IS NULL) de esos drivers y vehículos:
+    (driver_id -> vehicle_id, vehicle_id -> driver_id).
+    """
+    by_driver = _select_in(
+        db,
+        """
+        SELECT driver_id, vehicle_id FROM driver_vehicle_assignments
+        WHERE assigned_to IS NULL AND driver_id IN ({placeholders})
+        """,
+        driver_ids,
+    )
+    by_vehicle = _select_in(
+        db,
+        """
+        SELECT driver_id, vehicle_id FROM driver_vehicle_assignments
+        WHERE assigned_to IS NULL AND vehicle_id IN ({placeholders})
+        """,
+        vehicle_ids,
+    )
+    return (
+        {row["driver_id"]: row["vehicle_id"] for row in by_driver},
+        {row["vehicle_id"]: row["driver_id"] for row in by_vehicle},
+    )
+
+
+def _bulk_insert(
+    db: Database,
+    query: str,
+    rows: List[Tuple[Any, ...]],
+    collections: Tuple[str, ...],
+) -> Dict[int, str]:
+    """
+    Inserta `rows` en una sola transacción con un INSERT multi-fila.
+    Si alguna choca con un índice único o un trigger (p. ej. otra alta
+    concurrente entre la validación y el insert) se deshace el lote y se
+    reintenta fila por fila. Devuelve {índice en rows: motivo} de las que
+    no se insertaron.
+    """
+    if not rows:
+        return {}
+    failed: Dict[int, str] = {}
+    try:
+        with db.transaction() as tx:
+            tx.executemany(query, rows)
+    except errors.DatabaseError as e:
+        if e.errno not in _CONFLICT_ERRNOS:
+            raise
+        for index, row in enumerate(rows):
+            try:
+                db.execute(query, row)
+            except errors.DatabaseError as row_error:
+                if row_error.errno not in _CONFLICT_ERRNOS:
+                    raise
+                failed[index] = row_error.msg
+    if len(failed) < len(rows):
+        collection_versions.bump(*collections)
+    return failed
+
+
+def bulk_insert_drivers(db: Database, rows: List[Tuple[str, str, str, str]]) -> Dict[int, str]:
+    """rows: (first_name, last_name, license_number, status)."""
+    return _bulk_insert(db, INSERT_DRIVER_QUERY, rows, ("drivers", "assignments"))
+
+
+def bulk_insert_vehicles(db: Database, rows: List[Tuple[str, str, str, str]]) -> Dict[int, str]:
+    """rows: (plate, brand, model, status)."""
+    return _bulk_insert(db, INSERT_VEHICLE_QUERY, rows, ("vehicles", "assignments"))
+
+
+def bulk_insert_assignments(db: Database, rows: List[Tuple[int, int]]) -> Dict[int, str]:
+    """rows: (driver_id, vehicle_id); quedan activas desde NOW()."""
+    return _bulk_insert(db, INSERT_ASSIGNMENT_QUERY, rows, ("assignments",))
+
+
 # ---------------------------
 # TRIPS (usando SPs) y planes
 # ---------------------------
@@ -570,35 +1474,17 @@ def start_trip(
     """
     Llama a sp_start_trip y devuelve el trip_id generado.
 
-    Nota:
-    - Algunos drivers de MySQL (como mysql-connector-python) devuelven
-      strings tipo 'sp_start_trip_arg5' en los OUT params.
-    - Para evitar depender de eso, después de llamar al SP buscamos
-      el viaje recién creado en la tabla trips.
+    El SP devuelve LAST_INSERT_ID() de su propia sesión como result set,
+    así que el id es exacto aunque haya inicios concurrentes para el
+    mismo driver/vehículo.
     """
-    # 1. Llamamos al SP (ignoramos el OUT param)
-    args = [vehicle_id, driver_id, origin, destination, 0]
-    db.call_procedure("sp_start_trip", args)
+    args = [vehicle_id, driver_id, origin, destination, OUT]
+    _, result_sets = db.call_procedure("sp_start_trip", args)
 
-    # 2. Recuperamos el viaje más reciente de ese driver/vehículo
-    row = db.fetch_one(
-        """
-        SELECT trip_id
-        FROM trips
-        WHERE vehicle_id = %s
-          AND driver_id  = %s
-        ORDER BY started_at DESC
-        LIMIT 1
-        """,
-        (vehicle_id, driver_id),
-    )
+    if not result_sets or not result_sets[-1]:
+        raise RuntimeError("sp_start_trip no devolvió el trip_id generado.")
 
-    if not row or "trip_id" not in row:
-        raise RuntimeError(
-            "No se pudo recuperar el trip_id recién creado después de sp_start_trip."
-        )
-
-    return int(row["trip_id"])
+    return int(result_sets[-1][0]["trip_id"])
 
 
 def get_active_trip_by_pair(
@@ -617,7 +1503,7 @@ def get_active_trip_by_pair(
         ORDER BY started_at DESC
         LIMIT 1
     """
-    return db.fetch_one(query, (driver_id, vehicle_id))
+    return db.fetch_one(query, (driver_id, vehicle_id), prepared=True)
 
 
 def end_trip(
@@ -635,7 +1521,17 @@ def end_trip(
 
 def get_trip_by_id(db: Database, trip_id: int) -> Optional[Dict[str, Any]]:
     query = "SELECT * FROM trips WHERE trip_id = %s"
-    return db.fetch_one(query, (trip_id,))
+    return db.fetch_one(query, (trip_id,), prepared=True)
+
+
+def normalize_full_name(full_name: str) -> str:
+    """
+    Normaliza el nombre buscado como la columna generada drivers.full_name_norm
+    (14_driver_full_name.sql): sin espacios en los extremos, cada tramo de
+    espacios (tabs y saltos de línea incluidos) reducido a uno y en
+    minúsculas.
+    """
+    return " ".join(full_name.split()).lower()
 
 
 def get_driver_by_full_name(
@@ -643,14 +1539,16 @@ def get_driver_by_full_name(
     full_name: str,
 ) -> Optional[Dict[str, Any]]:
     """
-    Busca exacto por CONCAT(first_name, ' ', last_name).
+    Busca por nombre completo normalizado sobre idx_drivers_full_name_norm.
+    Con homónimos devuelve el de menor driver_id.
     """
     query = """
         SELECT * FROM drivers
-        WHERE CONCAT(first_name, ' ', last_name) = %s
+        WHERE full_name_norm = %s
+        ORDER BY driver_id
         LIMIT 1
     """
-    return db.fetch_one(query, (full_name,))
+    return db.fetch_one(query, (normalize_full_name(full_name),), prepared=True)
 
 
 def get_vehicle_by_plate(
@@ -658,7 +1556,7 @@ def get_vehicle_by_plate(
     plate: str,
 ) -> Optional[Dict[str, Any]]:
     query = "SELECT * FROM vehicles WHERE plate = %s LIMIT 1"
-    return db.fetch_one(query, (plate,))
+    return db.fetch_one(query, (plate,), prepared=True)
 
 # ---------------------------
 # TRIP PLANS (pendientes de iniciar)
@@ -736,30 +1634,80 @@ def list_trips_by_driver(
     db: Database,
     driver_id: int,
     limit: int = 50,
+    before: Optional[Tuple[Any, int]] = None,
 ) -> List[Dict[str, Any]]:
-    query = """
+    keyset, keyset_params = keyset_condition("started_at", "trip_id", before)
+    query = f"""
         SELECT *
         FROM trips
-        WHERE driver_id = %s
-        ORDER BY started_at DESC
+        WHERE driver_id = %s AND {keyset}
+        ORDER BY started_at DESC, trip_id DESC
         LIMIT %s
     """
-    return db.fetch_all(query, (driver_id, limit))
+    return db.fetch_all(query, (driver_id, *keyset_params, limit), prepared=True, replica=True)
 
 
 def list_trips_by_vehicle(
     db: Database,
     vehicle_id: int,
     limit: int = 50,
+    before: Optional[Tuple[Any, int]] = None,
 ) -> List[Dict[str, Any]]:
-    query = """
+    keyset, keyset_params = keyset_condition("started_at", "trip_id", before)
+    query = f"""
         SELECT *
         FROM trips
-        WHERE vehicle_id = %s
-        ORDER BY started_at DESC
+        WHERE vehicle_id = %s AND {keyset}
+        ORDER BY started_at DESC, trip_id DESC
         LIMIT %s
     """
-    return db.fetch_all(query, (vehicle_id, limit))
+    return db.fetch_all(query, (vehicle_id, *keyset_params, limit), prepared=True, replica=True)
+
+
+def stream_trips(
+    db: Database,
+    driver_id: Optional[int] = None,
+    vehicle_id: Optional[int] = None,
+    status: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    batch_size: int = 1000,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Viajes filtrados en lotes, leídos con cursor sin buffer (ver Database.stream_all).
+    """
+    conditions: List[str] = []
+    params: List[Any] = []
+    if driver_id:
+        conditions.append("t.driver_id = %s")
+        params.append(driver_id)
+    if vehicle_id:
+        conditions.append("t.vehicle_id = %s")
+        params.append(vehicle_id)
+    if status:
+        conditions.append("t.status = %s")
+        params.append(status)
+    if start_date:
+        conditions.append("t.started_at >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("t.started_at <= %s")
+        params.append(end_date)
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    query = f"""
+        SELECT
+            t.*,
+            CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
+            v.plate AS vehicle_plate,
+            v.brand AS vehicle_brand,
+            v.model AS vehicle_model
+        FROM trips t
+        JOIN drivers d ON d.driver_id = t.driver_id
+        JOIN vehicles v ON v.vehicle_id = t.vehicle_id
+        WHERE {where_clause}
+        ORDER BY t.started_at DESC, t.trip_id DESC
+    """
+    return db.stream_all(query, tuple(params), batch_size=batch_size, replica=True)
 
 
 # ---------------------------
@@ -772,21 +1720,133 @@ def log_alert(
     alert_type: str,
     severity: str,
     message: str,
-) -> None:
+) -> Optional[Dict[str, Any]]:
     """
     Llama a sp_log_alert.
-    SP resuelve vehicle_id y driver_id a partir de trip_id.
+    SP resuelve vehicle_id y driver_id a partir de trip_id y devuelve la
+    alerta creada (alert_id, vehicle_id, driver_id, trip_id, detected_at).
     """
     args = [trip_id, alert_type, severity, message]
-    db.call_procedure("sp_log_alert", args)
+    _, result_sets = db.call_procedure("sp_log_alert", args)
+    if not result_sets or not result_sets[-1]:
+        return None
+    return result_sets[-1][0]
+
+
+INSERT_ALERT_QUERY = """
+    INSERT INTO alerts (
+        vehicle_id, driver_id, trip_id, alert_type, severity, message, detected_at
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def log_alerts(
+    db: Database,
+    alerts: List[Tuple[int, str, str, str]],
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Versión por lotes de sp_log_alert: alerts = [(trip_id, alert_type,
+    severity, message), ...]. En una sola transacción resuelve vehicle_id
+    y driver_id de todos los viajes con un SELECT ... IN e inserta todas
+    las alertas con un único INSERT multi-fila.
+
+    Devuelve, en el mismo orden, la alerta creada (mismas claves que
+    log_alert) o None si el trip_id no existe (esa alerta no se inserta).
+    Con innodb_autoinc_lock_mode=2 los ids de un INSERT multi-fila pueden
+    no ser consecutivos si hay otros INSERT concurrentes en alerts, así que
+    no se calculan desde LAST_INSERT_ID(): se leen dentro de la misma
+    transacción (alert_id >= LAST_INSERT_ID(), mismos viajes y detected_at),
+    en orden de alert_id, que es el orden de inserción. El snapshot de la
+    transacción no ve filas de otros lotes que hicieron commit después.
+    """
+    if not alerts:
+        return []
+    trip_ids = sorted({trip_id for trip_id, _, _, _ in alerts})
+    placeholders = ", ".join(["%s"] * len(trip_ids))
+    with db.transaction() as tx:
+        trips = {
+            row["trip_id"]: row
+            for row in tx.fetch_all(
+                f"""
+                SELECT trip_id, vehicle_id, driver_id, NOW() AS now
+                FROM trips
+                WHERE trip_id IN ({placeholders})
+                """,
+                tuple(trip_ids),
+            )
+        }
+        if not trips:
+            return [None] * len(alerts)
+        detected_at = next(iter(trips.values()))["now"]
+        params = []
+        for trip_id, alert_type, severity, message in alerts:
+            trip = trips.get(trip_id)
+            if trip:
+                params.append((trip["vehicle_id"], trip["driver_id"], trip_id, alert_type, severity, message, detected_at))
+        tx.executemany(INSERT_ALERT_QUERY, params)
+
+        found = sorted(trips)
+        inserted = tx.fetch_all(
+            f"""
+            SELECT alert_id, trip_id
+            FROM alerts
+            WHERE alert_id >= %s
+              AND trip_id IN ({", ".join(["%s"] * len(found))})
+              AND detected_at = %s
+            ORDER BY alert_id
+            """,
+            (tx.lastrowid, *found, detected_at),
+        )
+        expected = [row[2] for row in params]
+        if [row["trip_id"] for row in inserted] != expected:
+            # Se deshace el lote antes que devolver ids equivocados
+            raise RuntimeError(
+                f"log_alerts: se insertaron {len(expected)} alertas pero se leyeron {len(inserted)}"
+            )
+        alert_ids = iter(row["alert_id"] for row in inserted)
+
+    created: List[Optional[Dict[str, Any]]] = []
+    for trip_id, _, _, _ in alerts:
+        trip = trips.get(trip_id)
+        if not trip:
+            created.append(None)
+            continue
+        created.append({
+            "alert_id": next(alert_ids),
+            "vehicle_id": trip["vehicle_id"],
+            "driver_id": trip["driver_id"],
+            "trip_id": trip_id,
+            "detected_at": detected_at,
+        })
+    return created
+
+
+def list_recent_alert_severities(
+    db: Database,
+    minutes: int,
+) -> List[Dict[str, Any]]:
+    """
+    Severidad y antigüedad (age_s, en segundos según el reloj de MySQL) de
+    las alertas de los últimos `minutes` minutos. Usa idx_alerts_detected.
+    """
+    query = """
+        SELECT
+            severity,
+            TIMESTAMPDIFF(SECOND, detected_at, NOW()) AS age_s
+        FROM alerts
+        WHERE detected_at >= NOW() - INTERVAL %s MINUTE
+    """
+    return db.fetch_all(query, (minutes,))
 
 
 def list_alerts_by_trip(
     db: Database,
     trip_id: int,
     limit: int = 100,
+    before: Optional[Tuple[Any, int]] = None,
 ) -> List[Dict[str, Any]]:
-    query = """
+    keyset, keyset_params = keyset_condition("a.detected_at", "a.alert_id", before)
+    query = f"""
         SELECT 
             a.*,
             CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
@@ -794,19 +1854,21 @@ def list_alerts_by_trip(
         FROM alerts a
         JOIN drivers d ON d.driver_id = a.driver_id
         JOIN vehicles v ON v.vehicle_id = a.vehicle_id
-        WHERE a.trip_id = %s
-        ORDER BY a.detected_at DESC
+        WHERE a.trip_id = %s AND {keyset}
+        ORDER BY a.detected_at DESC, a.alert_id DESC
         LIMIT %s
     """
-    return db.fetch_all(query, (trip_id, limit))
+    return db.fetch_all(query, (trip_id, *keyset_params, limit), prepared=True, replica=True)
 
 
 def list_alerts_by_vehicle(
     db: Database,
     vehicle_id: int,
     limit: int = 100,
+    before: Optional[Tuple[Any, int]] = None,
 ) -> List[Dict[str, Any]]:
-    query = """
+    keyset, keyset_params = keyset_condition("a.detected_at", "a.alert_id", before)
+    query = f"""
         SELECT 
             a.*,
             CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
@@ -814,19 +1876,21 @@ def list_alerts_by_vehicle(
         FROM alerts a
         JOIN drivers d ON d.driver_id = a.driver_id
         JOIN vehicles v ON v.vehicle_id = a.vehicle_id
-        WHERE a.vehicle_id = %s
-        ORDER BY a.detected_at DESC
+        WHERE a.vehicle_id = %s AND {keyset}
+        ORDER BY a.detected_at DESC, a.alert_id DESC
         LIMIT %s
     """
-    return db.fetch_all(query, (vehicle_id, limit))
+    return db.fetch_all(query, (vehicle_id, *keyset_params, limit), prepared=True, replica=True)
 
 
 def list_alerts_by_driver(
     db: Database,
     driver_id: int,
     limit: int = 100,
+    before: Optional[Tuple[Any, int]] = None,
 ) -> List[Dict[str, Any]]:
-    query = """
+    keyset, keyset_params = keyset_condition("a.detected_at", "a.alert_id", before)
+    query = f"""
         SELECT 
             a.*,
             CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
@@ -834,11 +1898,292 @@ def list_alerts_by_driver(
         FROM alerts a
         JOIN drivers d ON d.driver_id = a.driver_id
         JOIN vehicles v ON v.vehicle_id = a.vehicle_id
-        WHERE a.driver_id = %s
-        ORDER BY a.detected_at DESC
+        WHERE a.driver_id = %s AND {keyset}
+        ORDER BY a.detected_at DESC, a.alert_id DESC
         LIMIT %s
     """
-    return db.fetch_all(query, (driver_id, limit))
+    return db.fetch_all(query, (driver_id, *keyset_params, limit), prepared=True, replica=True)
+
+
+def alert_filter_conditions(
+    driver_id: Optional[int] = None,
+    vehicle_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Tuple[List[str], List[Any]]:
+    """
+    Filtros opcionales de alertas (alias `a`), compartidos por el listado
+    GET /alerts/ y el export.
+    """
+    conditions: List[str] = []
+    params: List[Any] = []
+    if driver_id:
+        conditions.append("a.driver_id = %s")
+        params.append(driver_id)
+    if vehicle_id:
+        conditions.append("a.vehicle_id = %s")
+        params.append(vehicle_id)
+    if start_date:
+        conditions.append("a.detected_at >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("a.detected_at <= %s")
+        params.append(end_date)
+    return conditions, params
+
+
+def stream_alerts(
+    db: Database,
+    driver_id: Optional[int] = None,
+    vehicle_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    batch_size: int = 1000,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Alertas filtradas en lotes, leídas con cursor sin buffer (ver Database.stream_all).
+    """
+    conditions, params = alert_filter_conditions(driver_id, vehicle_id, start_date, end_date)
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    query = f"""
+        SELECT
+            a.*,
+            CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
+            v.plate AS vehicle_plate
+        FROM alerts a
+        JOIN drivers d ON d.driver_id = a.driver_id
+        JOIN vehicles v ON v.vehicle_id = a.vehicle_id
+        WHERE {where_clause}
+        ORDER BY a.detected_at DESC, a.alert_id DESC
+    """
+    return db.stream_all(query, tuple(params), batch_size=batch_size, replica=True)
+
+
+def rollup_alerts(
+    db: Database,
+    batch_size: int = 5000,
+    lag_seconds: int = 5,
+    rescan_ids: int = 10000,
+) -> Dict[str, Any]:
+    """
+    Llama a sp_rollup_alerts: agrega el siguiente lote de alertas (posteriores
+    a la marca) en alert_rollup_hourly / alert_rollup_daily, más las que
+    hicieron commit tarde dentro de las últimas `rescan_ids` detrás de la marca.
+    Devuelve from_alert_id y last_alert_id; si son iguales no había nada nuevo.
+    """
+    _, result_sets = db.call_procedure("sp_rollup_alerts", [batch_size, lag_seconds, rescan_ids])
+    row = result_sets[-1][0] if result_sets and result_sets[-1] else {}
+    return {
+        "from_alert_id": int(row.get("from_alert_id") or 0),
+        "last_alert_id": int(row.get("last_alert_id") or 0),
+    }
+
+
+ROLLUP_GRANULARITIES = {
+    # granularidad -> (tabla, columna bucket, expresión bucket sobre alerts)
+    "hour": (
+        "alert_rollup_hourly",
+        "bucket_start",
+        "TIMESTAMP(DATE(a.detected_at), MAKETIME(HOUR(a.detected_at), 0, 0))",
+    ),
+    "day": ("alert_rollup_daily", "bucket_date", "DATE(a.detected_at)"),
+}
+
+ROLLUP_GROUP_COLUMNS = ("severity", "alert_type", "driver_id", "vehicle_id")
+
+
+def get_alert_timeseries(
+    db: Database,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    driver_id: Optional[int] = None,
+    vehicle_id: Optional[int] = None,
+    alert_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    group_by: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Alertas por bucket (hora o día) en [start, end), opcionalmente agrupadas
+    por severity / alert_type / driver_id / vehicle_id.
+    Lee los rollups y les suma las alertas que el job aún no agregó: las
+    posteriores a settled_alert_id que no están en alert_rollup_recent
+    (incluye las de commit tardío detrás de la marca), así la serie está al
+    día sin recorrer el historial.
+    start/end deben venir alineados al bucket.
+    """
+    table, bucket_col, bucket_expr = ROLLUP_GRANULARITIES[granularity]
+    if group_by is not None and group_by not in ROLLUP_GROUP_COLUMNS:
+        raise ValueError(f"group_by inválido: {group_by}")
+
+    columns: List[str] = []
+    filter_params: List[Any] = []
+    for column, value in (
+        ("driver_id", driver_id),
+        ("vehicle_id", vehicle_id),
+        ("alert_type", alert_type),
+        ("severity", severity),
+    ):
+        if value is not None:
+            columns.append(column)
+            filter_params.append(value)
+    rollup_filters = " ".join(f"AND {column} = %s" for column in columns)
+    raw_filters = " ".join(f"AND a.{column} = %s" for column in columns)
+
+    group_select = f"r.{group_by} AS group_key," if group_by else ""
+    group_clause = f", r.{group_by}" if group_by else ""
+
+    query = f"""
+        SELECT
+            r.bucket,
+            {group_select}
+            SUM(r.alert_count) AS alert_count
+        FROM (
+            SELECT {bucket_col} AS bucket, driver_id, vehicle_id, alert_type, severity, alert_count
+            FROM {table}
+            WHERE {bucket_col} >= %s AND {bucket_col} < %s {rollup_filters}
+            UNION ALL
+            SELECT {bucket_expr}, a.driver_id, a.vehicle_id, a.alert_type, a.severity, 1
+            FROM alerts a
+            WHERE a.alert_id > (
+                    SELECT settled_alert_id FROM alert_rollup_watermark WHERE name = 'alerts'
+                  )
+              AND NOT EXISTS (
+                    SELECT 1 FROM alert_rollup_recent rr WHERE rr.alert_id = a.alert_id
+                  )
+              AND a.detected_at >= %s AND a.detected_at < %s {raw_filters}
+        ) r
+        GROUP BY r.bucket{group_clause}
+        ORDER BY r.bucket{group_clause}
+    """
+    params = (start, end, *filter_params, start, end, *filter_params)
+    return db.fetch_all(query, params, prepared=True, replica=True)
+
+
+def list_alert_partitions(db: Database) -> List[Dict[str, Any]]:
+    """
+    Particiones de alerts (12_alerts_partitioning.sql) en orden, con su
+    límite superior tal como lo guarda MySQL ('YYYY-MM-DD hh:mm:ss' entre
+    comillas o MAXVALUE) y las filas estimadas. Vacío si no está particionada.
+    """
+    query = """
+        SELECT
+            PARTITION_NAME        AS name,
+            PARTITION_DESCRIPTION AS less_than,
+            TABLE_ROWS            AS estimated_rows
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = 'alerts'
+          AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """
+    return db.fetch_all(query)
+
+
+def add_alert_partitions(db: Database, months: List[Tuple[str, str]]) -> None:
+    """
+    Divide p_future en particiones mensuales nuevas: months es una lista de
+    (nombre, límite 'YYYY-MM-DD'). Si p_future está vacía es inmediato.
+    """
+    parts = ", ".join(
+        f"PARTITION {name} VALUES LESS THAN ('{less_than}')" for name, less_than in months
+    )
+    db.execute(
+        f"""
+        ALTER TABLE alerts REORGANIZE PARTITION p_future INTO (
+            {parts},
+            PARTITION p_future VALUES LESS THAN (MAXVALUE)
+        )
+        """
+    )
+
+
+def add_alert_partitions_before(db: Database, first: Dict[str, Any], months: List[Tuple[str, str]]) -> None:
+    """
+    Agrega meses anteriores a la primera partición (first, como la devuelve
+    list_alert_partitions) dividiéndola: sin esto, las alertas con fechas
+    más viejas que la primera alerta al particionar caen todas en ella.
+    """
+    parts = ", ".join(
+        f"PARTITION {name} VALUES LESS THAN ('{less_than}')" for name, less_than in months
+    )
+    db.execute(
+        f"""
+        ALTER TABLE alerts REORGANIZE PARTITION {first['name']} INTO (
+            {parts},
+            PARTITION {first['name']} VALUES LESS THAN ({first['less_than']})
+        )
+        """
+    )
+
+
+def get_alert_partition_max_id(db: Database, partition: str) -> Optional[int]:
+    row = db.fetch_one(f"SELECT MAX(alert_id) AS max_alert_id FROM alerts PARTITION ({partition})")
+    return row["max_alert_id"] if row else None
+
+
+def get_rollup_watermark(db: Database) -> int:
+    """
+    Hasta qué alert_id los rollups son definitivos (settled_alert_id): más
+    adelante todavía puede entrar una alerta de commit tardío.
+    """
+    row = db.fetch_one(
+        "SELECT settled_alert_id FROM alert_rollup_watermark WHERE name = 'alerts'"
+    )
+    return int(row["settled_alert_id"]) if row else 0
+
+
+def table_exists(db: Database, table: str) -> bool:
+    query = """
+        SELECT 1 AS found
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """
+    return db.fetch_one(query, (table,)) is not None
+
+
+def exchange_alert_partition(db: Database, partition: str, archive_table: str) -> None:
+    """
+    Mueve las filas de la partición a archive_table (tabla sin particionar
+    con la misma estructura) con EXCHANGE PARTITION: intercambia los
+    tablespaces, no copia filas.
+    """
+    if not table_exists(db, archive_table):
+        db.execute(f"CREATE TABLE {archive_table} LIKE alerts")
+        db.execute(f"ALTER TABLE {archive_table} REMOVE PARTITIONING")
+    db.execute(f"ALTER TABLE alerts EXCHANGE PARTITION {partition} WITH TABLE {archive_table}")
+
+
+def drop_alert_partition(db: Database, partition: str) -> None:
+    db.execute(f"ALTER TABLE alerts DROP PARTITION {partition}")
+
+
+def stream_alert_partition(
+    db: Database,
+    partition: str,
+    batch_size: int = 5000,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Filas de una partición mensual de alerts, ordenadas por vehículo y fecha
+    (idx_alerts_vehicle dentro de la partición), en lotes. Para exportar el
+    mes a almacenamiento frío antes de borrar la partición.
+    """
+    query = f"""
+        SELECT
+            alert_id,
+            vehicle_id,
+            driver_id,
+            trip_id,
+            alert_type,
+            severity,
+            message,
+            detected_at,
+            created_at,
+            updated_at
+        FROM alerts PARTITION ({partition})
+        ORDER BY vehicle_id, detected_at, alert_id
+    """
+    return db.stream_all(query, batch_size=batch_size)
 
 
 # ---------------------------
@@ -891,32 +2236,12 @@ def list_issues(
     db: Database,
     status: Optional[str] = None,
     limit: int = 100,
+    before: Optional[Tuple[Any, int]] = None,
 ) -> List[Dict[str, Any]]:
-    if status:
-        query = """
-            SELECT 
-                i.issue_id,
-                i.vehicle_id,
-                i.driver_id,
-                i.trip_id,
-                i.issue_type,
-                i.description,
-                i.status,
-                i.reported_at,
-                i.resolved_at,
-                CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
-                v.plate AS vehicle_plate,
-                v.brand AS vehicle_brand,
-                v.model AS vehicle_model
-            FROM issues i
-            LEFT JOIN drivers d ON i.driver_id = d.driver_id
-            LEFT JOIN vehicles v ON i.vehicle_id = v.vehicle_id
-            WHERE i.status = %s
-            ORDER BY i.reported_at DESC
-            LIMIT %s
-        """
-        return db.fetch_all(query, (status, limit))
-    query = """
+    keyset, keyset_params = keyset_condition("i.reported_at", "i.issue_id", before)
+    status_filter = "i.status = %s" if status else "1=1"
+    status_params: Tuple[Any, ...] = (status,) if status else ()
+    query = f"""
         SELECT 
             i.issue_id,
             i.vehicle_id,
@@ -934,10 +2259,11 @@ def list_issues(
         FROM issues i
         LEFT JOIN drivers d ON i.driver_id = d.driver_id
         LEFT JOIN vehicles v ON i.vehicle_id = v.vehicle_id
-        ORDER BY i.reported_at DESC
+        WHERE {status_filter} AND {keyset}
+        ORDER BY i.reported_at DESC, i.issue_id DESC
         LIMIT %s
     """
-    return db.fetch_all(query, (limit,))
+    return db.fetch_all(query, (*status_params, *keyset_params, limit))
 
 
 # ---------------------------
@@ -971,6 +2297,135 @@ def list_devices(db: Database, status: Optional[str] = None) -> List[Dict[str, A
     return db.fetch_all(query)
 
 
+# ---------------------------
+# BPM (telemetría del reloj)
+# ---------------------------
+
+def insert_bpm_samples(
+    db: Union[Database, Transaction],
+    samples: List[Tuple[int, datetime, int]],
+) -> List[Tuple[int, datetime, int]]:
+    """
+    Inserta muestras (trip_id, sampled_at, bpm) en un solo INSERT multi-fila
+    y devuelve las que se guardaron: las que ya estaban (mismo viaje e
+    instante, p. ej. un reintento del lote) se descartan antes, así el
+    rollup por minuto sólo suma muestras nuevas. sampled_at debe venir en
+    milisegundos (la precisión de la columna).
+
+    Dentro de db.transaction() la lectura de claves existentes bloquea los
+    rangos (FOR UPDATE): otro escritor con las mismas muestras espera al
+    commit y las ve como existentes.
+    """
+    if not samples:
+        return []
+    ranges: Dict[int, Tuple[datetime, datetime]] = {}
+    for trip_id, sampled_at, _ in samples:
+        low, high = ranges.get(trip_id, (sampled_at, sampled_at))
+        ranges[trip_id] = (min(low, sampled_at), max(high, sampled_at))
+    conditions = " OR ".join(["(trip_id = %s AND sampled_at BETWEEN %s AND %s)"] * len(ranges))
+    params = tuple(value for trip_id, (low, high) in ranges.items() for value in (trip_id, low, high))
+    existing = {
+        (row["trip_id"], row["sampled_at"])
+        for row in db.fetch_all(
+            f"SELECT trip_id, sampled_at FROM bpm_samples WHERE {conditions} FOR UPDATE",
+            params,
+        )
+    }
+    new_samples = [s for s in samples if (s[0], s[1]) not in existing]
+    query = "INSERT IGNORE INTO bpm_samples (trip_id, sampled_at, bpm) VALUES (%s, %s, %s)"
+    db.executemany(query, new_samples)
+    return new_samples
+
+
+def upsert_bpm_minutes(
+    db: Union[Database, Transaction],
+    minutes: List[Tuple[int, datetime, int, int, int, int]],
+) -> None:
+    """
+    Suma al rollup por minuto: (trip_id, minute_start, samples, bpm_min,
+    bpm_max, bpm_sum) ya agregados por el backend para el lote.
+    """
+    query = """
+        INSERT INTO bpm_minute (trip_id, minute_start, samples, bpm_min, bpm_max, bpm_sum)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            samples = samples + VALUES(samples),
+            bpm_min = LEAST(bpm_min, VALUES(bpm_min)),
+            bpm_max = GREATEST(bpm_max, VALUES(bpm_max)),
+            bpm_sum = bpm_sum + VALUES(bpm_sum)
+    """
+    db.executemany(query, minutes)
+
+
+def purge_bpm_samples(db: Database, retention_hours: int, batch_size: int = 10000) -> int:
+    """
+    Borra muestras crudas más viejas que la ventana, por lotes (cada DELETE
+    es corto y no bloquea los inserts). Devuelve cuántas borró.
+    """
+    query = """
+        DELETE FROM bpm_samples
+        WHERE sampled_at < NOW() - INTERVAL %s HOUR
+        LIMIT %s
+    """
+    deleted = 0
+    while True:
+        count = db.execute(query, (retention_hours, batch_size), return_rowcount=True) or 0
+        deleted += count
+        if count < batch_size:
+            return deleted
+
+
+def get_trip_bpm_samples(db: Database, trip_id: int) -> List[Dict[str, Any]]:
+    """
+    Serie cruda del viaje (sólo lo que sigue dentro de la ventana cruda).
+    """
+    query = """
+        SELECT sampled_at AS ts, bpm AS bpm_min, bpm AS bpm_avg, bpm AS bpm_max, 1 AS samples
+        FROM bpm_samples
+        WHERE trip_id = %s
+        ORDER BY sampled_at
+    """
+    return db.fetch_all(query, (trip_id,), prepared=True, replica=True)
+
+
+def get_trip_bpm_series(
+    db: Database,
+    trip_id: int,
+    resolution_seconds: int = 60,
+) -> List[Dict[str, Any]]:
+    """
+    Serie del viaje desde bpm_minute en buckets de resolution_seconds
+    (múltiplo de 60): min / promedio ponderado / max y cantidad de muestras.
+    """
+    if resolution_seconds <= 60:
+        query = """
+            SELECT
+                minute_start AS ts,
+                bpm_min,
+                ROUND(bpm_sum / samples, 1) AS bpm_avg,
+                bpm_max,
+                samples
+            FROM bpm_minute
+            WHERE trip_id = %s
+            ORDER BY minute_start
+        """
+        return db.fetch_all(query, (trip_id,), prepared=True, replica=True)
+
+    query = """
+        SELECT
+            FROM_UNIXTIME(FLOOR(UNIX_TIMESTAMP(minute_start) / %s) * %s) AS ts,
+            MIN(bpm_min) AS bpm_min,
+            ROUND(SUM(bpm_sum) / SUM(samples), 1) AS bpm_avg,
+            MAX(bpm_max) AS bpm_max,
+            SUM(samples) AS samples
+        FROM bpm_minute
+        WHERE trip_id = %s
+        GROUP BY ts
+        ORDER BY ts
+    """
+    return db.fetch_all(query, (resolution_seconds, resolution_seconds, trip_id), prepared=True, replica=True)
+
+
 # =====================================================
 # 3. Funciones para vistas (dashboards)
 # =====================================================
@@ -982,6 +2437,89 @@ def get_active_trips(db: Database) -> List[Dict[str, Any]]:
     return db.select_from_view("v_active_trips")
 
 
+def list_active_trip_summaries(
+    db: Database,
+    trip_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Viajes IN_PROGRESS con driver/vehículo y los contadores de alertas de
+    trips (09_trip_alert_counters.sql). started_age_s es la antigüedad del
+    viaje según el reloj de MySQL.
+    """
+    trip_filter = "AND t.trip_id = %s" if trip_id is not None else ""
+    query = f"""
+        SELECT 
+            t.trip_id,
+            t.driver_id,
+            t.vehicle_id,
+            t.started_at,
+            t.origin,
+            t.destination,
+            CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
+            v.plate AS vehicle_plate,
+            v.brand,
+            v.model,
+            t.high_alerts AS critical_alerts,
+            t.total_alerts,
+            t.last_alert_at AS last_alert_time,
+            TIMESTAMPDIFF(MINUTE, t.started_at, NOW()) AS duration_minutes,
+            TIMESTAMPDIFF(SECOND, t.started_at, NOW()) AS started_age_s
+        FROM trips t
+        JOIN drivers d ON d.driver_id = t.driver_id
+        JOIN vehicles v ON v.vehicle_id = t.vehicle_id
+        WHERE t.status = 'IN_PROGRESS' {trip_filter}
+        ORDER BY t.high_alerts DESC, t.total_alerts DESC
+    """
+    params = (trip_id,) if trip_id is not None else None
+    return db.fetch_all(query, params)
+
+
+def get_dashboard_counters(db: Database) -> Dict[str, Any]:
+    """
+    Contadores del dashboard en una sola consulta. Cada subconsulta usa un
+    índice (alerts.detected_at, issues.status, trips.status) en lugar de
+    traer los listados completos al cliente.
+    """
+    query = """
+        SELECT
+            (SELECT COUNT(*) FROM alerts
+              WHERE detected_at >= CURDATE()) AS alerts_today,
+            (SELECT COUNT(*) FROM alerts
+              WHERE detected_at >= CURDATE()
+                AND severity IN ('HIGH', 'CRITICAL')) AS critical_alerts_today,
+            (SELECT COUNT(*) FROM vehicles) AS vehicles_total,
+            (SELECT COUNT(*) FROM vehicles
+              WHERE status <> 'INACTIVE') AS vehicles_operational,
+            (SELECT COUNT(*) FROM drivers) AS drivers_total,
+            (SELECT COUNT(*) FROM drivers
+              WHERE status = 'ACTIVE') AS drivers_active,
+            (SELECT COUNT(*) FROM driver_vehicle_assignments
+              WHERE assigned_to IS NULL) AS drivers_on_duty,
+            (SELECT COUNT(*) FROM issues
+              WHERE status = 'OPEN') AS open_issues
+    """
+    return db.fetch_one(query, prepared=True, replica=True) or {}
+
+
+def list_alerts_today(db: Database, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Últimas alertas del día con nombre de driver y patente.
+    """
+    query = """
+        SELECT
+            a.*,
+            CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
+            v.plate AS vehicle_plate
+        FROM alerts a
+        JOIN drivers d ON d.driver_id = a.driver_id
+        JOIN vehicles v ON v.vehicle_id = a.vehicle_id
+        WHERE a.detected_at >= CURDATE()
+        ORDER BY a.detected_at DESC, a.alert_id DESC
+        LIMIT %s
+    """
+    return db.fetch_all(query, (limit,), prepared=True, replica=True)
+
+
 def get_vehicle_last_alert(
     db: Database,
     vehicle_id: Optional[int] = None,
@@ -1013,11 +2551,12 @@ def get_trip_alerts_summary(
     trip_id: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     if trip_id is None:
-        return db.select_from_view("v_trip_alerts_summary")
+        return db.select_from_view("v_trip_alerts_summary", replica=True)
     return db.select_from_view(
         "v_trip_alerts_summary",
         "WHERE trip_id = %s",
         (trip_id,),
+        replica=True,
     )
 
 
@@ -1025,12 +2564,17 @@ def get_vehicle_health(
     db: Database,
     vehicle_id: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
+    """
+    La vista lee la última alerta y los issues abiertos de vehicle_status,
+    así que el costo es por vehículo, no por historial de alertas.
+    """
     if vehicle_id is None:
-        return db.select_from_view("v_vehicle_health")
+        return db.select_from_view("v_vehicle_health", replica=True)
     return db.select_from_view(
         "v_vehicle_health",
         "WHERE vehicle_id = %s",
         (vehicle_id,),
+        replica=True,
     )
 
 
@@ -0,0 +1,225 @@
+"""
+query_stats.py
+
+Métricas por consulta para Database / AsyncDatabase.
+
+Cada sentencia se agrupa por su huella (fingerprint): el SQL sin literales,
+con espacios colapsados y listas de placeholders (`IN (%s, %s, ...)`,
+`VALUES (...), (...)`) reducidas a una sola. Por huella se acumulan
+llamadas, errores, tiempo total/máximo, filas y espera por conexión del
+pool. Las que superan DB_SLOW_QUERY_MS van al slow-query log (stdout y un
+buffer en memoria) con los parámetros reemplazados por su tipo.
+
+El costo por consulta es un par de perf_counter, la huella cacheada por
+texto SQL y una actualización de contadores bajo lock.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_WHITESPACE = re.compile(r"\s+")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+
+FINGERPRINT_CACHE_SIZE = 2048
+MAX_FINGERPRINTS = 1000
+OTHER_FINGERPRINT = "(other)"
+ORDER_FIELDS = ("total_ms", "calls", "mean_ms", "max_ms", "rows", "wait_ms", "errors")
+
+
+def fingerprint(query: str) -> str:
+    """
+    Huella normalizada de una sentencia: mismos statements con distintos
+    valores o distinta cantidad de placeholders comparten huella.
+    """
+    text = _STRING.sub("?", query)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    text = _LIST.sub("(?+)", text)
+    return _ROWS.sub("(?+)...", text)
+
+
+def redact(params: Optional[Sequence[Any]]) -> List[str]:
+    """Parámetros reemplazados por el nombre de su tipo."""
+    if not params:
+        return []
+    if isinstance(params, dict):
+        return [f"{key}={type(value).__name__}" for key, value in params.items()]
+    return [type(value).__name__ for value in params]
+
+
+class _Entry:
+    __slots__ = ("calls", "errors", "total", "max", "rows", "wait")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.wait = 0.0
+
+
+class QueryTimer:
+    """
+    Mide una sentencia: `with query_stats.track(query, params, wait) as t:`
+    y se asigna `t.rows` antes de salir. Si sale por excepción cuenta como
+    error.
+    """
+
+    __slots__ = ("_stats", "_query", "_params", "_wait", "_started", "rows")
+
+    def __init__(self, stats: "QueryStats", query: str, params: Any, wait: float) -> None:
+        self._stats = stats
+        self._query = query
+        self._params = params
+        self._wait = wait
+        self._started = 0.0
+        self.rows = 0
+
+    def __enter__(self) -> "QueryTimer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stats.record(
+            self._query,
+            time.perf_counter() - self._started,
+            self.rows,
+            self._wait,
+            self._params,
+            # GeneratorExit: el consumidor de un stream lo cerró antes del final
+            error=exc_type is not None and not issubclass(exc_type, GeneratorExit),
+        )
+
+
+class _NoopTimer:
+    __slots__ = ("rows",)
+
+    def __init__(self) -> None:
+        self.rows = 0
+
+    def __enter__(self) -> "_NoopTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.enabled = os.getenv("DB_QUERY_STATS", "true").lower() in ("1", "true", "yes")
+        self.slow_seconds = float(os.getenv("DB_SLOW_QUERY_MS", "500")) / 1000
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=int(os.getenv("DB_SLOW_QUERY_LOG_SIZE", "200")))
+        self._since = datetime.now()
+
+    def _fingerprint(self, query: str) -> str:
+        cached = self._fingerprints.get(query)
+        if cached is None:
+            cached = fingerprint(query)
+            if len(self._fingerprints) < FINGERPRINT_CACHE_SIZE:
+                self._fingerprints[query] = cached
+        return cached
+
+    def track(self, query: str, params: Any = None, wait: float = 0.0):
+        if not self.enabled:
+            return _NoopTimer()
+        return QueryTimer(self, query, params, wait)
+
+    def record(
+        self,
+        query: str,
+        duration: float,
+        rows: int,
+        wait: float,
+        params: Any = None,
+        *,
+        error: bool = False,
+    ) -> None:
+        key = self._fingerprint(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= MAX_FINGERPRINTS:
+                    key = OTHER_FINGERPRINT
+                    entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = _Entry()
+            entry.calls += 1
+            entry.total += duration
+            entry.wait += wait
+            if duration > entry.max:
+                entry.max = duration
+            if error:
+                entry.errors += 1
+            elif rows and rows > 0:
+                entry.rows += rows
+
+        if duration >= self.slow_seconds:
+            slow = {
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "fingerprint": key,
+                "duration_ms": round(duration * 1000, 3),
+                "rows": rows,
+                "wait_ms": round(wait * 1000, 3),
+                "params": redact(params),
+                "error": error,
+            }
+            self._slow.append(slow)
+            print(
+                f"Slow query {slow['duration_ms']} ms (rows={rows}, wait={slow['wait_ms']} ms"
+                f"{', error' if error else ''}): {key} params={slow['params']}"
+            )
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        """Las `limit` huellas con mayor `order_by`. Tiempos en milisegundos."""
+        if order_by not in ORDER_FIELDS:
+            raise ValueError(f"order_by must be one of {', '.join(ORDER_FIELDS)}")
+        with self._lock:
+            rows = [
+                {
+                    "fingerprint": key,
+                    "calls": entry.calls,
+                    "errors": entry.errors,
+                    "total_ms": round(entry.total * 1000, 3),
+                    "mean_ms": round(entry.total * 1000 / entry.calls, 3),
+                    "max_ms": round(entry.max * 1000, 3),
+                    "rows": entry.rows,
+                    "wait_ms": round(entry.wait * 1000, 3),
+                }
+                for key, entry in self._entries.items()
+            ]
+        rows.sort(key=lambda r: r[order_by], reverse=True)
+        return rows[:limit]
+
+    def slow(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Últimas sentencias lentas, la más reciente primero."""
+        with self._lock:
+            entries = list(self._slow)
+        return entries[::-1][:limit]
+
+    def since(self) -> datetime:
+        return self._since
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._slow.clear()
+            self._since = datetime.now()
+
+
+query_stats = QueryStats()
@@ -54,6 +54,14 @@ def init_db():
         "03_views.sql",
         "04_procedures.sql",
         "05_sample_data.sql",
+        "07_trip_plans.sql",
+        "08_keyset_indexes.sql",
+        "09_trip_alert_counters.sql",
+        "10_vehicle_status.sql",
+        "11_alert_rollups.sql",
+        "12_alerts_partitioning.sql",
+        "13_bpm_samples.sql",
+        "14_driver_full_name.sql",
         "users.sql",
     ]
 
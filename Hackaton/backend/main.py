@@ -2,13 +2,20 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 from core.config import settings
+from core.deps import ReadYourWritesMiddleware, async_db_instance, db_instance, ingest_db_instance
+from core.metrics import MetricsMiddleware
+from core.pagination import NEXT_CURSOR_HEADER
+from database.autoawake_db import PoolTimeoutError
+from routes.admin_router import router as admin_router
 from routes.auth_router import router as auth_router
 from routes.drivers_router import router as drivers_router
 from routes.vehicles_router import router as vehicles_router
@@ -17,13 +24,41 @@ from routes.trips_router import router as trips_router
 from routes.alerts_router import router as alerts_router
 from routes.issues_router import router as issues_router
 from routes.devices_router import router as devices_router
+from routes.fleet_router import router as fleet_router
+from routes.events_router import router as events_router
+from routes.dashboard_router import router as dashboard_router
+from routes.reports_router import router as reports_router
+from routes.metrics_router import router as metrics_router
+from services.alert_partition_service import alert_partition_service
+from services.alert_rollup_service import alert_rollup_service
+from services.bpm_ingest_service import bpm_ingest_service
+from services.event_hub_service import event_hub_service
+from services.fleet_state_service import fleet_state_service
+from services.reference_index_service import reference_index_service
 from services.mqtt_service import mqtt_service
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    mqtt_service.start()
+    await async_db_instance.connect()
+    if db_instance.replicas:
+        await run_in_threadpool(db_instance.replicas.start)
+    # Hidratar el estado en memoria antes de empezar a consumir MQTT
+    await run_in_threadpool(fleet_state_service.ensure_fresh, db_instance)
+    await run_in_threadpool(reference_index_service.warm, ingest_db_instance)
+    event_hub_service.start(asyncio.get_running_loop())
+    bpm_ingest_service.start(ingest_db_instance)
+    mqtt_service.start(ingest_db_instance)
+    alert_rollup_service.start(ingest_db_instance)
+    alert_partition_service.start(ingest_db_instance)
     yield
+    alert_partition_service.stop()
+    alert_rollup_service.stop()
     mqtt_service.stop()
+    bpm_ingest_service.stop()
+    event_hub_service.stop()
+    if db_instance.replicas:
+        db_instance.replicas.stop()
+    await async_db_instance.close()
 
 app = FastAPI(
     title="Backend API",
@@ -41,7 +76,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
+# Read-your-writes de réplicas por request, no por hilo del threadpool
+app.add_middleware(ReadYourWritesMiddleware)
+# Latencia por ruta para /metrics (último en agregarse = más externo)
+app.add_middleware(MetricsMiddleware)
+
+# Pool de MySQL agotado: 503 para que el cliente reintente, no un 500
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        content={"detail": "Database busy, retry later"},
+        status_code=503,
+        headers={"Retry-After": "1"},
+    )
 
 # Ruta para Swagger (equivalente a swagger-ui-express)
 @app.get("/api-docs", include_in_schema=False)
@@ -65,3 +114,9 @@ app.include_router(trips_router)
 app.include_router(alerts_router)
 app.include_router(issues_router)
 app.include_router(devices_router)
+app.include_router(fleet_router)
+app.include_router(events_router)
+app.include_router(dashboard_router)
+app.include_router(reports_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from core.deps import db_instance, get_current_user, ingest_db_instance
+from database.query_stats import ORDER_FIELDS, query_stats
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+@router.get("/db/pools")
+def get_db_pool_stats(
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Métricas de los pools de MySQL (API e ingesta): conexiones en uso,
+    esperas por conexión libre, agotamientos y tiempo de préstamo.
+    """
+    return [db_instance.pool_stats(), ingest_db_instance.pool_stats()]
+
+@router.get("/db/replicas")
+def get_db_replica_stats(
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Estado de las réplicas de lectura (DB_REPLICAS): si están en rotación,
+    atraso de replicación, lecturas atendidas, fallas y su pool.
+    """
+    return db_instance.replicas.stats() if db_instance.replicas else []
+
+@router.get("/db/queries")
+def get_db_query_stats(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query("total_ms"),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Consultas más costosas por huella normalizada (todos los pools y el
+    pool async): llamadas, errores, tiempo total/promedio/máximo, filas y
+    espera por conexión. Tiempos en milisegundos.
+    """
+    if order_by not in ORDER_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"order_by must be one of {', '.join(ORDER_FIELDS)}",
+        )
+    return {
+        "since": query_stats.since(),
+        "enabled": query_stats.enabled,
+        "queries": query_stats.top(limit, order_by),
+    }
+
+@router.delete("/db/queries", status_code=status.HTTP_204_NO_CONTENT)
+def reset_db_query_stats(
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Reinicia los contadores por consulta y el slow-query log.
+    """
+    query_stats.reset()
+
+@router.get("/db/slow-queries")
+def get_db_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Últimas sentencias que superaron DB_SLOW_QUERY_MS, con los parámetros
+    reemplazados por su tipo.
+    """
+    return query_stats.slow(limit)
+
+@router.get("/db/prepared")
+def get_db_prepared_statements(
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Ejecuciones por statement preparado del pool de la API.
+    """
+    return db_instance.prepared_statement_stats()
@@ -1,22 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
+from typing import Any, List, Literal, Optional
 from core.deps import get_current_user, get_db
+from core.pagination import decode_cursor, set_next_cursor
+from core.responses import model_rows
 from database.autoawake_db import (
     Database,
-    log_alert,
+    PoolTimeoutError,
     list_alerts_by_trip,
     list_alerts_by_vehicle,
     list_alerts_by_driver,
-    start_trip,
-    end_trip,
-    get_active_trip_by_pair,
-    get_driver_by_full_name,
-    get_vehicle_by_plate,
-    consume_trip_plan,
+    keyset_condition,
+    alert_filter_conditions,
+    stream_alerts,
 )
-from schemas.crud_schemas import AlertLog, AlertResponse
+from schemas.crud_schemas import AlertBatchResult, AlertLog, AlertResponse
+from services.alert_ingest_service import alert_ingest_service
+from services.export_service import export_service
 from services.mqtt_service import mqtt_service
-from services.telegram_service import telegram_service
 from pydantic import BaseModel
 
 class ControlCommand(BaseModel):
@@ -36,66 +36,13 @@ def create_alert(
     - Si viene trip_id, registra la alerta normal.
     """
     try:
-        if alert.alert_type == "TRIP":
-            driver_id = alert.driver_id
-            vehicle_id = alert.vehicle_id
-            if not driver_id and alert.driver_name:
-                driver = get_driver_by_full_name(db, alert.driver_name)
-                driver_id = driver["driver_id"] if driver else None
-            if not vehicle_id and alert.vehicle_plate:
-                vehicle = get_vehicle_by_plate(db, alert.vehicle_plate)
-                vehicle_id = vehicle["vehicle_id"] if vehicle else None
-
-            if not (driver_id and vehicle_id):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="driver_id/driver_name y vehicle_id/vehicle_plate son necesarios para TRIP",
-                )
-
-            active_trip = get_active_trip_by_pair(db, driver_id, vehicle_id)
-            if active_trip:
-                end_trip(db, active_trip["trip_id"], None)
-                trip_id = active_trip["trip_id"]
-                action_msg = alert.message or "Trip finalizado automáticamente por alerta TRIP"
-            else:
-                plan = consume_trip_plan(db, driver_id, vehicle_id)
-                origin = alert.origin or (plan["origin"] if plan else "Origen automático")
-                destination = alert.destination or (plan["destination"] if plan else "Destino asignado")
-                trip_id = start_trip(db, vehicle_id, driver_id, origin, destination)
-                action_msg = alert.message or "Trip iniciado automáticamente por alerta TRIP"
-
-            log_alert(db, trip_id, "TRIP", alert.severity, action_msg)
-            telegram_service.send_alert(
-                db,
-                "TRIP",
-                alert.severity,
-                action_msg,
-                trip_id,
-            )
-            return {"message": "TRIP alert processed", "trip_id": trip_id}
-
-        if not alert.trip_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="trip_id es requerido para registrar alertas normales",
-            )
-
-        log_alert(
-            db,
-            alert.trip_id,
-            alert.alert_type,
-            alert.severity,
-            alert.message
-        )
-        telegram_service.send_alert(
-            db,
-            alert.alert_type,
-            alert.severity,
-            alert.message,
-            alert.trip_id,
+        return alert_ingest_service.ingest(db, alert.model_dump())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
         )
-        return {"message": "Alert logged successfully"}
-    except HTTPException:
+    except PoolTimeoutError:
         raise
     except Exception as e:
         raise HTTPException(
@@ -103,65 +50,92 @@ def create_alert(
             detail=str(e)
         )
 
+@router.post("/batch", response_model=AlertBatchResult)
+def create_alerts_batch(
+    alerts: List[Any] = Body(..., description="Alertas con el formato de POST /alerts/ (AlertLog)"),
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Lote de alertas (backlog offline de un dispositivo, gateway con varios
+    vehículos). Las alertas normales se guardan juntas en una transacción
+    y se notifican en un solo mensaje; el resultado es por alerta, en el
+    mismo orden.
+    El cuerpo no se valida como List[AlertLog]: el tamaño se controla antes
+    de validar y cada alerta inválida se informa en su resultado, sin
+    rechazar el lote entero con 422.
+    """
+    try:
+        return alert_ingest_service.ingest_batch(db, alerts, model=AlertLog)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
 @router.get("/trip/{trip_id}", response_model=List[AlertResponse])
 def get_alerts_by_trip(
     trip_id: int,
+    response: Response,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
-    return list_alerts_by_trip(db, trip_id, limit)
+    rows = list_alerts_by_trip(db, trip_id, limit, before=decode_cursor(cursor))
+    set_next_cursor(response, rows, limit, "detected_at", "alert_id")
+    return model_rows(rows, AlertResponse, response)
 
 @router.get("/vehicle/{vehicle_id}", response_model=List[AlertResponse])
 def get_alerts_by_vehicle(
     vehicle_id: int,
+    response: Response,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
-    return list_alerts_by_vehicle(db, vehicle_id, limit)
+    rows = list_alerts_by_vehicle(db, vehicle_id, limit, before=decode_cursor(cursor))
+    set_next_cursor(response, rows, limit, "detected_at", "alert_id")
+    return model_rows(rows, AlertResponse, response)
 
 @router.get("/driver/{driver_id}", response_model=List[AlertResponse])
 def get_alerts_by_driver(
     driver_id: int,
+    response: Response,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
-    return list_alerts_by_driver(db, driver_id, limit)
+    rows = list_alerts_by_driver(db, driver_id, limit, before=decode_cursor(cursor))
+    set_next_cursor(response, rows, limit, "detected_at", "alert_id")
+    return model_rows(rows, AlertResponse, response)
 
 @router.get("/", response_model=List[AlertResponse])
 def get_all_alerts(
+    response: Response,
     driver_id: int = None,
     vehicle_id: int = None,
     start_date: str = None,
     end_date: str = None,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
     """
     Obtiene alertas con filtros opcionales.
+    Paginación por cursor: enviar en ?cursor= el header X-Next-Cursor de la página anterior.
     """
+    before = decode_cursor(cursor)
     try:
-        conditions = []
-        params = []
-
-        if driver_id:
-            conditions.append("a.driver_id = %s")
-            params.append(driver_id)
-
-        if vehicle_id:
-            conditions.append("a.vehicle_id = %s")
-            params.append(vehicle_id)
+        conditions, params = alert_filter_conditions(driver_id, vehicle_id, start_date, end_date)
 
-        if start_date:
-            conditions.append("a.detected_at >= %s")
-            params.append(start_date)
-
-        if end_date:
-            conditions.append("a.detected_at <= %s")
-            params.append(end_date)
+        if before:
+            keyset, keyset_params = keyset_condition("a.detected_at", "a.alert_id", before)
+            conditions.append(keyset)
+            params.extend(keyset_params)
 
         where_clause = " AND ".join(conditions) if conditions else "1=1"
 
@@ -174,12 +148,16 @@ def get_all_alerts(
             JOIN drivers d ON d.driver_id = a.driver_id
             JOIN vehicles v ON v.vehicle_id = a.vehicle_id
             WHERE {where_clause}
-            ORDER BY a.detected_at DESC
+            ORDER BY a.detected_at DESC, a.alert_id DESC
             LIMIT %s
         """
         params.append(limit)
 
-        return db.fetch_all(query, tuple(params))
+        rows = db.fetch_all(query, tuple(params), replica=True)
+        set_next_cursor(response, rows, limit, "detected_at", "alert_id")
+        return model_rows(rows, AlertResponse, response)
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         print(f"Error in get_all_alerts: {str(e)}")
         raise HTTPException(
@@ -187,6 +165,23 @@ def get_all_alerts(
             detail=f"Error fetching alerts: {str(e)}"
         )
 
+@router.get("/export")
+def export_alerts(
+    driver_id: int = None,
+    vehicle_id: int = None,
+    start_date: str = None,
+    end_date: str = None,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Exporta alertas (mismos filtros que GET /alerts/) como NDJSON o CSV en streaming,
+    sin límite de filas ni validación por fila.
+    """
+    batches = stream_alerts(db, driver_id, vehicle_id, start_date, end_date)
+    return export_service.stream_response(batches, export_format, "alerts")
+
 @router.post("/control/apagar_buzzer")
 def control_apagar_buzzer(
     current_user: dict = Depends(get_current_user)
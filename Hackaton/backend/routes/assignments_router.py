@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from typing import List
+from core.bulk import bulk_openapi, run_bulk_import
 from core.deps import get_current_user, get_db
+from core.responses import model_rows, not_modified
 from database.autoawake_db import (
     Database,
+    PoolTimeoutError,
+    collection_versions,
     create_assignment,
     close_assignment,
     list_assignments,
     get_current_assignment_by_driver,
     get_current_assignment_by_vehicle,
 )
-from schemas.crud_schemas import AssignmentCreate, AssignmentResponse
+from schemas.crud_schemas import AssignmentCreate, AssignmentImport, AssignmentResponse, BulkImportResult
+from services.bulk_import_service import bulk_import_service
 
 router = APIRouter(prefix="/assignments", tags=["Assignments"])
 
@@ -58,14 +63,32 @@ def create_new_assignment(
         return created_assignment
     except HTTPException:
         raise
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+@router.post("/bulk", response_model=BulkImportResult, openapi_extra=bulk_openapi(AssignmentImport))
+async def bulk_import_assignments(
+    request: Request,
+    dry_run: bool = False,
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Asignaciones masivas (JSON o CSV: driver_id o license_number, vehicle_id o plate).
+    Conductores o vehículos ya asignados (o repetidos) se informan en `conflicts`.
+    Con dry_run=true sólo valida y cuenta lo que se insertaría.
+    """
+    return await run_bulk_import(request, bulk_import_service.import_assignments, db, dry_run)
+
 @router.get("/", response_model=List[AssignmentResponse])
 def get_all_assignments(
+    request: Request,
+    response: Response,
     active_only: bool = False,
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
@@ -74,7 +97,10 @@ def get_all_assignments(
     Obtiene todas las asignaciones con información detallada de conductores y vehículos.
     Si active_only=true, solo devuelve asignaciones activas.
     """
-    return list_assignments(db, active_only)
+    cached = not_modified(request, response, collection_versions.etag("assignments", active_only))
+    if cached:
+        return cached
+    return model_rows(list_assignments(db, active_only), AssignmentResponse, response)
 
 @router.get("/driver/{driver_id}", response_model=AssignmentResponse)
 def get_driver_current_assignment(
@@ -122,6 +148,8 @@ def close_driver_assignment(
     try:
         close_assignment(db, assignment_id)
         return {"message": "Asignación cerrada exitosamente"}
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
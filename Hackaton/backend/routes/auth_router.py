@@ -1,16 +1,21 @@
 from fastapi import APIRouter, Depends
 from controllers.auth_controller import AuthController
+from database.autoawake_async_db import AsyncDatabase
 from database.autoawake_db import Database
 from schemas import LoginSchema, RegisterSchema, AuthResponse
-from core.deps import get_current_user, get_db
+from core.deps import get_async_db, get_current_user, get_db
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @router.post("/login", response_model=AuthResponse)
-async def login(credentials: LoginSchema, db: Database = Depends(get_db)):
-    controller = AuthController(db)
-    return controller.login(credentials.email, credentials.password)
+async def login(
+    credentials: LoginSchema,
+    db: Database = Depends(get_db),
+    async_db: AsyncDatabase = Depends(get_async_db),
+):
+    controller = AuthController(db, async_db)
+    return await controller.login_async(credentials.email, credentials.password)
 
 
 @router.post("/register", response_model=AuthResponse)
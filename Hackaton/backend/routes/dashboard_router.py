@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+from core.deps import get_current_user, get_db
+from database.autoawake_db import Database
+from services.dashboard_service import dashboard_service
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+@router.get("/overview")
+def get_dashboard_overview(
+    alerts_limit: int = Query(10, ge=1, le=50),
+    issues_limit: int = Query(6, ge=1, le=50),
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Resumen del panel admin en una sola respuesta: contadores (alertas del
+    día, flota, conductores en turno, incidencias abiertas), viajes activos,
+    últimas alertas e incidencias abiertas. Cacheado DASHBOARD_CACHE_SECONDS.
+    """
+    return dashboard_service.overview(db, alerts_limit, issues_limit)
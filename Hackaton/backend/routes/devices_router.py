@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from core.deps import get_current_user, get_db
+from core.responses import model_rows
 from database.autoawake_db import (
     Database,
+    PoolTimeoutError,
     update_device_status,
     list_devices,
     get_device_by_id,
@@ -26,6 +28,8 @@ def update_status(
             status_update.firmware_version
         )
         return {"message": "Device status updated successfully"}
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -38,4 +42,4 @@ def get_all_devices(
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
-    return list_devices(db, status)
+    return model_rows(list_devices(db, status), DeviceResponse)
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from typing import List
+from core.bulk import bulk_openapi, run_bulk_import
 from core.deps import get_current_user, get_db
+from core.responses import model_rows, not_modified
 from database.autoawake_db import (
     Database,
+    PoolTimeoutError,
+    collection_versions,
     create_driver,
     get_driver_by_id,
     list_drivers,
     deactivate_driver,
     update_driver as update_driver_db,
 )
-from schemas.crud_schemas import DriverCreate, DriverUpdate, DriverResponse
+from schemas.crud_schemas import DriverCreate, DriverUpdate, DriverResponse, BulkImportResult
+from services.bulk_import_service import bulk_import_service
 
 router = APIRouter(prefix="/drivers", tags=["Drivers"])
 
@@ -31,12 +36,28 @@ def create_new_driver(
             "driver_id": driver_id,
             **driver.dict()
         }
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+@router.post("/bulk", response_model=BulkImportResult, openapi_extra=bulk_openapi(DriverCreate))
+async def bulk_import_drivers(
+    request: Request,
+    dry_run: bool = False,
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Alta masiva de conductores (JSON o CSV: first_name, last_name, license_number, status).
+    Las licencias ya existentes o repetidas se informan en `conflicts`.
+    Con dry_run=true sólo valida y cuenta lo que se insertaría.
+    """
+    return await run_bulk_import(request, bulk_import_service.import_drivers, db, dry_run)
+
 @router.get("/{driver_id}", response_model=DriverResponse)
 def get_driver(
     driver_id: int,
@@ -53,11 +74,17 @@ def get_driver(
 
 @router.get("/", response_model=List[DriverResponse])
 def get_all_drivers(
+    request: Request,
+    response: Response,
     status: str = None,
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
-    return list_drivers(db, status)
+    # La versión se lee antes de consultar: una escritura concurrente sólo invalida de más
+    cached = not_modified(request, response, collection_versions.etag("drivers", status))
+    if cached:
+        return cached
+    return model_rows(list_drivers(db, status), DriverResponse, response)
 
 @router.put("/{driver_id}", response_model=DriverResponse)
 def update_driver_info(
@@ -88,6 +115,8 @@ def update_driver_info(
         # Obtener y retornar el conductor actualizado
         updated_driver = get_driver_by_id(db, driver_id)
         return updated_driver
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
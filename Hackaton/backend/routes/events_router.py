@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from core.deps import get_current_user, get_stream_user
+from services.event_hub_service import event_hub_service
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    vehicle_id: Optional[int] = None,
+    driver_id: Optional[int] = None,
+    types: Optional[List[str]] = Query(None, description="alert, trip, bpm"),
+    last_event_id: Optional[str] = Query(None),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: dict = Depends(get_stream_user),
+):
+    """
+    Server-Sent Events con alertas, inicio/fin de viajes y BPM en vivo.
+    Filtros opcionales por vehículo/driver y tipo de evento. El navegador
+    reenvía Last-Event-ID al reconectar y se reciben los eventos perdidos.
+    Auth: header Bearer o ?token= (EventSource no permite headers).
+    """
+    events = event_hub_service.subscribe(
+        vehicle_id=vehicle_id,
+        driver_id=driver_id,
+        event_types=set(types) if types else None,
+        last_event_id=last_event_id_header or last_event_id,
+    )
+
+    async def event_stream():
+        yield "retry: 3000\n\n"
+        try:
+            async for event in events:
+                if await request.is_disconnected():
+                    break
+                if event is None:
+                    yield ": ping\n\n"
+                    continue
+                event_id, event_type, data = event
+                yield f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/stats")
+def get_event_stats(current_user: dict = Depends(get_current_user)):
+    return event_hub_service.stats()
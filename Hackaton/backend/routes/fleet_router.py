@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends
+from typing import Optional
+from core.deps import get_current_user, get_db
+from database.autoawake_db import (
+    Database,
+    list_active_trip_summaries,
+    get_vehicle_last_alert,
+)
+from services.fleet_state_service import fleet_state_service
+
+router = APIRouter(prefix="/fleet", tags=["Fleet"])
+
+@router.get("/active-trips")
+def get_live_active_trips(
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Viajes en curso con sus contadores de alertas, desde memoria.
+    """
+    if fleet_state_service.ensure_fresh(db):
+        return fleet_state_service.active_trips()
+    return list_active_trip_summaries(db)
+
+@router.get("/last-alerts")
+def get_live_last_alerts(
+    vehicle_id: Optional[int] = None,
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Última alerta por vehículo, desde memoria.
+    """
+    if fleet_state_service.ensure_fresh(db):
+        return fleet_state_service.last_alerts(vehicle_id)
+    return get_vehicle_last_alert(db, vehicle_id)
+
+@router.get("/alert-counts")
+def get_live_alert_counts(
+    minutes: Optional[int] = None,
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Alertas por severidad en la ventana móvil (por defecto FLEET_STATE_WINDOW_MINUTES).
+    """
+    fleet_state_service.ensure_fresh(db)
+    return fleet_state_service.alert_counts(minutes)
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import List, Optional
 from core.deps import get_current_user, get_db
+from core.pagination import decode_cursor, set_next_cursor
+from core.responses import model_rows
 from database.autoawake_db import (
     Database,
+    PoolTimeoutError,
     open_issue,
     close_issue,
     update_issue_status,
@@ -28,6 +31,8 @@ def create_issue(
             issue.description
         )
         return {"message": "Issue opened successfully"}
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -49,6 +54,8 @@ def update_existing_issue_status(
             )
         update_issue_status(db, issue_id, new_status)
         return {"message": f"Issue status updated to {new_status} successfully"}
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -64,6 +71,8 @@ def close_existing_issue(
     try:
         close_issue(db, issue_id)
         return {"message": "Issue closed successfully"}
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -72,9 +81,13 @@ def close_existing_issue(
 
 @router.get("/", response_model=List[IssueResponse])
 def get_all_issues(
+    response: Response,
     status: str = None,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
-    return list_issues(db, status, limit)
+    rows = list_issues(db, status, limit, before=decode_cursor(cursor))
+    set_next_cursor(response, rows, limit, "reported_at", "issue_id")
+    return model_rows(rows, IssueResponse, response)
@@ -0,0 +1,99 @@
+from typing import List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from core.deps import db_instance, ingest_db_instance
+from core.metrics import Family, metrics
+from database.query_stats import MAX_FINGERPRINTS, query_stats
+from services.bpm_ingest_service import bpm_ingest_service
+from services.event_hub_service import event_hub_service
+
+router = APIRouter(tags=["Metrics"])
+
+def _pool_families() -> List[Family]:
+    pools = [db_instance.pool_stats(), ingest_db_instance.pool_stats()]
+    replicas = db_instance.replicas.stats() if db_instance.replicas else []
+    pools.extend(replica["pool"] for replica in replicas if replica["pool"])
+
+    size = Family("autoawake_db_pool_size", "gauge", "Connections per MySQL pool.")
+    in_use = Family("autoawake_db_pool_in_use", "gauge", "Connections currently checked out.")
+    checkouts = Family("autoawake_db_pool_checkouts_total", "counter", "Connection checkouts.")
+    waits = Family("autoawake_db_pool_waits_total", "counter", "Checkouts that had to wait for a free connection.")
+    wait_s = Family("autoawake_db_pool_wait_seconds_total", "counter", "Time spent waiting for a free connection.")
+    timeouts = Family("autoawake_db_pool_timeouts_total", "counter", "Checkouts that gave up (pool exhausted).")
+    held_s = Family("autoawake_db_pool_checkout_seconds_total", "counter", "Time connections were held by callers.")
+    for pool in pools:
+        name = pool["pool_name"]
+        size.add(pool["pool_size"], pool=name)
+        in_use.add(pool["in_use"], pool=name)
+        checkouts.add(pool["checkouts"], pool=name)
+        waits.add(pool["waits"], pool=name)
+        wait_s.add(pool["wait_ms_total"] / 1000, pool=name)
+        timeouts.add(pool["timeouts"], pool=name)
+        held_s.add(pool["checkout_ms_total"] / 1000, pool=name)
+
+    healthy = Family("autoawake_db_replica_healthy", "gauge", "1 if the read replica is in rotation.")
+    lag = Family("autoawake_db_replica_lag_seconds", "gauge", "Replication lag seen by the last health check.")
+    reads = Family("autoawake_db_replica_reads_total", "counter", "Reads routed to the replica.")
+    for replica in replicas:
+        healthy.add(1 if replica["healthy"] else 0, replica=replica["address"])
+        lag.add(replica["lag_seconds"], replica=replica["address"])
+        reads.add(replica["reads"], replica=replica["address"])
+    return [size, in_use, checkouts, waits, wait_s, timeouts, held_s, healthy, lag, reads]
+
+
+def _query_families() -> List[Family]:
+    calls = Family("autoawake_db_query_calls_total", "counter", "Statements executed, by query fingerprint.")
+    seconds = Family("autoawake_db_query_seconds_total", "counter", "Time spent in statements, by query fingerprint.")
+    errors = Family("autoawake_db_query_errors_total", "counter", "Failed statements, by query fingerprint.")
+    rows = Family("autoawake_db_query_rows_total", "counter", "Rows returned or affected, by query fingerprint.")
+    # Todas las huellas (acotadas por MAX_FINGERPRINTS, más "(other)"): con un
+    # top-N una serie que sale del ranking y vuelve parece un reset del contador
+    for query in query_stats.top(MAX_FINGERPRINTS + 1):
+        fingerprint = query["fingerprint"]
+        calls.add(query["calls"], query=fingerprint)
+        seconds.add(query["total_ms"] / 1000, query=fingerprint)
+        errors.add(query["errors"], query=fingerprint)
+        rows.add(query["rows"], query=fingerprint)
+
+    prepared = db_instance.prepared_statement_stats()
+    executions = sum(stmt["executions"] for stmt in prepared)
+    prepares = sum(stmt["prepares"] for stmt in prepared)
+    cache = Family(
+        "autoawake_prepared_statement_cache_total",
+        "counter",
+        "Prepared statement lookups on the API pool (hit = reused, miss = prepared).",
+    )
+    cache.add(executions - prepares, result="hit").add(prepares, result="miss")
+    return [calls, seconds, errors, rows, cache]
+
+
+def _service_families() -> List[Family]:
+    hub = event_hub_service.stats()
+    bpm = bpm_ingest_service.stats()
+    return [
+        Family("autoawake_events_subscribers", "gauge", "Connected SSE clients.").add(hub["subscribers"]),
+        Family("autoawake_events_published_total", "counter", "Events published to SSE clients.").add(hub["published"]),
+        Family("autoawake_events_disconnected_slow_total", "counter", "SSE clients dropped for falling behind.")
+        .add(hub["disconnected_slow"]),
+        Family("autoawake_bpm_samples_total", "counter", "BPM samples by outcome.")
+        .add(bpm["received"], result="received")
+        .add(bpm["stored"], result="stored")
+        .add(bpm["rejected"], result="rejected")
+        .add(bpm["dropped"], result="dropped"),
+        Family("autoawake_bpm_pending_samples", "gauge", "BPM samples buffered for the next flush.").add(bpm["pending"]),
+    ]
+
+
+metrics.register_collector(_pool_families)
+metrics.register_collector(_query_families)
+metrics.register_collector(_service_families)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Métricas en formato de texto de Prometheus: latencia HTTP por ruta,
+    pools y consultas de MySQL, MQTT, Telegram, caches, SSE y BPM.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Literal, Optional
+from core.deps import get_current_user, get_db
+from database.autoawake_db import Database, get_alert_timeseries
+from services.cold_storage_service import cold_storage_service
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+BUCKET_SIZES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+DEFAULT_RANGES = {"hour": timedelta(hours=24), "day": timedelta(days=30)}
+MAX_BUCKETS = 2000
+Severity = Literal["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+
+def _floor_bucket(value: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+@router.get("/alerts/timeseries")
+def get_alerts_timeseries(
+    granularity: Literal["hour", "day"] = "hour",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    driver_id: Optional[int] = None,
+    vehicle_id: Optional[int] = None,
+    alert_type: Optional[str] = None,
+    severity: Optional[Severity] = None,
+    group_by: Optional[Literal["severity", "alert_type", "driver_id", "vehicle_id"]] = None,
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Serie de alertas por hora o día desde los rollups (11_alert_rollups.sql).
+    El rango se alinea a buckets completos: [inicio del bucket de start_date,
+    fin del bucket de end_date). Por defecto últimas 24 h (hour) o 30 días (day).
+    """
+    bucket = BUCKET_SIZES[granularity]
+    end = _floor_bucket(end_date or datetime.now(), granularity) + bucket
+    start = _floor_bucket(start_date or (end - DEFAULT_RANGES[granularity]), granularity)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date debe ser anterior a end_date",
+        )
+    if (end - start) / bucket > MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Rango demasiado grande: máximo {MAX_BUCKETS} buckets de {granularity}",
+        )
+
+    points = get_alert_timeseries(
+        db,
+        granularity,
+        start,
+        end,
+        driver_id=driver_id,
+        vehicle_id=vehicle_id,
+        alert_type=alert_type,
+        severity=severity,
+        group_by=group_by,
+    )
+    return {
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "group_by": group_by,
+        "points": points,
+    }
+
+
+@router.get("/alerts/history/months")
+def get_alerts_history_months(
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Meses disponibles en el almacenamiento frío (Parquet).
+    """
+    return cold_storage_service.months()
+
+
+@router.get("/alerts/history")
+def get_alerts_history(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    vehicle_id: Optional[int] = None,
+    driver_id: Optional[int] = None,
+    alert_type: Optional[str] = None,
+    severity: Optional[Severity] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Alertas archivadas (fuera de la retención de MySQL) para auditorías,
+    más recientes primero. Los filtros se aplican sobre los archivos Parquet:
+    mes y vehículo descartan directorios, el resto usa las estadísticas de
+    cada row group.
+    """
+    return cold_storage_service.query(
+        start_date=start_date,
+        end_date=end_date,
+        vehicle_id=vehicle_id,
+        driver_id=driver_id,
+        alert_type=alert_type,
+        severity=severity,
+        limit=limit,
+    )
+
+
+@router.get("/alerts/history/summary")
+def get_alerts_history_summary(
+    group_by: Literal["month", "vehicle_id", "driver_id", "alert_type", "severity"] = "month",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    vehicle_id: Optional[int] = None,
+    driver_id: Optional[int] = None,
+    alert_type: Optional[str] = None,
+    severity: Optional[Severity] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Conteo de alertas archivadas agrupado por mes, vehículo, driver, tipo o
+    severidad (reportes de largo plazo).
+    """
+    return cold_storage_service.summary(
+        group_by,
+        start_date=start_date,
+        end_date=end_date,
+        vehicle_id=vehicle_id,
+        driver_id=driver_id,
+        alert_type=alert_type,
+        severity=severity,
+    )
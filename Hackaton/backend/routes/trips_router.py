@@ -1,48 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from datetime import datetime
+from typing import List, Literal, Optional
 from core.deps import get_current_user, get_db
+from core.pagination import decode_cursor, set_next_cursor
+from core.responses import model_rows
 from database.autoawake_db import (
     Database,
+    PoolTimeoutError,
     start_trip,
     end_trip,
     get_trip_by_id,
     list_trips_by_driver,
     list_trips_by_vehicle,
+    keyset_condition,
+    stream_trips,
     create_trip_plan,
     list_trip_plans,
+    list_active_trip_summaries,
+    get_trip_bpm_samples,
+    get_trip_bpm_series,
 )
+from services.alert_ingest_service import alert_ingest_service
+from services.export_service import export_service
+from services.fleet_state_service import fleet_state_service
 from schemas.crud_schemas import TripStart, TripEnd, TripResponse, TripPlanCreate, TripPlanResponse
 
 router = APIRouter(prefix="/trips", tags=["Trips"])
 
+# Resoluciones de la serie de BPM (segundos); raw = muestras crudas
+BPM_RESOLUTIONS = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600}
+BPM_AUTO_MAX_POINTS = 720
+
 @router.get("/", response_model=List[TripResponse])
 def list_all_trips(
+    response: Response,
     status: str = None,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
     """
-    Lista todos los viajes, opcionalmente filtrados por estado
+    Lista todos los viajes, opcionalmente filtrados por estado.
+    Paginación por cursor: enviar en ?cursor= el header X-Next-Cursor de la página anterior.
     """
-    if status:
-        query = """
-            SELECT 
-                t.*,
-                CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
-                v.plate AS vehicle_plate,
-                v.brand AS vehicle_brand,
-                v.model AS vehicle_model
-            FROM trips t
-            JOIN drivers d ON d.driver_id = t.driver_id
-            JOIN vehicles v ON v.vehicle_id = t.vehicle_id
-            WHERE t.status = %s
-            ORDER BY t.started_at DESC
-            LIMIT %s
-        """
-        return db.fetch_all(query, (status, limit))
-    
-    query = """
+    keyset, keyset_params = keyset_condition("t.started_at", "t.trip_id", decode_cursor(cursor))
+    status_filter = "t.status = %s" if status else "1=1"
+    status_params = (status,) if status else ()
+    query = f"""
         SELECT 
             t.*,
             CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
@@ -52,11 +57,30 @@ def list_all_trips(
         FROM trips t
         JOIN drivers d ON d.driver_id = t.driver_id
         JOIN vehicles v ON v.vehicle_id = t.vehicle_id
-        ORDER BY t.started_at DESC
+        WHERE {status_filter} AND {keyset}
+        ORDER BY t.started_at DESC, t.trip_id DESC
         LIMIT %s
     """
-    return db.fetch_all(query, (limit,))
+    rows = db.fetch_all(query, (*status_params, *keyset_params, limit))
+    set_next_cursor(response, rows, limit, "started_at", "trip_id")
+    return model_rows(rows, TripResponse, response)
 
+@router.get("/export")
+def export_trips(
+    driver_id: int = None,
+    vehicle_id: int = None,
+    status: str = None,
+    start_date: str = None,
+    end_date: str = None,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Exporta viajes como NDJSON o CSV en streaming (cursor sin buffer, memoria constante).
+    """
+    batches = stream_trips(db, driver_id, vehicle_id, status, start_date, end_date)
+    return export_service.stream_response(batches, export_format, "trips")
 
 @router.post("/plans", response_model=TripPlanResponse)
 def create_plan(
@@ -74,6 +98,8 @@ def create_plan(
                 detail="No se pudo recuperar el plan creado",
             )
         return created
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -87,7 +113,7 @@ def list_plans(
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
-    return list_trip_plans(db, active_only)
+    return model_rows(list_trip_plans(db, active_only), TripPlanResponse)
 
 @router.post("/", response_model=TripResponse)
 def start_new_trip(
@@ -103,9 +129,12 @@ def start_new_trip(
             trip.origin,
             trip.destination
         )
+        alert_ingest_service.trip_started(db, trip_id)
         # Fetch the created trip to return full details
         created_trip = get_trip_by_id(db, trip_id)
         return created_trip
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -121,7 +150,10 @@ def end_current_trip(
 ):
     try:
         end_trip(db, trip_id, trip_end.status)
+        alert_ingest_service.trip_ended(db, trip_id, trip_end.status)
         return {"message": "Trip ended successfully"}
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -142,23 +174,65 @@ def get_trip(
         )
     return trip
 
+@router.get("/{trip_id}/bpm")
+def get_trip_bpm(
+    trip_id: int,
+    resolution: Literal["auto", "raw", "1m", "5m", "15m", "1h"] = "auto",
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Serie de ritmo cardíaco del viaje: min / promedio / max por bucket.
+    raw lee las muestras crudas (sólo las últimas BPM_RAW_RETENTION_HOURS);
+    el resto sale del rollup por minuto. auto elige la resolución más fina
+    que deja la serie en ~720 puntos según la duración del viaje.
+    """
+    trip = get_trip_by_id(db, trip_id)
+    if not trip:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trip not found"
+        )
+
+    if resolution == "auto":
+        duration_s = ((trip.get("ended_at") or datetime.now()) - trip["started_at"]).total_seconds()
+        resolution = next(
+            (name for name, seconds in BPM_RESOLUTIONS.items()
+             if duration_s / seconds <= BPM_AUTO_MAX_POINTS),
+            "1h",
+        )
+
+    if resolution == "raw":
+        points = get_trip_bpm_samples(db, trip_id)
+    else:
+        points = get_trip_bpm_series(db, trip_id, BPM_RESOLUTIONS[resolution])
+    return {"trip_id": trip_id, "resolution": resolution, "points": points}
+
 @router.get("/driver/{driver_id}", response_model=List[TripResponse])
 def get_trips_by_driver(
     driver_id: int,
+    response: Response,
     limit: int = 50,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
-    return list_trips_by_driver(db, driver_id, limit)
+    rows = list_trips_by_driver(db, driver_id, limit, before=decode_cursor(cursor))
+    set_next_cursor(response, rows, limit, "started_at", "trip_id")
+    return model_rows(rows, TripResponse, response)
 
 @router.get("/vehicle/{vehicle_id}", response_model=List[TripResponse])
 def get_trips_by_vehicle(
     vehicle_id: int,
+    response: Response,
     limit: int = 50,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
-    return list_trips_by_vehicle(db, vehicle_id, limit)
+    rows = list_trips_by_vehicle(db, vehicle_id, limit, before=decode_cursor(cursor))
+    set_next_cursor(response, rows, limit, "started_at", "trip_id")
+    return model_rows(rows, TripResponse, response)
 
 @router.get("/stats/active")
 def get_active_trips_stats(
@@ -166,35 +240,14 @@ def get_active_trips_stats(
     db: Database = Depends(get_db),
 ):
     """
-    Obtiene estadísticas de viajes activos con alertas de somnolencia
+    Obtiene estadísticas de viajes activos con alertas de somnolencia.
+    Se sirve desde el estado en memoria (fleet_state_service); si no está
+    disponible, lee los contadores de trips en la BD.
     """
-    query = """
-        SELECT 
-            t.trip_id,
-            t.driver_id,
-            t.vehicle_id,
-            t.started_at,
-            t.origin,
-            t.destination,
-            CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
-            v.plate AS vehicle_plate,
-            v.brand,
-            v.model,
-            COUNT(DISTINCT CASE WHEN a.severity IN ('CRITICAL', 'HIGH') THEN a.alert_id END) AS critical_alerts,
-            COUNT(DISTINCT a.alert_id) AS total_alerts,
-            MAX(a.detected_at) AS last_alert_time,
-            TIMESTAMPDIFF(MINUTE, t.started_at, NOW()) AS duration_minutes
-        FROM trips t
-        JOIN drivers d ON d.driver_id = t.driver_id
-        JOIN vehicles v ON v.vehicle_id = t.vehicle_id
-        LEFT JOIN alerts a ON a.trip_id = t.trip_id
-        WHERE t.status = 'IN_PROGRESS'
-        GROUP BY t.trip_id, t.driver_id, t.vehicle_id, t.started_at, t.origin, 
-                 t.destination, d.first_name, d.last_name, v.plate, v.brand, v.model
-        ORDER BY critical_alerts DESC, total_alerts DESC
-    """
-    
-    active_trips = db.fetch_all(query)
+    if fleet_state_service.ensure_fresh(db):
+        active_trips = fleet_state_service.active_trips()
+    else:
+        active_trips = list_active_trip_summaries(db)
     
     # Calcular estadísticas generales
     total_active = len(active_trips)
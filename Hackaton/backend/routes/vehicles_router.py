@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from typing import List
+from core.bulk import bulk_openapi, run_bulk_import
 from core.deps import get_current_user, get_db
+from core.responses import model_rows, not_modified
 from database.autoawake_db import (
     Database,
+    PoolTimeoutError,
+    collection_versions,
     create_vehicle,
     get_vehicle_by_id,
     list_vehicles,
     update_vehicle_status,
 )
-from schemas.crud_schemas import VehicleCreate, VehicleResponse, VehicleStatusUpdate
+from schemas.crud_schemas import VehicleCreate, VehicleResponse, VehicleStatusUpdate, BulkImportResult
+from services.bulk_import_service import bulk_import_service
 
 router = APIRouter(prefix="/vehicles", tags=["Vehicles"])
 
@@ -30,12 +35,28 @@ def create_new_vehicle(
             "vehicle_id": vehicle_id,
             **vehicle.dict()
         }
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+@router.post("/bulk", response_model=BulkImportResult, openapi_extra=bulk_openapi(VehicleCreate))
+async def bulk_import_vehicles(
+    request: Request,
+    dry_run: bool = False,
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db),
+):
+    """
+    Alta masiva de vehículos (JSON o CSV: plate, brand, model, status).
+    Las patentes ya existentes o repetidas se informan en `conflicts`.
+    Con dry_run=true sólo valida y cuenta lo que se insertaría.
+    """
+    return await run_bulk_import(request, bulk_import_service.import_vehicles, db, dry_run)
+
 @router.get("/{vehicle_id}", response_model=VehicleResponse)
 def get_vehicle(
     vehicle_id: int,
@@ -52,11 +73,16 @@ def get_vehicle(
 
 @router.get("/", response_model=List[VehicleResponse])
 def get_all_vehicles(
+    request: Request,
+    response: Response,
     status: str = None,
     current_user: dict = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
-    return list_vehicles(db, status)
+    cached = not_modified(request, response, collection_versions.etag("vehicles", status))
+    if cached:
+        return cached
+    return model_rows(list_vehicles(db, status), VehicleResponse, response)
 
 @router.put("/{vehicle_id}/status")
 def update_status(
@@ -36,6 +36,13 @@ class AssignmentCreate(BaseModel):
     driver_id: int
     vehicle_id: int
 
+class AssignmentImport(BaseModel):
+    # Conductor y vehículo por id o por licencia / patente
+    driver_id: Optional[int] = None
+    license_number: Optional[str] = None
+    vehicle_id: Optional[int] = None
+    plate: Optional[str] = None
+
 class AssignmentResponse(BaseModel):
     assignment_id: int
     driver_id: int
@@ -73,6 +80,9 @@ class TripResponse(BaseModel):
     vehicle_plate: Optional[str] = None
     vehicle_brand: Optional[str] = None
     vehicle_model: Optional[str] = None
+    total_alerts: Optional[int] = None
+    high_alerts: Optional[int] = None
+    last_alert_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -110,6 +120,18 @@ class AlertLog(BaseModel):
     origin: Optional[str] = None
     destination: Optional[str] = None
 
+class AlertBatchItemResult(BaseModel):
+    index: int  # posición en el lote
+    status: str  # ok | invalid | error
+    trip_id: Optional[int] = None
+    alert_id: Optional[int] = None
+    error: Optional[str] = None
+
+class AlertBatchResult(BaseModel):
+    received: int
+    logged: int
+    results: List[AlertBatchItemResult]
+
 class AlertResponse(BaseModel):
     alert_id: int
     trip_id: int
@@ -170,3 +192,16 @@ class DeviceResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+# --- BULK IMPORT SCHEMAS ---
+class BulkImportConflict(BaseModel):
+    row: int  # 1 = primera fila de datos
+    field: str
+    value: Optional[str] = None
+    reason: str
+
+class BulkImportResult(BaseModel):
+    total: int
+    inserted: int
+    conflicts: List[BulkImportConflict]
+    dry_run: bool = False
@@ -0,0 +1,238 @@
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from core.config import settings
+from database.autoawake_db import (
+    Database,
+    log_alert,
+    log_alerts,
+    start_trip,
+    end_trip,
+    get_trip_by_id,
+    get_active_trip_by_pair,
+    consume_trip_plan,
+)
+from services.event_hub_service import event_hub_service
+from services.fleet_state_service import fleet_state_service
+from services.reference_index_service import reference_index_service
+from services.telegram_service import telegram_service
+
+
+class AlertIngestService:
+    """
+    Common ingest path for alerts coming from HTTP (POST /alerts/) and MQTT:
+    persists the alert, notifies Telegram, updates the in-memory fleet state
+    and pushes the event to live dashboards (event hub).
+    Raises ValueError for payloads that can't be processed.
+    """
+
+    def __init__(self) -> None:
+        self.batch_max = settings.alert_batch_max_items
+
+    def ingest(self, db: Database, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if payload.get("alert_type") == "TRIP":
+            return self.toggle_trip(db, payload)
+
+        trip_id, alert_type, severity, message = self._parse_alert(payload)
+        self.log(db, trip_id, alert_type, severity, message)
+        return {"message": "Alert logged successfully", "trip_id": trip_id}
+
+    def _parse_alert(self, payload: Dict[str, Any]) -> Tuple[int, str, str, str]:
+        trip_id = payload.get("trip_id")
+        alert_type = payload.get("alert_type")
+        severity = payload.get("severity")
+        message = payload.get("message")
+        if not trip_id:
+            raise ValueError("trip_id es requerido para registrar alertas normales")
+        if not all([alert_type, severity, message]):
+            raise ValueError("Incomplete alert data")
+        try:
+            trip_id = int(trip_id)
+        except (TypeError, ValueError):
+            raise ValueError(f"trip_id inválido: {trip_id}") from None
+        return trip_id, alert_type, severity, message
+
+    def ingest_batch(
+        self,
+        db: Database,
+        payloads: List[Any],
+        model: Optional[Type[BaseModel]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Batch variant of ingest (POST /alerts/batch, MQTT list payloads).
+
+        Normal alerts are validated one by one and then stored together with
+        log_alerts: one transaction and one multi-row INSERT for the whole
+        batch, with a single Telegram message. TRIP items start or end trips,
+        so they go through toggle_trip in their original order after that.
+        Returns per-item results in input order; an invalid item does not
+        stop the rest. With `model` (the HTTP schema), each item is validated
+        against it first and a failing item is reported as invalid.
+        """
+        if len(payloads) > self.batch_max:
+            raise ValueError(f"Batch too large ({len(payloads)} items), the limit is {self.batch_max}")
+
+        payloads = list(payloads)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+        pending: List[Tuple[int, Tuple[int, str, str, str]]] = []
+        trips: List[int] = []
+        for index, payload in enumerate(payloads):
+            if not isinstance(payload, dict):
+                results[index] = self._item(index, "invalid", error="expected an object")
+                continue
+            if model is not None:
+                try:
+                    payload = payloads[index] = model.model_validate(payload).model_dump()
+                except ValidationError as e:
+                    error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                    results[index] = self._item(index, "invalid", error=error)
+                    continue
+            if payload.get("alert_type") == "TRIP":
+                trips.append(index)
+            else:
+                try:
+                    pending.append((index, self._parse_alert(payload)))
+                except ValueError as e:
+                    results[index] = self._item(index, "invalid", error=str(e))
+
+        if pending:
+            self._log_batch(db, pending, results)
+
+        for index in trips:
+            try:
+                result = self.toggle_trip(db, payloads[index])
+                results[index] = self._item(index, "ok", trip_id=result["trip_id"])
+            except ValueError as e:
+                results[index] = self._item(index, "invalid", error=str(e))
+            except Exception as e:
+                print(f"Error processing TRIP alert in batch: {e}")
+                results[index] = self._item(index, "error", error=str(e))
+
+        return {
+            "received": len(payloads),
+            "logged": sum(1 for r in results if r["status"] == "ok"),
+            "results": results,
+        }
+
+    def _log_batch(
+        self,
+        db: Database,
+        pending: List[Tuple[int, Tuple[int, str, str, str]]],
+        results: List[Optional[Dict[str, Any]]],
+    ) -> None:
+        try:
+            created = log_alerts(db, [alert for _, alert in pending])
+        except Exception as e:
+            # La transacción se deshizo: ninguna alerta normal del lote quedó guardada
+            print(f"Error saving alert batch to DB: {e}")
+            for index, _ in pending:
+                results[index] = self._item(index, "error", error=str(e))
+            return
+
+        notify = []
+        for (index, (trip_id, alert_type, severity, message)), alert in zip(pending, created):
+            if alert is None:
+                results[index] = self._item(index, "invalid", trip_id=trip_id, error="Invalid trip_id for alert")
+                continue
+            self._logged(alert, alert_type, severity, message)
+            notify.append({"trip_id": trip_id, "alert_type": alert_type, "severity": severity, "message": message})
+            results[index] = self._item(index, "ok", trip_id=trip_id, alert_id=alert["alert_id"])
+        telegram_service.send_alerts(db, notify)
+
+    def _item(self, index: int, status: str, **fields: Any) -> Dict[str, Any]:
+        return {"index": index, "status": status, **fields}
+
+    def toggle_trip(self, db: Database, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Modo especial TRIP: inicia o termina el viaje del par driver/vehículo.
+        """
+        driver_id = payload.get("driver_id")
+        vehicle_id = payload.get("vehicle_id")
+        if not driver_id and payload.get("driver_name"):
+            driver = reference_index_service.driver_by_name(db, payload["driver_name"])
+            driver_id = driver["driver_id"] if driver else None
+        if not vehicle_id and payload.get("vehicle_plate"):
+            vehicle = reference_index_service.vehicle_by_plate(db, payload["vehicle_plate"])
+            vehicle_id = vehicle["vehicle_id"] if vehicle else None
+
+        if not (driver_id and vehicle_id):
+            raise ValueError(
+                "driver_id/driver_name y vehicle_id/vehicle_plate son necesarios para TRIP"
+            )
+
+        message = payload.get("message")
+        active_trip = get_active_trip_by_pair(db, driver_id, vehicle_id)
+        if active_trip:
+            trip_id = active_trip["trip_id"]
+            end_trip(db, trip_id, None)
+            self.trip_ended(db, trip_id)
+            action_msg = message or "Trip finalizado automáticamente por alerta TRIP"
+        else:
+            plan = consume_trip_plan(db, driver_id, vehicle_id)
+            origin = payload.get("origin") or (plan["origin"] if plan else "Origen automático")
+            destination = payload.get("destination") or (plan["destination"] if plan else "Destino asignado")
+            trip_id = start_trip(db, vehicle_id, driver_id, origin, destination)
+            self.trip_started(db, trip_id)
+            action_msg = message or "Trip iniciado automáticamente por alerta TRIP"
+
+        self.log(db, trip_id, "TRIP", payload.get("severity") or "LOW", action_msg)
+        return {"message": "TRIP alert processed", "trip_id": trip_id}
+
+    def log(
+        self,
+        db: Database,
+        trip_id: int,
+        alert_type: str,
+        severity: str,
+        message: str,
+    ) -> Optional[Dict[str, Any]]:
+        alert = log_alert(db, trip_id, alert_type, severity, message)
+        self._logged(alert, alert_type, severity, message)
+        telegram_service.send_alert(db, alert_type, severity, message, trip_id)
+        return alert
+
+    def _logged(
+        self,
+        alert: Optional[Dict[str, Any]],
+        alert_type: str,
+        severity: str,
+        message: str,
+    ) -> None:
+        """In-memory side effects of a stored alert: fleet state and live event."""
+        fleet_state_service.on_alert(alert, alert_type, severity, message)
+        if alert:
+            trip = fleet_state_service.trip(alert["trip_id"]) or {}
+            event_hub_service.publish("alert", {
+                **alert,
+                "alert_type": alert_type,
+                "severity": severity,
+                "message": message,
+                "driver_name": trip.get("driver_name"),
+                "vehicle_plate": trip.get("vehicle_plate"),
+            })
+
+    def trip_started(self, db: Database, trip_id: int) -> None:
+        fleet_state_service.on_trip_started(db, trip_id)
+        trip = fleet_state_service.trip(trip_id) or get_trip_by_id(db, trip_id)
+        if trip:
+            event_hub_service.publish("trip", self._trip_event(trip, "IN_PROGRESS"))
+
+    def trip_ended(self, db: Database, trip_id: int, status: Optional[str] = None) -> None:
+        trip = fleet_state_service.trip(trip_id) or get_trip_by_id(db, trip_id)
+        fleet_state_service.on_trip_ended(trip_id)
+        if trip:
+            event_hub_service.publish("trip", self._trip_event(trip, status or "FINISHED"))
+
+    def _trip_event(self, trip: Dict[str, Any], status: str) -> Dict[str, Any]:
+        return {
+            "trip_id": trip["trip_id"],
+            "vehicle_id": trip["vehicle_id"],
+            "driver_id": trip["driver_id"],
+            "driver_name": trip.get("driver_name"),
+            "vehicle_plate": trip.get("vehicle_plate"),
+            "status": status,
+        }
+
+
+alert_ingest_service = AlertIngestService()
@@ -0,0 +1,142 @@
+import re
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import settings
+from database.autoawake_db import (
+    Database,
+    add_alert_partitions,
+    drop_alert_partition,
+    exchange_alert_partition,
+    get_alert_partition_max_id,
+    get_rollup_watermark,
+    list_alert_partitions,
+    table_exists,
+)
+from services.cold_storage_service import cold_storage_service
+
+MONTH_PARTITION = re.compile(r"^p(\d{4})(\d{2})$")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + (month.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class AlertPartitionService:
+    """
+    Maintenance job for the monthly partitions of `alerts`
+    (12_alerts_partitioning.sql):
+
+    - keeps ALERTS_PARTITION_MONTHS_AHEAD empty partitions ahead of today,
+      so p_future (MAXVALUE) never has to be split with rows in it;
+    - when ALERTS_RETENTION_MONTHS > 0, archives months older than that:
+      EXCHANGE PARTITION into alerts_archive_YYYYMM, export to Parquet cold
+      storage (ALERTS_ARCHIVE_MODE=parquet) or DROP PARTITION (drop). The
+      partition itself always goes away with DROP PARTITION, not DELETEs.
+
+    A month is only archived once the alert rollups have passed its last
+    alert_id, so reports keep counting it.
+    """
+
+    def __init__(self) -> None:
+        self.months_ahead = settings.alerts_partition_months_ahead
+        self.retention_months = settings.alerts_retention_months
+        self.archive_mode = settings.alerts_archive_mode
+        self.interval_s = settings.alerts_partition_interval_hours * 3600
+        self._db: Optional[Database] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _monthly_partitions(self, db: Database) -> List[Tuple[str, date]]:
+        """
+        (name, first day of the month) of every monthly partition.
+        """
+        months = []
+        for row in list_alert_partitions(db):
+            match = MONTH_PARTITION.match(row["name"] or "")
+            if match:
+                months.append((row["name"], date(int(match.group(1)), int(match.group(2)), 1)))
+        return months
+
+    def run_once(self, db: Database, today: Optional[date] = None) -> Dict[str, Any]:
+        current_month = (today or date.today()).replace(day=1)
+        result: Dict[str, Any] = {"added": [], "archived": [], "skipped": []}
+
+        months = self._monthly_partitions(db)
+        if not months:
+            print("alerts is not partitioned; run 12_alerts_partitioning.sql")
+            return result
+
+        # Particiones futuras
+        next_month = _add_months(max(month for _, month in months), 1)
+        last_month = _add_months(current_month, self.months_ahead)
+        new_parts = []
+        while next_month <= last_month:
+            name = f"p{next_month:%Y%m}"
+            new_parts.append((name, f"{_add_months(next_month, 1):%Y-%m-%d}"))
+            next_month = _add_months(next_month, 1)
+        if new_parts:
+            add_alert_partitions(db, new_parts)
+            result["added"] = [name for name, _ in new_parts]
+
+        # Archivo de meses fuera de la retención
+        if self.retention_months > 0:
+            cutoff = _add_months(current_month, -self.retention_months)
+            watermark = get_rollup_watermark(db)
+            for name, month in months:
+                if month >= cutoff:
+                    break
+                max_alert_id = get_alert_partition_max_id(db, name)
+                if max_alert_id is not None and max_alert_id > watermark:
+                    # Los rollups todavía no cuentan este mes
+                    result["skipped"].append(name)
+                    continue
+                self._archive(db, name, max_alert_id)
+                result["archived"].append(name)
+
+        return result
+
+    def _archive(self, db: Database, partition: str, max_alert_id: Optional[int]) -> None:
+        if self.archive_mode == "parquet" and max_alert_id is not None:
+            rows = cold_storage_service.export_partition(db, partition)
+            print(f"Exported {rows} alerts of {partition} to cold storage")
+        elif self.archive_mode == "exchange" and max_alert_id is not None:
+            archive_table = f"alerts_archive_{partition[1:]}"
+            if table_exists(db, archive_table):
+                # Un archivo previo ya existe: no mezclarlo con estas filas
+                raise RuntimeError(
+                    f"{archive_table} already exists and {partition} still has rows"
+                )
+            exchange_alert_partition(db, partition, archive_table)
+        drop_alert_partition(db, partition)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                result = self.run_once(self._db)
+                if any(result.values()):
+                    print(f"Alert partitions maintenance: {result}")
+            except Exception as e:
+                print(f"Error maintaining alert partitions: {e}")
+            self._stop.wait(self.interval_s)
+
+    def start(self, db: Database) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._db = db
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="alert-partitions", daemon=True)
+        self._thread.start()
+        print("Alert partition job started")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        print("Alert partition job stopped")
+
+
+alert_partition_service = AlertPartitionService()
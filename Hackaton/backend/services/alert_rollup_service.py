@@ -0,0 +1,72 @@
+import threading
+from typing import Any, Dict, Optional
+
+from core.config import settings
+from database.autoawake_db import Database, rollup_alerts
+
+
+class AlertRollupService:
+    """
+    Background job that keeps alert_rollup_hourly / alert_rollup_daily up to
+    date. Every ALERT_ROLLUP_INTERVAL_SECONDS it calls sp_rollup_alerts in
+    batches until it reaches the newest alert; the watermark lives in MySQL,
+    so restarts and several workers never re-aggregate history. Alerts that
+    commit after the watermark passed their id are picked up by the trailing
+    re-scan window (ALERT_ROLLUP_RESCAN_IDS).
+    """
+
+    def __init__(self) -> None:
+        self.interval_s = settings.alert_rollup_interval_seconds
+        self.batch_size = settings.alert_rollup_batch_size
+        self.lag_s = settings.alert_rollup_lag_seconds
+        self.rescan_ids = settings.alert_rollup_rescan_ids
+        self._db: Optional[Database] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_alert_id: Optional[int] = None
+
+    def run_once(self, db: Database) -> int:
+        """
+        Aggregates every pending batch. Returns how far the watermark moved
+        (in alert ids).
+        """
+        start_id = None
+        while not self._stop.is_set():
+            result: Dict[str, Any] = rollup_alerts(
+                db, self.batch_size, self.lag_s, self.rescan_ids
+            )
+            if start_id is None:
+                start_id = result["from_alert_id"]
+            self.last_alert_id = result["last_alert_id"]
+            if result["last_alert_id"] == result["from_alert_id"]:
+                break
+        return (self.last_alert_id or 0) - (start_id or 0)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                advanced = self.run_once(self._db)
+                if advanced:
+                    print(f"Alert rollups advanced to alert_id {self.last_alert_id}")
+            except Exception as e:
+                print(f"Error running alert rollups: {e}")
+            self._stop.wait(self.interval_s)
+
+    def start(self, db: Database) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._db = db
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="alert-rollups", daemon=True)
+        self._thread.start()
+        print("Alert rollup job started")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        print("Alert rollup job stopped")
+
+
+alert_rollup_service = AlertRollupService()
@@ -1,7 +1,10 @@
+from typing import Optional
+
 from fastapi import HTTPException, status
+from database import autoawake_async_db
+from database.autoawake_async_db import AsyncDatabase
 from database.autoawake_db import (
     Database,
-    get_active_session,
     get_user_by_email,
     login_user,
     logout_session,
@@ -14,33 +17,54 @@ class AuthService:
     Servicio de autenticación basado en stored procedures y sesiones en BD.
     """
 
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, async_db: Optional[AsyncDatabase] = None):
         self.db = db
+        self.async_db = async_db
 
     def login(self, email: str, password: str) -> dict:
         try:
             session_data = login_user(self.db, email, password)
-            session = get_active_session(self.db, session_data["session_token"])
-            return {
-                "token": session_data["session_token"],
-                "user_id": session_data["user_id"],
-                "role": session_data["role_name"],
-                "email": session["email"] if session else email,
-                "expires_at": session["expires_at"] if session else None,
-            }
+            return self._build_session_response(session_data)
         except Exception as exc:
-            # La SP devuelve SIGNAL con SQLSTATE 45000; mysql-connector lo propaga como Exception.
-            message = str(exc)
-            if "INVALID_CREDENTIALS" in message:
-                detail = "INVALID_CREDENTIALS"
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED, detail=detail
-                ) from exc
-            if "USER_DISABLED" in message:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN, detail="USER_DISABLED"
-                ) from exc
-            raise
+            self._raise_login_error(exc)
+
+    async def login_async(self, email: str, password: str) -> dict:
+        """
+        Igual que login(), pero con la BD async para no bloquear el event loop.
+        """
+        if self.async_db is None:
+            raise RuntimeError("AuthService.login_async requiere async_db")
+        try:
+            session_data = await autoawake_async_db.login_user(self.async_db, email, password)
+            return self._build_session_response(session_data)
+        except Exception as exc:
+            self._raise_login_error(exc)
+
+    @staticmethod
+    def _build_session_response(session_data: dict) -> dict:
+        # sp_login_user ya devuelve email y expires_at: no hace falta releer la sesión
+        return {
+            "token": session_data["session_token"],
+            "user_id": session_data["user_id"],
+            "role": session_data["role_name"],
+            "email": session_data["email"],
+            "expires_at": session_data["expires_at"],
+        }
+
+    @staticmethod
+    def _raise_login_error(exc: Exception) -> None:
+        # La SP devuelve SIGNAL con SQLSTATE 45000; el conector lo propaga como Exception.
+        message = str(exc)
+        if "INVALID_CREDENTIALS" in message:
+            detail = "INVALID_CREDENTIALS"
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail=detail
+            ) from exc
+        if "USER_DISABLED" in message:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="USER_DISABLED"
+            ) from exc
+        raise exc
 
     def register(self, name: str, email: str, password: str, role_name: str) -> dict:
         if get_user_by_email(self.db, email):
@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from core.config import settings
+from database.autoawake_db import (
+    Database,
+    insert_bpm_samples,
+    purge_bpm_samples,
+    upsert_bpm_minutes,
+)
+
+Sample = Tuple[int, datetime, int]
+
+BPM_MIN = 20
+BPM_MAX = 250
+
+
+def _to_millis(ts: datetime) -> datetime:
+    # Precisión de bpm_samples.sampled_at (DATETIME(3)): la clave se compara igual en memoria y en MySQL
+    return ts.replace(microsecond=ts.microsecond // 1000 * 1000)
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    if isinstance(value, str):
+        try:
+            ts = datetime.fromisoformat(value)
+            # Guardamos hora local sin zona, igual que NOW() en MySQL
+            return _to_millis(ts.astimezone().replace(tzinfo=None) if ts.tzinfo else ts)
+        except ValueError:
+            pass
+    return _to_millis(datetime.now())
+
+
+class BpmIngestService:
+    """
+    Persists heart-rate samples from the BPM MQTT topic.
+
+    The MQTT thread only appends to an in-memory buffer; a writer thread
+    flushes it every BPM_FLUSH_SECONDS (or as soon as BPM_BATCH_SIZE samples
+    are waiting) with one multi-row INSERT into bpm_samples plus one upsert
+    of the per-minute min/sum/max rollup (bpm_minute), in one transaction.
+    Samples already stored (a retried batch, a duplicate delivery) are
+    filtered out first, so the rollup only counts rows actually inserted. Raw samples older than
+    BPM_RAW_RETENTION_HOURS are purged in batches; the rollup is kept.
+
+    If MySQL is unavailable the batch goes back to the buffer, which is
+    bounded (BPM_BUFFER_MAX): the oldest samples are dropped first.
+    """
+
+    def __init__(self) -> None:
+        self.flush_s = settings.bpm_flush_seconds
+        self.batch_size = settings.bpm_batch_size
+        self.buffer_max = settings.bpm_buffer_max
+        self.retention_hours = settings.bpm_raw_retention_hours
+        self.purge_s = settings.bpm_purge_interval_minutes * 60
+        self._buffer: Deque[Sample] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._db: Optional[Database] = None
+        self.received = 0
+        self.stored = 0
+        self.rejected = 0
+        self.dropped = 0
+
+    # -----------------------------
+    # Ingest (MQTT thread)
+    # -----------------------------
+    def add(self, payload: Dict[str, Any]) -> Optional[Sample]:
+        """
+        Buffers one sample. Expected payload: {"trip_id": 1, "timestamp": ..., "bpm": 72}
+        Returns the parsed sample, or None if the payload is invalid.
+        """
+        try:
+            trip_id = int(payload["trip_id"])
+            bpm = int(round(float(payload["bpm"])))
+        except (KeyError, TypeError, ValueError):
+            self.rejected += 1
+            return None
+        if not BPM_MIN <= bpm <= BPM_MAX:
+            self.rejected += 1
+            return None
+
+        sample = (trip_id, _parse_timestamp(payload.get("timestamp")), bpm)
+        with self._lock:
+            if len(self._buffer) >= self.buffer_max:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(sample)
+            self.received += 1
+            pending = len(self._buffer)
+        if pending >= self.batch_size:
+            self._wake.set()
+        return sample
+
+    # -----------------------------
+    # Writer
+    # -----------------------------
+    def _minutes(self, samples: List[Sample]) -> List[Tuple[int, datetime, int, int, int, int]]:
+        minutes: Dict[Tuple[int, datetime], List[int]] = {}
+        for trip_id, sampled_at, bpm in samples:
+            key = (trip_id, sampled_at.replace(second=0, microsecond=0))
+            agg = minutes.get(key)
+            if agg is None:
+                minutes[key] = [1, bpm, bpm, bpm]
+            else:
+                agg[0] += 1
+                agg[1] = min(agg[1], bpm)
+                agg[2] = max(agg[2], bpm)
+                agg[3] += bpm
+        return [(trip_id, minute, *agg) for (trip_id, minute), agg in minutes.items()]
+
+    def flush(self, db: Database) -> int:
+        with self._lock:
+            batch = list(self._buffer)
+            self._buffer.clear()
+        if not batch:
+            return 0
+        # Mismo viaje e instante: una sola muestra (la PK de bpm_samples)
+        samples = list({(trip_id, ts): (trip_id, ts, bpm) for trip_id, ts, bpm in batch}.values())
+        try:
+            with db.transaction() as tx:
+                inserted = insert_bpm_samples(tx, samples)
+                upsert_bpm_minutes(tx, self._minutes(inserted))
+        except Exception:
+            with self._lock:
+                pending = batch + list(self._buffer)
+                overflow = max(0, len(pending) - self.buffer_max)
+                self._buffer = deque(pending[overflow:])
+                self.dropped += overflow
+            raise
+        self.stored += len(inserted)
+        return len(inserted)
+
+    def _run(self) -> None:
+        next_purge = time.monotonic()
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_s)
+            self._wake.clear()
+            try:
+                self.flush(self._db)
+            except Exception as e:
+                print(f"Error storing BPM samples: {e}")
+            if time.monotonic() >= next_purge:
+                next_purge = time.monotonic() + self.purge_s
+                try:
+                    deleted = purge_bpm_samples(self._db, self.retention_hours)
+                    if deleted:
+                        print(f"Purged {deleted} raw BPM samples")
+                except Exception as e:
+                    print(f"Error purging BPM samples: {e}")
+        try:
+            self.flush(self._db)
+        except Exception as e:
+            print(f"Error storing BPM samples on shutdown: {e}")
+
+    def start(self, db: Database) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._db = db
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bpm-writer", daemon=True)
+        self._thread.start()
+        print("BPM writer started")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        print("BPM writer stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._buffer)
+        return {
+            "received": self.received,
+            "stored": self.stored,
+            "pending": pending,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+        }
+
+
+bpm_ingest_service = BpmIngestService()
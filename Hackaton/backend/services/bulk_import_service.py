@@ -0,0 +1,284 @@
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from core.config import settings
+from database.autoawake_db import (
+    Database,
+    PoolTimeoutError,
+    bulk_insert_assignments,
+    bulk_insert_drivers,
+    bulk_insert_vehicles,
+    find_active_assignments,
+    find_drivers_by_license,
+    find_existing_driver_ids,
+    find_existing_vehicle_ids,
+    find_vehicles_by_plate,
+)
+from schemas.crud_schemas import AssignmentImport, DriverCreate, VehicleCreate
+
+# Largos máximos de las columnas (01_schema.sql) y valores de los ENUM
+DRIVER_LENGTHS = {"first_name": 100, "last_name": 100, "license_number": 50}
+DRIVER_STATUSES = ("ACTIVE", "INACTIVE")
+VEHICLE_LENGTHS = {"plate": 20, "brand": 100, "model": 100}
+VEHICLE_STATUSES = ("ACTIVE", "MAINTENANCE", "INACTIVE")
+
+MAX_REPORTED_ERRORS = 100
+
+# (fila, parámetros del INSERT, campo y valor que identifican la fila)
+Pending = Tuple[int, Tuple[Any, ...], str, Any]
+
+
+class BulkValidationError(ValueError):
+    """Some rows are invalid; nothing was inserted. `errors` lists them per row."""
+
+    def __init__(self, errors: List[Dict[str, Any]]) -> None:
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors[:MAX_REPORTED_ERRORS]
+
+
+def _conflict(row: int, field: str, value: Any, reason: str) -> Dict[str, Any]:
+    return {"row": row, "field": field, "value": None if value is None else str(value), "reason": reason}
+
+
+class BulkImportService:
+    """
+    Bulk creation of drivers, vehicles and assignments (fleet onboarding).
+
+    Every row is validated before anything is written: schema, column
+    lengths and enum values, and for assignments that the referenced
+    driver/vehicle exists. Any invalid row rejects the whole import
+    (BulkValidationError). Rows that clash with existing data (license or
+    plate already taken, driver/vehicle already assigned) or with an
+    earlier row of the same import are skipped and reported as conflicts;
+    the rest are inserted in chunks of BULK_IMPORT_CHUNK_SIZE, each one a
+    single multi-row INSERT in its own transaction. Chunks commit
+    independently. With dry_run nothing is written and `inserted` is the
+    number of rows that would be.
+    """
+
+    def __init__(self) -> None:
+        self.chunk_size = settings.bulk_import_chunk_size
+        self.max_rows = settings.bulk_import_max_rows
+
+    # -----------------------------
+    # Validation
+    # -----------------------------
+    def _validate(
+        self,
+        rows: List[Any],
+        model: Type[BaseModel],
+        lengths: Dict[str, int],
+        statuses: Tuple[str, ...] = (),
+    ) -> Tuple[List[Tuple[int, BaseModel]], List[Dict[str, Any]]]:
+        if not rows:
+            raise ValueError("No rows to import")
+        if len(rows) > self.max_rows:
+            raise ValueError(f"Too many rows ({len(rows)}), the limit is {self.max_rows}")
+
+        items: List[Tuple[int, BaseModel]] = []
+        errors: List[Dict[str, Any]] = []
+        for row_no, raw in enumerate(rows, start=1):
+            if not isinstance(raw, dict):
+                errors.append({"row": row_no, "errors": ["expected an object"]})
+                continue
+            # Celdas vacías (CSV) o null: se usa el default del modelo
+            data = {
+                key.strip(): value.strip() if isinstance(value, str) else value
+                for key, value in raw.items()
+                if isinstance(key, str)
+            }
+            data = {key: value for key, value in data.items() if value not in ("", None)}
+            try:
+                item = model(**data)
+            except ValidationError as e:
+                errors.append({
+                    "row": row_no,
+                    "errors": [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()],
+                })
+                continue
+
+            problems = []
+            for name, max_length in lengths.items():
+                value = getattr(item, name)
+                if not value:
+                    problems.append(f"{name}: required")
+                elif len(value) > max_length:
+                    problems.append(f"{name}: longer than {max_length} characters")
+            if statuses:
+                item.status = (item.status or "ACTIVE").upper()
+                if item.status not in statuses:
+                    problems.append(f"status: must be one of {', '.join(statuses)}")
+            if problems:
+                errors.append({"row": row_no, "errors": problems})
+            else:
+                items.append((row_no, item))
+        return items, errors
+
+    # -----------------------------
+    # Insert
+    # -----------------------------
+    def _insert(
+        self,
+        db: Database,
+        insert: Callable[[Database, List[Tuple[Any, ...]]], Dict[int, str]],
+        pending: List[Pending],
+        conflicts: List[Dict[str, Any]],
+        dry_run: bool,
+    ) -> int:
+        if dry_run:
+            return len(pending)
+        inserted = 0
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start:start + self.chunk_size]
+            try:
+                failed = insert(db, [params for _, params, _, _ in chunk])
+            except PoolTimeoutError:
+                # Sin cupo en el pool: 503 (reintentable), no un 500
+                print(f"Bulk import stopped by a pool timeout after {inserted} inserted rows")
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Import stopped after {inserted} inserted rows: {e}") from e
+            for index, (row_no, _, field, value) in enumerate(chunk):
+                if index in failed:
+                    conflicts.append(_conflict(row_no, field, value, failed[index]))
+                else:
+                    inserted += 1
+        return inserted
+
+    def _unique(
+        self,
+        items: List[Tuple[int, BaseModel]],
+        field: str,
+        existing: Dict[str, int],
+        id_name: str,
+        conflicts: List[Dict[str, Any]],
+    ) -> List[Tuple[int, BaseModel]]:
+        """Drops rows whose `field` repeats an earlier row or an existing record."""
+        seen: Dict[str, int] = {}
+        unique = []
+        for row_no, item in items:
+            value = getattr(item, field)
+            key = value.lower()
+            if key in seen:
+                conflicts.append(_conflict(row_no, field, value, f"duplicated in row {seen[key]}"))
+            elif key in existing:
+                conflicts.append(_conflict(row_no, field, value, f"already exists ({id_name} {existing[key]})"))
+            else:
+                seen[key] = row_no
+                unique.append((row_no, item))
+        return unique
+
+    def _result(self, total: int, inserted: int, conflicts: List[Dict[str, Any]], dry_run: bool) -> Dict[str, Any]:
+        conflicts.sort(key=lambda c: c["row"])
+        return {"total": total, "inserted": inserted, "conflicts": conflicts, "dry_run": dry_run}
+
+    # -----------------------------
+    # Entities
+    # -----------------------------
+    def import_drivers(self, db: Database, rows: List[Any], dry_run: bool = False) -> Dict[str, Any]:
+        items, errors = self._validate(rows, DriverCreate, DRIVER_LENGTHS, DRIVER_STATUSES)
+        if errors:
+            raise BulkValidationError(errors)
+        conflicts: List[Dict[str, Any]] = []
+        existing = find_drivers_by_license(db, [item.license_number for _, item in items])
+        pending = [
+            (row_no, (d.first_name, d.last_name, d.license_number, d.status), "license_number", d.license_number)
+            for row_no, d in self._unique(items, "license_number", existing, "driver_id", conflicts)
+        ]
+        inserted = self._insert(db, bulk_insert_drivers, pending, conflicts, dry_run)
+        return self._result(len(rows), inserted, conflicts, dry_run)
+
+    def import_vehicles(self, db: Database, rows: List[Any], dry_run: bool = False) -> Dict[str, Any]:
+        items, errors = self._validate(rows, VehicleCreate, VEHICLE_LENGTHS, VEHICLE_STATUSES)
+        if errors:
+            raise BulkValidationError(errors)
+        conflicts: List[Dict[str, Any]] = []
+        existing = find_vehicles_by_plate(db, [item.plate for _, item in items])
+        pending = [
+            (row_no, (v.plate, v.brand, v.model, v.status), "plate", v.plate)
+            for row_no, v in self._unique(items, "plate", existing, "vehicle_id", conflicts)
+        ]
+        inserted = self._insert(db, bulk_insert_vehicles, pending, conflicts, dry_run)
+        return self._result(len(rows), inserted, conflicts, dry_run)
+
+    def import_assignments(self, db: Database, rows: List[Any], dry_run: bool = False) -> Dict[str, Any]:
+        """Rows reference the driver by driver_id or license_number and the vehicle by vehicle_id or plate."""
+        items, errors = self._validate(rows, AssignmentImport, {})
+        drivers_by_license = find_drivers_by_license(
+            db, [item.license_number for _, item in items if not item.driver_id and item.license_number]
+        )
+        vehicles_by_plate = find_vehicles_by_plate(
+            db, [item.plate for _, item in items if not item.vehicle_id and item.plate]
+        )
+        driver_ids = find_existing_driver_ids(db, [item.driver_id for _, item in items if item.driver_id])
+        vehicle_ids = find_existing_vehicle_ids(db, [item.vehicle_id for _, item in items if item.vehicle_id])
+
+        resolved: List[Tuple[int, int, int]] = []
+        for row_no, item in items:
+            problems = []
+            driver_id = self._resolve(item.driver_id, item.license_number, driver_ids, drivers_by_license)
+            if driver_id is None:
+                problems.append(self._unknown("driver_id", item.driver_id, "license_number", item.license_number))
+            vehicle_id = self._resolve(item.vehicle_id, item.plate, vehicle_ids, vehicles_by_plate)
+            if vehicle_id is None:
+                problems.append(self._unknown("vehicle_id", item.vehicle_id, "plate", item.plate))
+            if problems:
+                errors.append({"row": row_no, "errors": problems})
+            else:
+                resolved.append((row_no, driver_id, vehicle_id))
+        if errors:
+            errors.sort(key=lambda e: e["row"])
+            raise BulkValidationError(errors)
+
+        conflicts: List[Dict[str, Any]] = []
+        active_by_driver, active_by_vehicle = find_active_assignments(
+            db, [d for _, d, _ in resolved], [v for _, _, v in resolved]
+        )
+        seen_drivers: Dict[int, int] = {}
+        seen_vehicles: Dict[int, int] = {}
+        pending: List[Pending] = []
+        for row_no, driver_id, vehicle_id in resolved:
+            if driver_id in seen_drivers:
+                conflicts.append(_conflict(row_no, "driver_id", driver_id, f"duplicated in row {seen_drivers[driver_id]}"))
+            elif vehicle_id in seen_vehicles:
+                conflicts.append(_conflict(row_no, "vehicle_id", vehicle_id, f"duplicated in row {seen_vehicles[vehicle_id]}"))
+            elif driver_id in active_by_driver:
+                conflicts.append(_conflict(
+                    row_no, "driver_id", driver_id,
+                    f"driver already assigned to vehicle_id {active_by_driver[driver_id]}",
+                ))
+            elif vehicle_id in active_by_vehicle:
+                conflicts.append(_conflict(
+                    row_no, "vehicle_id", vehicle_id,
+                    f"vehicle already assigned to driver_id {active_by_vehicle[vehicle_id]}",
+                ))
+            else:
+                seen_drivers[driver_id] = row_no
+                seen_vehicles[vehicle_id] = row_no
+                pending.append((row_no, (driver_id, vehicle_id), "driver_id", driver_id))
+        inserted = self._insert(db, bulk_insert_assignments, pending, conflicts, dry_run)
+        return self._result(len(rows), inserted, conflicts, dry_run)
+
+    def _resolve(
+        self,
+        entity_id: Optional[int],
+        natural_key: Optional[str],
+        existing_ids: Set[int],
+        by_key: Dict[str, int],
+    ) -> Optional[int]:
+        if entity_id:
+            return entity_id if entity_id in existing_ids else None
+        if natural_key:
+            return by_key.get(natural_key.lower())
+        return None
+
+    def _unknown(self, id_name: str, entity_id: Optional[int], key_name: str, key: Optional[str]) -> str:
+        if entity_id:
+            return f"{id_name}: unknown {entity_id}"
+        if key:
+            return f"{key_name}: unknown {key}"
+        return f"{id_name} or {key_name} required"
+
+
+bulk_import_service = BulkImportService()
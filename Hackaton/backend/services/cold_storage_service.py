@@ -0,0 +1,214 @@
+import itertools
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from core.config import settings
+from database.autoawake_db import Database, stream_alert_partition
+
+# vehicle_id va en la ruta (partición hive), no dentro del archivo
+ALERT_SCHEMA = pa.schema([
+    ("alert_id", pa.int64()),
+    ("driver_id", pa.int64()),
+    ("trip_id", pa.int64()),
+    ("alert_type", pa.string()),
+    ("severity", pa.string()),
+    ("message", pa.string()),
+    ("detected_at", pa.timestamp("s")),
+    ("created_at", pa.timestamp("s")),
+    ("updated_at", pa.timestamp("s")),
+])
+PARTITIONING = ds.partitioning(
+    pa.schema([("month", pa.string()), ("vehicle_id", pa.int64())]),
+    flavor="hive",
+)
+HISTORY_COLUMNS = ["month", "vehicle_id", *ALERT_SCHEMA.names]
+SUMMARY_GROUPS = ("month", "vehicle_id", "driver_id", "alert_type", "severity")
+
+
+class ColdStorageService:
+    """
+    Compressed Parquet archive for alerts beyond the MySQL retention window.
+
+    Layout: COLD_STORAGE_DIR/month=YYYY-MM/vehicle_id=N/part-0.parquet.
+    Queries go through pyarrow.dataset: month/vehicle filters prune whole
+    directories, and the rest (dates, driver, type, severity) are pushed down
+    to the Parquet row-group statistics, so only matching data is read.
+    """
+
+    def __init__(self) -> None:
+        self.root = settings.cold_storage_dir
+        self.compression = settings.cold_storage_compression
+
+    # -----------------------------
+    # Export
+    # -----------------------------
+    def export_partition(self, db: Database, partition: str) -> int:
+        """
+        Writes the alerts of a monthly partition (pYYYYMM) to Parquet.
+        Writes to a temporary directory and swaps it in at the end, so a
+        failed export never leaves a half-written month visible.
+        Returns the number of rows written.
+        """
+        month = f"{partition[1:5]}-{partition[5:7]}"
+        month_dir = os.path.join(self.root, f"month={month}")
+        # Prefijo "_": pyarrow.dataset lo ignora mientras se escribe
+        tmp_dir = os.path.join(self.root, f"_tmp-month={month}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        rows_written = 0
+        writer: Optional[pq.ParquetWriter] = None
+        current_vehicle = None
+        try:
+            for batch in stream_alert_partition(db, partition):
+                for vehicle_id, rows in itertools.groupby(batch, key=lambda r: r["vehicle_id"]):
+                    if vehicle_id != current_vehicle:
+                        if writer is not None:
+                            writer.close()
+                        vehicle_dir = os.path.join(tmp_dir, f"vehicle_id={vehicle_id}")
+                        os.makedirs(vehicle_dir, exist_ok=True)
+                        writer = pq.ParquetWriter(
+                            os.path.join(vehicle_dir, "part-0.parquet"),
+                            ALERT_SCHEMA,
+                            compression=self.compression,
+                        )
+                        current_vehicle = vehicle_id
+                    table = pa.Table.from_pylist(list(rows), schema=ALERT_SCHEMA)
+                    writer.write_table(table)
+                    rows_written += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if rows_written:
+            shutil.rmtree(month_dir, ignore_errors=True)
+            os.replace(tmp_dir, month_dir)
+        else:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return rows_written
+
+    # -----------------------------
+    # Query
+    # -----------------------------
+    def months(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            entry.name.split("=", 1)[1]
+            for entry in os.scandir(self.root)
+            if entry.is_dir() and entry.name.startswith("month=")
+        )
+
+    def _dataset(self, month: Optional[str] = None) -> Optional[ds.Dataset]:
+        path = os.path.join(self.root, f"month={month}") if month else self.root
+        if not os.path.isdir(path):
+            return None
+        return ds.dataset(
+            path,
+            format="parquet",
+            partitioning=PARTITIONING,
+            # Un solo mes: con base en root la ruta sigue trayendo month=
+            partition_base_dir=self.root if month else None,
+        )
+
+    def _filter(
+        self,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        vehicle_id: Optional[int],
+        driver_id: Optional[int],
+        alert_type: Optional[str],
+        severity: Optional[str],
+    ) -> Optional[ds.Expression]:
+        conditions = []
+        if start_date:
+            conditions.append(ds.field("month") >= f"{start_date:%Y-%m}")
+            conditions.append(ds.field("detected_at") >= pa.scalar(start_date, pa.timestamp("s")))
+        if end_date:
+            conditions.append(ds.field("month") <= f"{end_date:%Y-%m}")
+            conditions.append(ds.field("detected_at") < pa.scalar(end_date, pa.timestamp("s")))
+        for column, value in (
+            ("vehicle_id", vehicle_id),
+            ("driver_id", driver_id),
+            ("alert_type", alert_type),
+            ("severity", severity),
+        ):
+            if value is not None:
+                conditions.append(ds.field(column) == value)
+        if not conditions:
+            return None
+        expression = conditions[0]
+        for condition in conditions[1:]:
+            expression = expression & condition
+        return expression
+
+    def query(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        vehicle_id: Optional[int] = None,
+        driver_id: Optional[int] = None,
+        alert_type: Optional[str] = None,
+        severity: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """
+        Archived alerts matching the filters, newest first. Reads month by
+        month (newest first) and stops once `limit` rows are collected, so
+        memory is bounded by one month of matches.
+        """
+        expression = self._filter(start_date, end_date, vehicle_id, driver_id, alert_type, severity)
+        rows: List[Dict[str, Any]] = []
+        for month in reversed(self.months()):
+            if start_date and month < f"{start_date:%Y-%m}":
+                break
+            if end_date and month > f"{end_date:%Y-%m}":
+                continue
+            dataset = self._dataset(month)
+            if dataset is None:
+                continue
+            table = dataset.to_table(filter=expression, columns=HISTORY_COLUMNS)
+            if table.num_rows == 0:
+                continue
+            table = table.sort_by([("detected_at", "descending"), ("alert_id", "descending")])
+            rows.extend(table.slice(0, limit - len(rows)).to_pylist())
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def summary(
+        self,
+        group_by: str = "month",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        vehicle_id: Optional[int] = None,
+        driver_id: Optional[int] = None,
+        alert_type: Optional[str] = None,
+        severity: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Alert counts over the archive grouped by month / vehicle_id /
+        driver_id / alert_type / severity. Only the grouping column is read.
+        """
+        if group_by not in SUMMARY_GROUPS:
+            raise ValueError(f"group_by must be one of {', '.join(SUMMARY_GROUPS)}")
+        dataset = self._dataset()
+        if dataset is None:
+            return []
+        expression = self._filter(start_date, end_date, vehicle_id, driver_id, alert_type, severity)
+        table = dataset.to_table(filter=expression, columns=[group_by])
+        counts = (
+            table.group_by(group_by)
+            .aggregate([([], "count_all")])
+            .rename_columns({"count_all": "alert_count"})
+            .select([group_by, "alert_count"])
+        )
+        return counts.sort_by(group_by).to_pylist()
+
+
+cold_storage_service = ColdStorageService()
@@ -0,0 +1,70 @@
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+from core.config import settings
+from core.metrics import CACHE_REQUESTS
+from database.autoawake_db import (
+    Database,
+    get_dashboard_counters,
+    list_active_trip_summaries,
+    list_alerts_today,
+    list_issues,
+)
+from services.fleet_state_service import fleet_state_service
+
+
+class DashboardService:
+    """
+    Builds the admin overview (counters + top-N lists) in one response.
+
+    Counters come from a single aggregate query, active trips from the
+    in-memory fleet state, and the result is cached for
+    DASHBOARD_CACHE_SECONDS so every open dashboard shares the same queries.
+    """
+
+    def __init__(self) -> None:
+        self.ttl_s = settings.dashboard_cache_seconds
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[int, int], Tuple[float, Dict[str, Any]]] = {}
+
+    def overview(self, db: Database, alerts_limit: int = 10, issues_limit: int = 6) -> Dict[str, Any]:
+        key = (alerts_limit, issues_limit)
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            CACHE_REQUESTS.inc("dashboard", "hit")
+            return cached[1]
+        # Un solo request recalcula; los demás esperan y usan el resultado
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                CACHE_REQUESTS.inc("dashboard", "hit")
+                return cached[1]
+            CACHE_REQUESTS.inc("dashboard", "miss")
+            overview = self._build(db, alerts_limit, issues_limit)
+            self._cache[key] = (time.monotonic() + self.ttl_s, overview)
+            return overview
+
+    def _build(self, db: Database, alerts_limit: int, issues_limit: int) -> Dict[str, Any]:
+        if fleet_state_service.ensure_fresh(db):
+            active_trips = fleet_state_service.active_trips()
+        else:
+            active_trips = list_active_trip_summaries(db)
+        drivers_alert = sum(1 for trip in active_trips if trip["critical_alerts"] > 0)
+
+        return {
+            "generated_at": datetime.now(),
+            "counters": get_dashboard_counters(db),
+            "active_trips": {
+                "total_active_trips": len(active_trips),
+                "drivers_alert": drivers_alert,
+                "drivers_ok": len(active_trips) - drivers_alert,
+                "active_trips": active_trips,
+            },
+            "recent_alerts": list_alerts_today(db, alerts_limit),
+            "open_issues": list_issues(db, "OPEN", issues_limit),
+        }
+
+
+dashboard_service = DashboardService()
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import time
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from core.config import settings
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _Subscriber:
+    def __init__(
+        self,
+        vehicle_id: Optional[int],
+        driver_id: Optional[int],
+        event_types: Optional[Set[str]],
+        maxsize: int,
+    ) -> None:
+        self.vehicle_id = vehicle_id
+        self.driver_id = driver_id
+        self.event_types = event_types
+        self.queue: "asyncio.Queue[Optional[Tuple[str, str, str]]]" = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def wants(self, event_type: str, data: Dict[str, Any]) -> bool:
+        if self.event_types and event_type not in self.event_types:
+            return False
+        if self.vehicle_id is not None and data.get("vehicle_id") != self.vehicle_id:
+            return False
+        if self.driver_id is not None and data.get("driver_id") != self.driver_id:
+            return False
+        return True
+
+
+class EventHubService:
+    """
+    Fan-out of live events (alerts, trips, telemetry) from the backend's
+    single MQTT subscription / ingest path to every connected dashboard
+    (GET /events/stream, Server-Sent Events).
+
+    - publish() is thread-safe: the MQTT thread and the threadpool hand the
+      event to the event loop with call_soon_threadsafe.
+    - Each client has a bounded queue. A client that falls behind is
+      disconnected instead of buffering without limit; EventSource
+      reconnects with Last-Event-ID and gets the gap from the replay buffer.
+    - Event ids are "<boot>-<seq>": after a restart old ids don't match and
+      the client gets a `reset` event to refetch its data.
+    """
+
+    def __init__(self) -> None:
+        self.queue_size = settings.events_client_queue_size
+        self.boot_id = str(int(time.time()))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._seq = 0
+        self._replay: Deque[Tuple[int, str, str, Dict[str, Any]]] = deque(
+            maxlen=settings.events_replay_size
+        )
+        self._subscribers: List[_Subscriber] = []
+        self.published = 0
+        self.disconnected_slow = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def stop(self) -> None:
+        loop, self._loop = self._loop, None
+        for subscriber in list(self._subscribers):
+            self._close(subscriber)
+        self._subscribers.clear()
+        if loop is not None:
+            print("Event hub stopped")
+
+    # -----------------------------
+    # Publish (any thread)
+    # -----------------------------
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        payload = json.dumps(data, default=_json_default)
+        try:
+            loop.call_soon_threadsafe(self._dispatch, event_type, payload, data)
+        except RuntimeError:
+            # Loop closed during shutdown
+            pass
+
+    def _dispatch(self, event_type: str, payload: str, data: Dict[str, Any]) -> None:
+        # Corre siempre en el event loop: no hace falta lock
+        self._seq += 1
+        seq = self._seq
+        self._replay.append((seq, event_type, payload, data))
+        self.published += 1
+        event = (self._event_id(seq), event_type, payload)
+        for subscriber in list(self._subscribers):
+            if subscriber.overflowed or not subscriber.wants(event_type, data):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.disconnected_slow += 1
+                self._close(subscriber)
+
+    def _close(self, subscriber: _Subscriber) -> None:
+        subscriber.overflowed = True
+        # Vaciar para dejar lugar al centinela de cierre
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    def _event_id(self, seq: int) -> str:
+        return f"{self.boot_id}-{seq}"
+
+    def _parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        """
+        Returns the sequence to resume after, or -1 if the id is from another
+        boot / no longer in the replay buffer (client must refetch).
+        """
+        if not event_id:
+            return None
+        boot, _, seq = event_id.partition("-")
+        if boot != self.boot_id or not seq.isdigit():
+            return -1
+        seq_num = int(seq)
+        oldest = self._replay[0][0] if self._replay else self._seq + 1
+        if seq_num + 1 < oldest:
+            return -1
+        return seq_num
+
+    # -----------------------------
+    # Subscribe (event loop)
+    # -----------------------------
+    async def subscribe(
+        self,
+        vehicle_id: Optional[int] = None,
+        driver_id: Optional[int] = None,
+        event_types: Optional[Set[str]] = None,
+        last_event_id: Optional[str] = None,
+    ) -> AsyncIterator[Optional[Tuple[str, str, str]]]:
+        """
+        Yields (id, event, data) tuples; yields None on idle timeouts so the
+        caller can send a heartbeat. Ends when the client is too slow or the
+        hub stops.
+        """
+        subscriber = _Subscriber(vehicle_id, driver_id, event_types, self.queue_size)
+        resume_after = self._parse_event_id(last_event_id)
+        backlog: List[Tuple[str, str, str]] = []
+        if resume_after == -1:
+            backlog.append((self._event_id(self._seq), "reset", "{}"))
+        elif resume_after is not None:
+            backlog.extend(
+                (self._event_id(seq), event_type, payload)
+                for seq, event_type, payload, data in self._replay
+                if seq > resume_after and subscriber.wants(event_type, data)
+            )
+        self._subscribers.append(subscriber)
+        try:
+            for event in backlog:
+                yield event
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.events_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "disconnected_slow": self.disconnected_slow,
+            "replay_size": len(self._replay),
+        }
+
+
+event_hub_service = EventHubService()
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List
+
+from fastapi.responses import StreamingResponse
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+    """
+    Convierte lotes de filas (Database.stream_all) en chunks NDJSON o CSV.
+    Cada lote se serializa y se descarta, así la memoria queda acotada
+    por batch_size y no por el total de filas.
+    """
+
+    def ndjson_chunks(self, batches: Iterable[List[Dict[str, Any]]]) -> Iterator[str]:
+        for rows in batches:
+            yield "".join(
+                json.dumps(row, default=_json_default, ensure_ascii=False) + "\n"
+                for row in rows
+            )
+
+    def csv_chunks(self, batches: Iterable[List[Dict[str, Any]]]) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = None
+        for rows in batches:
+            if writer is None:
+                # RowBatch trae las columnas aunque el resultado esté vacío
+                fieldnames = getattr(rows, "columns", None) or (list(rows[0].keys()) if rows else None)
+                if fieldnames is None:
+                    continue
+                writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+                writer.writeheader()
+            writer.writerows({k: _csv_value(v) for k, v in row.items()} for row in rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    def stream_response(
+        self,
+        batches: Iterable[List[Dict[str, Any]]],
+        export_format: str,
+        filename: str,
+    ) -> StreamingResponse:
+        if export_format == "csv":
+            chunks = self.csv_chunks(batches)
+            media_type = "text/csv; charset=utf-8"
+        else:
+            chunks = self.ndjson_chunks(batches)
+            media_type = "application/x-ndjson"
+        return StreamingResponse(
+            chunks,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+        )
+
+
+export_service = ExportService()
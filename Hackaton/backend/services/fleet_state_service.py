@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from core.config import settings
+from core.metrics import CACHE_REQUESTS
+from database.autoawake_db import (
+    Database,
+    get_vehicle_last_alert,
+    list_active_trip_summaries,
+    list_recent_alert_severities,
+)
+
+SEVERITIES = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+HIGH_SEVERITIES = ("HIGH", "CRITICAL")
+
+
+class FleetStateService:
+    """
+    In-process live state for dashboards: active trips (with their alert
+    counters), last alert per vehicle and rolling alert counts.
+
+    Hydrated from MySQL at startup and then updated by the ingest paths
+    (MQTT + HTTP) as alerts and trips arrive, so reads never hit the DB.
+    The state is per process: it is re-hydrated every
+    FLEET_STATE_RESYNC_SECONDS to pick up changes made by other workers.
+    Ages are tracked with time.monotonic() so the DB and app clocks don't
+    need to agree.
+    """
+
+    def __init__(self) -> None:
+        self.window_s = settings.fleet_state_window_minutes * 60
+        self.resync_s = settings.fleet_state_resync_seconds
+        self._lock = threading.RLock()
+        self._hydrate_lock = threading.Lock()
+        self._active_trips: Dict[int, Dict[str, Any]] = {}
+        self._trip_started: Dict[int, float] = {}
+        self._last_alerts: Dict[int, Dict[str, Any]] = {}
+        self._recent: Deque[Tuple[float, str]] = deque()
+        self._hydrated_at: Optional[float] = None
+
+    # -----------------------------
+    # Hydration
+    # -----------------------------
+    def hydrate(self, db: Database) -> None:
+        now = time.monotonic()
+        trips = list_active_trip_summaries(db)
+        last_alerts = get_vehicle_last_alert(db)
+        recent = list_recent_alert_severities(db, settings.fleet_state_window_minutes)
+
+        with self._lock:
+            self._active_trips = {}
+            self._trip_started = {}
+            for row in trips:
+                self._store_trip(row, now)
+            self._last_alerts = {row["vehicle_id"]: dict(row) for row in last_alerts}
+            self._recent = deque(
+                sorted((now - float(row["age_s"] or 0), row["severity"]) for row in recent)
+            )
+            self._hydrated_at = now
+        print(f"Fleet state hydrated: {len(trips)} active trips, {len(last_alerts)} vehicles")
+
+    def is_ready(self) -> bool:
+        return self._hydrated_at is not None
+
+    def ensure_fresh(self, db: Database) -> bool:
+        """
+        Re-hydrates when the snapshot is older than resync_s.
+        Returns False if the state could not be loaded (callers fall back to the DB).
+        """
+        hydrated_at = self._hydrated_at
+        if hydrated_at is not None and time.monotonic() - hydrated_at < self.resync_s:
+            CACHE_REQUESTS.inc("fleet_state", "hit")
+            return True
+        # Only one request reloads; the rest keep serving the current snapshot
+        if not self._hydrate_lock.acquire(blocking=not self.is_ready()):
+            CACHE_REQUESTS.inc("fleet_state", "hit")
+            return True
+        CACHE_REQUESTS.inc("fleet_state", "miss")
+        try:
+            self.hydrate(db)
+            return True
+        except Exception as e:
+            print(f"Error hydrating fleet state: {e}")
+            return self.is_ready()
+        finally:
+            self._hydrate_lock.release()
+
+    def _store_trip(self, row: Dict[str, Any], now: float) -> None:
+        trip = dict(row)
+        started_age_s = float(trip.pop("started_age_s", 0) or 0)
+        self._trip_started[trip["trip_id"]] = now - started_age_s
+        self._active_trips[trip["trip_id"]] = trip
+
+    # -----------------------------
+    # Ingest hooks
+    # -----------------------------
+    def on_trip_started(self, db: Database, trip_id: int) -> None:
+        if not self.is_ready():
+            return
+        try:
+            rows = list_active_trip_summaries(db, trip_id)
+        except Exception as e:
+            print(f"Error loading trip {trip_id} into fleet state: {e}")
+            return
+        with self._lock:
+            for row in rows:
+                self._store_trip(row, time.monotonic())
+
+    def on_trip_ended(self, trip_id: int) -> None:
+        with self._lock:
+            self._active_trips.pop(trip_id, None)
+            self._trip_started.pop(trip_id, None)
+
+    def on_alert(
+        self,
+        alert: Optional[Dict[str, Any]],
+        alert_type: str,
+        severity: str,
+        message: Optional[str],
+    ) -> None:
+        """
+        `alert` is the row returned by log_alert (alert_id, vehicle_id,
+        driver_id, trip_id, detected_at).
+        """
+        if not alert or not self.is_ready():
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._recent.append((now, severity))
+            self._prune(now)
+
+            trip = self._active_trips.get(alert["trip_id"])
+            if trip is not None:
+                trip["total_alerts"] = (trip.get("total_alerts") or 0) + 1
+                if severity in HIGH_SEVERITIES:
+                    trip["critical_alerts"] = (trip.get("critical_alerts") or 0) + 1
+                trip["last_alert_time"] = alert["detected_at"]
+
+            previous = self._last_alerts.get(alert["vehicle_id"], {})
+            self._last_alerts[alert["vehicle_id"]] = {
+                "vehicle_id": alert["vehicle_id"],
+                "vehicle_plate": previous.get("vehicle_plate")
+                or (trip or {}).get("vehicle_plate"),
+                "alert_id": alert["alert_id"],
+                "alert_type": alert_type,
+                "severity": severity,
+                "message": message,
+                "detected_at": alert["detected_at"],
+            }
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_s
+        while self._recent and self._recent[0][0] < cutoff:
+            self._recent.popleft()
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def active_trips(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            trips = []
+            for trip_id, trip in self._active_trips.items():
+                row = dict(trip)
+                row["duration_minutes"] = int((now - self._trip_started[trip_id]) // 60)
+                trips.append(row)
+        trips.sort(
+            key=lambda t: (t.get("critical_alerts") or 0, t.get("total_alerts") or 0),
+            reverse=True,
+        )
+        return trips
+
+    def trip(self, trip_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            trip = self._active_trips.get(trip_id)
+            return dict(trip) if trip else None
+
+    def last_alerts(self, vehicle_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            if vehicle_id is not None:
+                row = self._last_alerts.get(vehicle_id)
+                return [dict(row)] if row else []
+            return [dict(row) for row in self._last_alerts.values()]
+
+    def alert_counts(self, minutes: Optional[int] = None) -> Dict[str, Any]:
+        window_s = min(minutes * 60, self.window_s) if minutes else self.window_s
+        now = time.monotonic()
+        cutoff = now - window_s
+        counts = {severity: 0 for severity in SEVERITIES}
+        with self._lock:
+            self._prune(now)
+            for ts, severity in reversed(self._recent):
+                if ts < cutoff:
+                    break
+                counts[severity] = counts.get(severity, 0) + 1
+        return {
+            "window_minutes": window_s // 60,
+            "total": sum(counts.values()),
+            "by_severity": counts,
+        }
+
+
+fleet_state_service = FleetStateService()
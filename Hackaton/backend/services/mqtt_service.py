@@ -1,18 +1,16 @@
 import json
 import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
 import paho.mqtt.client as mqtt
 from core.config import settings
-from database.autoawake_db import (
-    Database,
-    log_alert,
-    start_trip,
-    end_trip,
-    get_active_trip_by_pair,
-    get_driver_by_full_name,
-    get_vehicle_by_plate,
-    consume_trip_plan,
-)
-from services.telegram_service import telegram_service
+from core.metrics import MQTT_INGEST_LAG, MQTT_PROCESSED, MQTT_PROCESSING, MQTT_RECEIVED
+from database.autoawake_db import Database
+from services.alert_ingest_service import alert_ingest_service
+from services.bpm_ingest_service import bpm_ingest_service
+from services.event_hub_service import event_hub_service
+from services.fleet_state_service import fleet_state_service
 
 import ssl
 
@@ -24,6 +22,7 @@ class MQTTService:
         self.password = settings.mqtt_password
         self.topic_alerts = settings.mqtt_topic_alerts
         self.topic_control = settings.mqtt_topic_control
+        self.topic_bpm = settings.mqtt_topic_bpm
 
         self.client = mqtt.Client()
 
@@ -36,7 +35,7 @@ class MQTTService:
             
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
-        self.db = Database() # Create a dedicated DB instance for the service
+        self.db: Optional[Database] = None  # ingest pool, set in start()
 
     def on_connect(self, client, userdata, flags, rc):
         conn_codes = {
@@ -49,80 +48,117 @@ class MQTTService:
         }
         print(f"MQTT Connected with result code {rc}: {conn_codes.get(rc, 'Unknown error')}")
         if rc == 0:
-            client.subscribe(self.topic_alerts)
+            client.subscribe([(self.topic_alerts, 0), (self.topic_bpm, 0)])
 
     def on_message(self, client, userdata, msg):
+        MQTT_RECEIVED.inc(msg.topic)
+        started = time.perf_counter()
+        result = "ok"
         try:
             payload = json.loads(msg.payload.decode())
+            self._observe_lag(msg.topic, payload)
+
+            if msg.topic == self.topic_bpm:
+                # Telemetría de alta frecuencia: sin log por mensaje
+                result = self.handle_bpm(payload)
+                return
+
+            if msg.topic == self.topic_alerts and isinstance(payload, list):
+                print(f"Received batch of {len(payload)} alerts on {msg.topic}")
+                result = self.handle_alert_batch(payload)
+                return
+
             print(f"Received message on {msg.topic}: {payload}")
             
             if msg.topic == self.topic_alerts:
-                self.handle_alert(payload)
+                result = self.handle_alert(payload)
                 
+        except ValueError as e:
+            result = "invalid"
+            print(f"Invalid message on {msg.topic}: {e}")
         except Exception as e:
+            result = "error"
             print(f"Error processing message: {e}")
+        finally:
+            MQTT_PROCESSED.inc(msg.topic, result)
+            MQTT_PROCESSING.observe(time.perf_counter() - started, msg.topic)
+
+    def _observe_lag(self, topic: str, payload: Dict[str, Any]) -> None:
+        """
+        Atraso entre el timestamp del dispositivo (si el payload lo trae) y
+        el procesamiento en el backend.
+        """
+        for item in payload if isinstance(payload, list) else [payload]:
+            value = item.get("timestamp") if isinstance(item, dict) else None
+            if not isinstance(value, str):
+                continue
+            try:
+                sent_at = datetime.fromisoformat(value)
+            except ValueError:
+                continue
+            now = datetime.now(sent_at.tzinfo) if sent_at.tzinfo else datetime.now()
+            MQTT_INGEST_LAG.observe(max((now - sent_at).total_seconds(), 0.0), topic)
 
     def handle_alert(self, payload):
         try:
             # Expected payload: {"trip_id": 1, "alert_type": "DROWSINESS", "severity": "HIGH", "message": "Driver is drowsy"}
-            trip_id = payload.get("trip_id")
-            alert_type = payload.get("alert_type")
-            severity = payload.get("severity")
-            message = payload.get("message")
-
-            if alert_type == "TRIP":
-                # Manejo especial: toggle de viaje usando driver/vehículo
-                driver_id = payload.get("driver_id")
-                vehicle_id = payload.get("vehicle_id")
-                if not driver_id and payload.get("driver_name"):
-                    driver = get_driver_by_full_name(self.db, payload["driver_name"])
-                    driver_id = driver["driver_id"] if driver else None
-                if not vehicle_id and payload.get("vehicle_plate"):
-                    vehicle = get_vehicle_by_plate(self.db, payload["vehicle_plate"])
-                    vehicle_id = vehicle["vehicle_id"] if vehicle else None
-
-                if not (driver_id and vehicle_id):
-                    print("TRIP alert missing driver/vehicle identifiers.")
-                    return
-
-                active_trip = get_active_trip_by_pair(self.db, driver_id, vehicle_id)
-                if active_trip:
-                    end_trip(self.db, active_trip["trip_id"], None)
-                    trip_id = active_trip["trip_id"]
-                    action_msg = "Trip finalizado automáticamente por alerta TRIP"
-                else:
-                    plan = consume_trip_plan(self.db, driver_id, vehicle_id)
-                    origin = payload.get("origin") or (plan["origin"] if plan else "Origen automático")
-                    destination = payload.get("destination") or (plan["destination"] if plan else "Destino asignado")
-                    trip_id = start_trip(self.db, vehicle_id, driver_id, origin, destination)
-                    action_msg = "Trip iniciado automáticamente por alerta TRIP"
-
-                log_alert(self.db, trip_id, "TRIP", severity or "LOW", message or action_msg)
-                telegram_service.send_alert(
-                    self.db,
-                    "TRIP",
-                    severity or "LOW",
-                    message or action_msg,
-                    trip_id,
-                )
-                print(f"TRIP alert processed for trip {trip_id}")
-                return
-
-            if all([trip_id, alert_type, severity, message]):
-                log_alert(self.db, trip_id, alert_type, severity, message)
-                telegram_service.send_alert(
-                    self.db,
-                    alert_type,
-                    severity,
-                    message,
-                    trip_id,
-                )
-                print(f"Alert logged: {message}")
+            # TRIP: {"alert_type": "TRIP", "driver_id"|"driver_name", "vehicle_id"|"vehicle_plate", ...}
+            result = alert_ingest_service.ingest(self.db, payload)
+            if payload.get("alert_type") == "TRIP":
+                print(f"TRIP alert processed for trip {result['trip_id']}")
             else:
-                print("Incomplete alert data")
-
+                print(f"Alert logged: {payload.get('message')}")
+            return "ok"
+        except ValueError as e:
+            print(f"Invalid alert payload: {e}")
+            return "invalid"
         except Exception as e:
             print(f"Error saving alert to DB: {e}")
+            return "error"
+
+    def handle_alert_batch(self, payloads):
+        """
+        Lista de alertas en un solo mensaje (backlog offline, gateways).
+        Resultado del mensaje: error si alguna alerta falló, invalid si
+        alguna se rechazó, ok si se guardaron todas.
+        """
+        try:
+            batch = alert_ingest_service.ingest_batch(self.db, payloads)
+        except ValueError as e:
+            print(f"Invalid alert batch: {e}")
+            return "invalid"
+        except Exception as e:
+            print(f"Error saving alert batch to DB: {e}")
+            return "error"
+        statuses = {item["status"] for item in batch["results"]}
+        print(f"Alert batch processed: {batch['logged']}/{batch['received']} logged")
+        for item in batch["results"]:
+            if item["status"] != "ok":
+                print(f"Alert {item['index']} in batch {item['status']}: {item.get('error')}")
+        if "error" in statuses:
+            return "error"
+        return "invalid" if "invalid" in statuses else "ok"
+
+    def handle_bpm(self, payload):
+        """
+        Encola la muestra para guardarla por lotes (bpm_ingest_service) y la
+        reenvía a los dashboards conectados (SSE), con vehicle/driver del
+        viaje para que los clientes puedan filtrar.
+        Expected payload: {"trip_id": 1, "timestamp": ..., "bpm": 72}
+        """
+        sample = bpm_ingest_service.add(payload)
+        if sample is None:
+            return "invalid"
+        trip_id, _, bpm = sample
+        trip = fleet_state_service.trip(trip_id) or {}
+        event_hub_service.publish("bpm", {
+            "trip_id": trip_id,
+            "bpm": bpm,
+            "timestamp": payload.get("timestamp"),
+            "vehicle_id": trip.get("vehicle_id"),
+            "driver_id": trip.get("driver_id"),
+        })
+        return "ok"
 
     def publish_control(self, action: str):
         """
@@ -133,7 +169,8 @@ class MQTTService:
         self.client.publish(self.topic_control, payload)
         print(f"Published control command: {action}")
 
-    def start(self):
+    def start(self, db: Database):
+        self.db = db
         try:
             self.client.connect(self.broker, self.port, 60)
             self.client.loop_start()
@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from core.config import settings
+from core.metrics import CACHE_REQUESTS
+from database.autoawake_db import (
+    Database,
+    collection_versions,
+    get_driver_by_full_name,
+    get_driver_by_license,
+    get_vehicle_by_plate,
+    list_drivers,
+    list_vehicles,
+    normalize_full_name,
+)
+
+
+class ReferenceIndexService:
+    """
+    In-process lookup of drivers (by normalized full name and license) and
+    vehicles (by plate) for the ingest path, so resolving the driver_name /
+    vehicle_plate of a TRIP alert costs a dict lookup instead of a query.
+
+    Each side is reloaded with one full read of its table when the
+    collection version (bumped by the driver/vehicle writes in
+    autoawake_db) changed since the last load, or every
+    REFERENCE_INDEX_RESYNC_SECONDS to pick up writes made by other workers.
+    A miss falls back to the indexed query, so a driver or vehicle created
+    elsewhere is still found before the next resync.
+    """
+
+    def __init__(self) -> None:
+        self.resync_s = settings.reference_index_resync_seconds
+        self._lock = threading.Lock()
+        self._drivers_by_name: Dict[str, Dict[str, Any]] = {}
+        self._drivers_by_license: Dict[str, Dict[str, Any]] = {}
+        self._vehicles_by_plate: Dict[str, Dict[str, Any]] = {}
+        # colección -> (versión, monotonic) de la última carga
+        self._loaded: Dict[str, Tuple[int, float]] = {}
+
+    def _stale(self, collection: str) -> bool:
+        # Con _lock tomado (_ensure)
+        loaded = self._loaded.get(collection)
+        if loaded is None:
+            return True
+        version, loaded_at = loaded
+        return version != collection_versions.get(collection) or time.monotonic() - loaded_at >= self.resync_s
+
+    def _load_drivers(self, db: Database) -> None:
+        # Con _lock tomado (_ensure)
+        version = collection_versions.get("drivers")
+        rows = list_drivers(db)
+        by_name: Dict[str, Dict[str, Any]] = {}
+        # Con homónimos gana el de menor driver_id, como en get_driver_by_full_name
+        for row in sorted(rows, key=lambda r: r["driver_id"]):
+            by_name.setdefault(normalize_full_name(f"{row['first_name']} {row['last_name']}"), row)
+        by_license = {row["license_number"].lower(): row for row in rows}
+        self._drivers_by_name = by_name
+        self._drivers_by_license = by_license
+        self._loaded["drivers"] = (version, time.monotonic())
+
+    def _load_vehicles(self, db: Database) -> None:
+        # Con _lock tomado (_ensure)
+        version = collection_versions.get("vehicles")
+        rows = list_vehicles(db)
+        by_plate = {row["plate"].lower(): row for row in rows}
+        self._vehicles_by_plate = by_plate
+        self._loaded["vehicles"] = (version, time.monotonic())
+
+    def _ensure(self, db: Database, collection: str) -> bool:
+        # Chequeo y recarga bajo el mismo lock: dos hilos que ven el índice
+        # vencido no lo recargan los dos, y la versión leída en la carga no
+        # queda pisada por una carga más vieja.
+        with self._lock:
+            if not self._stale(collection):
+                CACHE_REQUESTS.inc("reference_index", "hit")
+                return True
+            CACHE_REQUESTS.inc("reference_index", "miss")
+            try:
+                if collection == "drivers":
+                    self._load_drivers(db)
+                else:
+                    self._load_vehicles(db)
+                return True
+            except Exception as e:
+                print(f"Error loading {collection} reference index: {e}")
+                return collection in self._loaded
+
+    def warm(self, db: Database) -> None:
+        self._ensure(db, "drivers")
+        self._ensure(db, "vehicles")
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+    def driver_by_name(self, db: Database, full_name: str) -> Optional[Dict[str, Any]]:
+        if self._ensure(db, "drivers"):
+            driver = self._drivers_by_name.get(normalize_full_name(full_name))
+            if driver is not None:
+                return driver
+        return get_driver_by_full_name(db, full_name)
+
+    def driver_by_license(self, db: Database, license_number: str) -> Optional[Dict[str, Any]]:
+        if self._ensure(db, "drivers"):
+            driver = self._drivers_by_license.get(license_number.strip().lower())
+            if driver is not None:
+                return driver
+        return get_driver_by_license(db, license_number.strip())
+
+    def vehicle_by_plate(self, db: Database, plate: str) -> Optional[Dict[str, Any]]:
+        if self._ensure(db, "vehicles"):
+            vehicle = self._vehicles_by_plate.get(plate.strip().lower())
+            if vehicle is not None:
+                return vehicle
+        return get_vehicle_by_plate(db, plate.strip())
+
+
+reference_index_service = ReferenceIndexService()
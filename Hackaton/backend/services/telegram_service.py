@@ -1,17 +1,23 @@
-from typing import Any, Dict
+import time
+from typing import Any, Dict, List
 
 import requests
 
 from core.config import settings
+from core.metrics import TELEGRAM_LATENCY, TELEGRAM_SENT
 from database.autoawake_db import Database
 
+# Telegram corta los mensajes en 4096 caracteres
+TELEGRAM_MAX_CHARS = 4096
+BATCH_MESSAGE_MAX_LINES = 30
+
 
 class TelegramService:
     def __init__(self) -> None:
         self.bot_token = settings.telegram_bot_token
         self.chat_id = settings.telegram_chat_id
         self.base_url = (
-            f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+            f"{settings.telegram_api_url.rstrip('/')}/bot{self.bot_token}/sendMessage"
             if self.bot_token
             else None
         )
@@ -65,12 +71,35 @@ class TelegramService:
                 LIMIT 1
                 """,
                 (trip_id,),
+                prepared=True,
             )
             return row or {}
         except Exception as exc:
             print(f"Error fetching trip context for Telegram: {exc}")
             return {}
 
+    def _get_trips_context(self, db: Database, trip_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Same as _get_trip_context for several trips in one query."""
+        try:
+            placeholders = ", ".join(["%s"] * len(trip_ids))
+            rows = db.fetch_all(
+                f"""
+                SELECT
+                    t.trip_id,
+                    CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
+                    v.plate AS vehicle_plate
+                FROM trips t
+                JOIN drivers d ON d.driver_id = t.driver_id
+                JOIN vehicles v ON v.vehicle_id = t.vehicle_id
+                WHERE t.trip_id IN ({placeholders})
+                """,
+                tuple(trip_ids),
+            )
+            return {row["trip_id"]: row for row in rows}
+        except Exception as exc:
+            print(f"Error fetching trip context for Telegram: {exc}")
+            return {}
+
     def send_alert(
         self,
         db: Database,
@@ -84,19 +113,58 @@ class TelegramService:
         """
         if not self.is_configured():
             print("Telegram not configured; skipping notification.")
+            TELEGRAM_SENT.inc("skipped")
             return
 
         context = self._get_trip_context(db, trip_id)
-        text = self._build_alert_message(alert_type, severity, message, trip_id, context)
+        self._send(self._build_alert_message(alert_type, severity, message, trip_id, context))
+
+    def send_alerts(self, db: Database, alerts: List[Dict[str, Any]]) -> None:
+        """
+        One notification for a batch of alerts (POST /alerts/batch, MQTT list
+        payloads) instead of one per alert. Each item has alert_type,
+        severity, message and trip_id.
+        """
+        if not alerts:
+            return
+        if len(alerts) == 1:
+            alert = alerts[0]
+            self.send_alert(db, alert["alert_type"], alert["severity"], alert["message"], alert["trip_id"])
+            return
+        if not self.is_configured():
+            print("Telegram not configured; skipping notification.")
+            TELEGRAM_SENT.inc("skipped")
+            return
+
+        contexts = self._get_trips_context(db, sorted({alert["trip_id"] for alert in alerts}))
+        lines = [f"{len(alerts)} alertas activadas en AutoAwakeAI"]
+        for alert in alerts[:BATCH_MESSAGE_MAX_LINES]:
+            context = contexts.get(alert["trip_id"], {})
+            who = ", ".join(v for v in (context.get("driver_name"), context.get("vehicle_plate")) if v)
+            suffix = f" ({who})" if who else ""
+            lines.append(
+                f"- [{alert['severity']}] {alert['alert_type']} viaje {alert['trip_id']}{suffix}: {alert['message']}"
+            )
+        if len(alerts) > BATCH_MESSAGE_MAX_LINES:
+            lines.append(f"... y {len(alerts) - BATCH_MESSAGE_MAX_LINES} más")
+        self._send("\n".join(lines)[:TELEGRAM_MAX_CHARS])
 
+    def _send(self, text: str) -> None:
         payload = {"chat_id": self.chat_id, "text": text}
 
+        started = time.perf_counter()
         try:
             resp = requests.post(self.base_url, json=payload, timeout=10)
             if resp.status_code >= 300:
                 print(f"Failed to send Telegram alert [{resp.status_code}]: {resp.text}")
+                TELEGRAM_SENT.inc("http_error")
+            else:
+                TELEGRAM_SENT.inc("ok")
         except Exception as exc:
             print(f"Error sending Telegram alert: {exc}")
+            TELEGRAM_SENT.inc("error")
+        finally:
+            TELEGRAM_LATENCY.observe(time.perf_counter() - started)
 
 
 telegram_service = TelegramService()
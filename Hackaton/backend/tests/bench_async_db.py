@@ -0,0 +1,126 @@
+"""
+Benchmark: Database (mysql-connector, threadpool) vs AsyncDatabase (aiomysql).
+
+Simula cómo Starlette atiende las rutas:
+- sync:     ruta `def` -> se ejecuta en el threadpool de anyio (40 hilos por defecto)
+- blocking: ruta `async def` que llama a la BD bloqueante (como el login anterior)
+- async:    ruta `async def` que hace `await` sobre AsyncDatabase
+
+Cada "request" ejecuta la consulta de sesión activa más un SELECT SLEEP()
+para emular latencia de red/servidor. Además se mide el lag del event loop,
+que es lo que percibe cualquier otra request mientras el loop está bloqueado.
+
+Uso:
+    python -m tests.bench_async_db --requests 500 --concurrency 100 --sleep 0.02
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import anyio.to_thread
+
+from database.autoawake_db import ACTIVE_SESSION_QUERY, Database, DBConfig
+from database.autoawake_async_db import AsyncDatabase
+
+SLEEP_QUERY = "SELECT SLEEP(%s) AS slept"
+
+
+def sync_request(db: Database, sleep_s: float) -> None:
+    db.fetch_one(ACTIVE_SESSION_QUERY, ("bench-token",))
+    db.fetch_one(SLEEP_QUERY, (sleep_s,))
+
+
+async def async_request(db: AsyncDatabase, sleep_s: float) -> None:
+    await db.fetch_one(ACTIVE_SESSION_QUERY, ("bench-token",))
+    await db.fetch_one(SLEEP_QUERY, (sleep_s,))
+
+
+async def loop_lag_monitor(stop: asyncio.Event, samples: list) -> None:
+    interval = 0.005
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def run_mode(mode: str, args, sync_db: Database, async_db: AsyncDatabase) -> dict:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    errors = 0
+
+    async def one_request():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if mode == "sync":
+                    await anyio.to_thread.run_sync(sync_request, sync_db, args.sleep)
+                elif mode == "blocking":
+                    sync_request(sync_db, args.sleep)
+                else:
+                    await async_request(async_db, args.sleep)
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    stop = asyncio.Event()
+    lag_samples = []
+    monitor = asyncio.create_task(loop_lag_monitor(stop, lag_samples))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await monitor
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "ok": len(latencies),
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        "max_loop_lag_ms": max(lag_samples, default=0.0) * 1000,
+    }
+
+
+async def main(args) -> None:
+    sync_db = Database(DBConfig(pool_size=args.pool_size))
+    async_db = AsyncDatabase(DBConfig(pool_size=args.async_pool_size))
+    await async_db.connect()
+
+    try:
+        results = [await run_mode(mode, args, sync_db, async_db) for mode in args.modes]
+    finally:
+        await async_db.close()
+
+    print(
+        f"requests={args.requests} concurrency={args.concurrency} "
+        f"sleep={args.sleep}s sync_pool={args.pool_size} async_pool={args.async_pool_size}"
+    )
+    print(f"{'mode':<10}{'ok':>6}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'loop lag ms':>13}")
+    for r in results:
+        print(
+            f"{r['mode']:<10}{r['ok']:>6}{r['errors']:>6}{r['rps']:>10.1f}"
+            f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['max_loop_lag_ms']:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--sleep", type=float, default=0.02, help="SELECT SLEEP por request (s)")
+    parser.add_argument("--pool-size", type=int, default=5, help="pool de mysql-connector")
+    parser.add_argument("--async-pool-size", type=int, default=20, help="pool de aiomysql")
+    parser.add_argument("--modes", nargs="+", default=["sync", "blocking", "async"],
+                        choices=["sync", "blocking", "async"])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,61 @@
+"""
+Benchmark: alta de vehículos fila por fila (create_vehicle, como N llamadas
+a POST /vehicles/) vs importación masiva (bulk_import_service, como
+POST /vehicles/bulk: validación previa + INSERT multi-fila por lote).
+
+Necesita MySQL con el esquema. Usa patentes con un prefijo propio
+(BENCH-xxxxx) y las borra al terminar.
+
+Uso:
+    python -m tests.bench_bulk_import --rows 10000 --single 500
+"""
+import argparse
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from database.autoawake_db import Database, DBConfig, create_vehicle
+from services.bulk_import_service import bulk_import_service
+
+PREFIX = "BENCH-"
+
+
+def cleanup(db: Database) -> None:
+    db.execute("DELETE FROM vehicles WHERE plate LIKE %s", (PREFIX + "%",))
+
+
+def main(args) -> None:
+    db = Database(DBConfig(pool_name="bench_bulk"))
+    cleanup(db)
+    try:
+        started = time.perf_counter()
+        for i in range(args.single):
+            create_vehicle(db, f"{PREFIX}S{i:05d}", "Bench", "Single")
+        single_s = time.perf_counter() - started
+        per_row = single_s / max(args.single, 1)
+        print(f"row by row: {args.single} rows in {single_s:.2f}s ({per_row * 1000:.2f} ms/row, "
+              f"~{per_row * args.rows:.1f}s for {args.rows})")
+
+        rows = [
+            {"plate": f"{PREFIX}B{i:05d}", "brand": "Bench", "model": "Bulk", "status": "ACTIVE"}
+            for i in range(args.rows)
+        ]
+        # Algunas repetidas para ejercitar el reporte de conflictos
+        rows += rows[: args.rows // 100]
+        started = time.perf_counter()
+        result = bulk_import_service.import_vehicles(db, rows)
+        bulk_s = time.perf_counter() - started
+        print(f"bulk:       {len(rows)} rows in {bulk_s:.2f}s, inserted={result['inserted']} "
+              f"conflicts={len(result['conflicts'])} (chunk={bulk_import_service.chunk_size})")
+        print(f"speedup per row: {per_row * args.rows / bulk_s:.1f}x")
+    finally:
+        cleanup(db)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--single", type=int, default=500, help="filas del alta una por una (se extrapola)")
+    main(parser.parse_args())
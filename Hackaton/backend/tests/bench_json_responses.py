@@ -0,0 +1,120 @@
+"""
+Benchmark: serialización de listados con response_model (pydantic) vs
+model_rows (orjson sobre las filas de la BD, core/responses.py).
+
+Arma una app FastAPI en memoria con dos rutas que devuelven las mismas
+N filas con la forma de GET /alerts/ (dicts como los de mysql-connector,
+con datetime) y mide requests/s con TestClient. No necesita MySQL.
+También verifica que ambas rutas devuelvan el mismo JSON y documenten el
+mismo schema en OpenAPI.
+
+Uso:
+    python -m tests.bench_json_responses --rows 1000 --requests 200
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+# La ruta /fast mide el camino orjson, que en la API es opt-in
+os.environ["FAST_JSON_RESPONSES"] = "true"
+
+from core.responses import model_rows
+from schemas.crud_schemas import AlertResponse
+
+SEVERITIES = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+
+def make_rows(count: int) -> List[dict]:
+    now = datetime.now().replace(microsecond=0)
+    return [
+        {
+            "alert_id": count - i,
+            "driver_id": i % 50 + 1,
+            "vehicle_id": i % 20 + 1,
+            "trip_id": i % 300 + 1,
+            "alert_type": "DROWSINESS",
+            "severity": SEVERITIES[i % 4],
+            "message": f"Driver is drowsy ({i})",
+            "detected_at": now - timedelta(seconds=i * 7),
+            "created_at": now - timedelta(seconds=i * 7),
+            "updated_at": now - timedelta(seconds=i * 7),
+            "driver_name": "Juan Perez",
+            "vehicle_plate": f"ABC-{i % 20:03d}",
+        }
+        for i in range(count)
+    ]
+
+
+def build_app(rows: List[dict]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/pydantic", response_model=List[AlertResponse])
+    def pydantic_rows(response: Response):
+        response.headers["X-Next-Cursor"] = "bench"
+        return rows
+
+    @app.get("/fast", response_model=List[AlertResponse])
+    def fast_rows(response: Response):
+        response.headers["X-Next-Cursor"] = "bench"
+        return model_rows(rows, AlertResponse, response)
+
+    return app
+
+
+def run(client: TestClient, path: str, requests: int) -> dict:
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        resp = client.get(path)
+        resp.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "path": path,
+        "rps": len(latencies) / sum(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "bytes": len(resp.content),
+    }
+
+
+def main(args) -> None:
+    app = build_app(make_rows(args.rows))
+    client = TestClient(app)
+
+    slow, fast = client.get("/pydantic"), client.get("/fast")
+    assert json.loads(slow.content) == json.loads(fast.content), "bodies differ"
+    assert slow.headers["X-Next-Cursor"] == fast.headers["X-Next-Cursor"]
+    paths = app.openapi()["paths"]
+    schemas = []
+    for path in ("/pydantic", "/fast"):
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        schema.pop("title")  # deriva del nombre de la función
+        schemas.append(schema)
+    assert schemas[0] == schemas[1], "OpenAPI schemas differ"
+
+    for _ in range(args.warmup):
+        client.get("/pydantic")
+        client.get("/fast")
+
+    results = [run(client, "/pydantic", args.requests), run(client, "/fast", args.requests)]
+    print(f"rows={args.rows} requests={args.requests}")
+    print(f"{'path':<12}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'bytes':>10}")
+    for r in results:
+        print(f"{r['path']:<12}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['bytes']:>10}")
+    print(f"speedup p50: {results[0]['p50_ms'] / results[1]['p50_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    main(parser.parse_args())
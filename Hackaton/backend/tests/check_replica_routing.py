@@ -0,0 +1,97 @@
+"""
+Prueba del ruteo de lecturas a réplicas de Database (DB_REPLICAS).
+
+Necesita dos (o más) instancias de MySQL con la misma base y el mismo
+usuario, por ejemplo el primario en 3306 y otra instancia local en 3307
+(no hace falta que replique: sin SHOW REPLICA STATUS se chequea sólo que
+responda). Cada servidor se identifica por @@server_uuid.
+
+Verifica que:
+- las lecturas con replica=True se reparten round-robin entre las réplicas;
+- las lecturas sin replica=True van al primario;
+- después de una escritura, las lecturas del mismo contexto (un request
+  en la API) van al primario durante --sticky segundos;
+- con --stop-replica, tras apagar la réplica a mano, las lecturas vuelven
+  al primario sin error.
+
+Uso:
+    python -m tests.check_replica_routing --replica 127.0.0.1:3307
+"""
+import argparse
+import collections
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from database.autoawake_db import Database, DBConfig
+
+SERVER_QUERY = "SELECT @@server_uuid AS server_uuid, @@port AS port"
+
+
+def servers_for(db: Database, reads: int, replica: bool) -> collections.Counter:
+    counter: collections.Counter = collections.Counter()
+    for _ in range(reads):
+        row = db.fetch_one(SERVER_QUERY, replica=replica)
+        counter[(row["server_uuid"], row["port"])] += 1
+    return counter
+
+
+def check(name: str, ok: bool, detail: collections.Counter) -> bool:
+    ports = ", ".join(f"{port}: {count}" for (_, port), count in sorted(detail.items(), key=lambda i: i[0][1]))
+    print(f"[{'OK' if ok else 'FAIL'}] {name} ({ports})")
+    return ok
+
+
+def main(args) -> None:
+    db = Database(DBConfig(
+        replicas=args.replica,
+        replica_sticky_seconds=args.sticky,
+        replica_check_interval=1,
+    ))
+    db.replicas.start()
+    try:
+        primary = db.fetch_one(SERVER_QUERY)["server_uuid"]
+        results = []
+
+        reads = servers_for(db, args.reads, replica=True)
+        results.append(check(
+            "replica reads avoid the primary and hit every replica",
+            primary not in {uuid for uuid, _ in reads} and len(reads) == len(args.replica),
+            reads,
+        ))
+
+        reads = servers_for(db, args.reads, replica=False)
+        results.append(check("plain reads stay on the primary", set(reads) and {u for u, _ in reads} == {primary}, reads))
+
+        db.execute("DO 0")
+        reads = servers_for(db, args.reads, replica=True)
+        results.append(check("reads right after a write stay on the primary", {u for u, _ in reads} == {primary}, reads))
+
+        time.sleep(args.sticky)
+        reads = servers_for(db, args.reads, replica=True)
+        results.append(check("after the sticky window reads go back to replicas", primary not in {u for u, _ in reads}, reads))
+
+        if args.stop_replica:
+            input("Stop the replica(s) now and press Enter...")
+            reads = servers_for(db, args.reads, replica=True)
+            results.append(check("replica down: reads fall back to the primary", {u for u, _ in reads} == {primary}, reads))
+
+        for replica in db.replicas.stats():
+            print(
+                f"{replica['address']}: healthy={replica['healthy']} reads={replica['reads']} "
+                f"failures={replica['failures']} last_error={replica['last_error']}"
+            )
+        print("all checks passed" if all(results) else "some checks FAILED")
+    finally:
+        db.replicas.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replica", action="append", required=True, help="host:puerto (repetible)")
+    parser.add_argument("--reads", type=int, default=20)
+    parser.add_argument("--sticky", type=float, default=1.0, help="DB_REPLICA_STICKY_SECONDS")
+    parser.add_argument("--stop-replica", action="store_true", help="probar el fallback al primario")
+    main(parser.parse_args())
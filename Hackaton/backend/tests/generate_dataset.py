@@ -0,0 +1,951 @@
+"""
+Generador de un dataset sintético a escala de producción para AutoAwakeAI.
+
+05_sample_data.sql trae un puñado de filas: con eso cualquier consulta es
+rápida. Este script llena un MySQL local con volúmenes realistas para
+medir cambios de consultas e índices contra datos parecidos a producción.
+Todo se escala con --scale (SF):
+
+    SF 1 ≈ 500 vehículos, 625 conductores, ~400k viajes y ~4M alertas en
+    2 años; SF 5 ≈ 20M alertas. --dry-run genera sin escribir e informa los
+    conteos (sirve para calibrar antes de cargar).
+
+Qué genera, día por día (así los ids quedan en orden temporal, como en
+producción):
+- conductores y vehículos que se suman a la flota a lo largo del período,
+  con bajas (INACTIVE) y vehículos en MAINTENANCE al final;
+- asignaciones con historial: cada --rotation-days una parte de la flota
+  cambia de conductor;
+- viajes por vehículo con más carga en días hábiles y horas pico,
+  duración log-normal, algunos CANCELLED y los que siguen en curso al
+  final quedan IN_PROGRESS;
+- alertas en ráfagas (la severidad escala dentro de la ráfaga), con tasa
+  por conductor (pocos conductores concentran la mayoría), más alta de
+  noche, después de almorzar y a medida que avanza el viaje; más las
+  alertas TRIP de inicio/fin que registra la ingesta;
+- issues ligadas a viajes (más probables con muchas alertas graves) y de
+  mantenimiento, cerradas salvo las recientes;
+- usuarios (un DRIVER por conductor, managers y admins, todos con la clave
+  --password) y sesiones de login con sus logouts;
+- dispositivos, vehicle_status y, para los últimos --bpm-days días,
+  bpm_minute.
+
+Camino rápido de carga: una conexión propia con unique_checks y
+foreign_key_checks apagados (la integridad la garantiza el generador),
+ids explícitos y LOAD DATA LOCAL INFILE por lotes de --batch filas (el
+servidor necesita local_infile=ON; si no, sigue con INSERT multi-fila).
+Los triggers de INSERT de las tablas cargadas se suspenden durante la
+carga y el generador escribe lo que ellos mantendrían (contadores de
+trips, vehicle_status); se guardan en --triggers-backup y se recrean al
+terminar, aunque la carga falle. Si el proceso muere a la mitad:
+    python -m tests.generate_dataset --restore-triggers dataset_triggers.json
+Después se crean las particiones mensuales de alerts que falten hacia
+atrás (12_alerts_partitioning.sql), se corren los rollups
+(sp_rollup_alerts) y ANALYZE TABLE.
+
+Sólo para una base local de desarrollo, con el backend detenido. Con
+ALERTS_RETENTION_MONTHS > 0 el backend archivará los meses viejos.
+
+Uso (después de python init_db.py):
+    python -m tests.generate_dataset --scale 1 --dry-run
+    python -m tests.generate_dataset --scale 5 --years 2 --truncate
+    python -m tests.generate_dataset --scale 1 --tag gen2    # agrega otra flota
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+import unicodedata
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import mysql.connector
+from mysql.connector import Error, errorcode
+
+from database.autoawake_db import (
+    Database,
+    DBConfig,
+    add_alert_partitions_before,
+    list_alert_partitions,
+    rollup_alerts,
+    table_exists,
+)
+
+# Columnas en el orden en que el generador arma cada fila
+TABLES: Dict[str, Tuple[str, ...]] = {
+    "drivers": ("driver_id", "first_name", "last_name", "license_number", "status", "created_at", "updated_at"),
+    "vehicles": ("vehicle_id", "plate", "brand", "model", "status", "created_at", "updated_at"),
+    "driver_vehicle_assignments": (
+        "assignment_id", "driver_id", "vehicle_id", "assigned_from", "assigned_to", "created_at", "updated_at",
+    ),
+    "trips": (
+        "trip_id", "vehicle_id", "driver_id", "started_at", "ended_at", "origin", "destination", "status",
+        "total_alerts", "high_alerts", "last_alert_at", "created_at", "updated_at",
+    ),
+    "alerts": (
+        "alert_id", "vehicle_id", "driver_id", "trip_id", "alert_type", "severity", "message",
+        "detected_at", "created_at", "updated_at",
+    ),
+    "issues": (
+        "issue_id", "vehicle_id", "driver_id", "trip_id", "issue_type", "description", "status",
+        "reported_at", "resolved_at", "created_at", "updated_at",
+    ),
+    "devices": (
+        "device_id", "vehicle_id", "serial_number", "firmware_version", "last_seen_at", "status",
+        "created_at", "updated_at",
+    ),
+    "vehicle_status": (
+        "vehicle_id", "last_alert_id", "last_alert_type", "last_alert_severity", "last_alert_message",
+        "last_alert_detected_at", "open_issues_count",
+    ),
+    "users": (
+        "user_id", "full_name", "email", "password_hash", "password_salt", "role_id", "status",
+        "last_login_at", "created_at", "updated_at",
+    ),
+    "user_sessions": ("session_id", "user_id", "token", "created_at", "expires_at", "revoked_at"),
+    "bpm_minute": ("trip_id", "minute_start", "samples", "bpm_min", "bpm_max", "bpm_sum"),
+}
+# tabla -> PK con AUTO_INCREMENT (los ids se asignan desde MAX + 1)
+ID_COLUMNS = {
+    "drivers": "driver_id",
+    "vehicles": "vehicle_id",
+    "driver_vehicle_assignments": "assignment_id",
+    "trips": "trip_id",
+    "alerts": "alert_id",
+    "issues": "issue_id",
+    "devices": "device_id",
+    "users": "user_id",
+    "user_sessions": "session_id",
+}
+TRUNCATE_TABLES = (
+    "alerts", "issues", "bpm_samples", "bpm_minute",
+    "alert_rollup_hourly", "alert_rollup_daily", "alert_rollup_recent",
+    "trips", "trip_plans", "driver_vehicle_assignments", "devices", "vehicle_status", "vehicles", "drivers",
+)
+EMAIL_DOMAIN = "autoawake.test"
+LOCAL_INFILE_ERRORS = (errorcode.ER_CLIENT_LOCAL_FILES_DISABLED, errorcode.ER_NOT_ALLOWED_COMMAND)
+# Filas por sentencia en el camino INSERT (max_allowed_packet por defecto: 64 MB)
+INSERT_CHUNK_ROWS = 5000
+
+FIRST_NAMES = (
+    "Carlos", "Ana", "Diego", "María", "José", "Lucía", "Juan", "Sofía", "Luis", "Valeria", "Jorge", "Camila",
+    "Miguel", "Daniela", "Pedro", "Gabriela", "Fernando", "Andrea", "Ricardo", "Paola", "Héctor", "Mónica",
+    "Óscar", "Claudia", "Mario", "Patricia", "Edgar", "Rosa", "Sergio", "Elena", "Julio", "Karla", "Manuel",
+    "Silvia", "Rubén", "Alejandra", "Víctor", "Natalia", "Raúl", "Beatriz",
+)
+LAST_NAMES = (
+    "Ramírez", "López", "Martínez", "García", "Hernández", "Pérez", "González", "Rodríguez", "Sánchez",
+    "Morales", "Castillo", "Méndez", "Ortiz", "Juárez", "Cruz", "Reyes", "Flores", "Gómez", "Díaz", "Vásquez",
+    "Aguilar", "Chávez", "Estrada", "Herrera", "Mejía", "Rivera", "Barrios", "Cifuentes", "Monterroso",
+    "Xicará", "Ajú", "Tzoc", "Orellana", "Paz", "Soto", "Cabrera", "Figueroa", "Salazar", "Velásquez", "Lemus",
+)
+PLACES = (
+    "Planta Central", "Bodega Occidente", "Puerto Quetzal", "Puerto Barrios", "Centro de Distribución Norte",
+    "Escuintla", "Quetzaltenango", "Mazatenango", "Chimaltenango", "Cobán", "Zacapa", "Antigua Guatemala",
+    "Huehuetenango", "Retalhuleu", "Santa Lucía Cotzumalguapa", "Jutiapa", "Santa Elena, Petén", "Villa Nueva",
+    "Mixco", "Amatitlán", "Chiquimula", "Tecún Umán", "Sololá", "Salamá",
+)
+VEHICLE_MODELS = (
+    ("Toyota", "Hilux", 5), ("Isuzu", "NQR 75", 4), ("Hyundai", "H1", 2), ("Hino", "300", 3),
+    ("Mitsubishi", "Canter", 3), ("Nissan", "Frontier", 2), ("Freightliner", "M2 106", 2),
+    ("International", "4300", 1), ("Volvo", "FH", 1), ("Mercedes-Benz", "Sprinter", 2),
+)
+FIRMWARE = ("1.0.0", "1.0.1", "1.1.0", "1.2.0", "1.2.1", "1.3.0")
+
+SEVERITIES = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+# tipo -> (peso de día, peso de noche, pesos de severidad inicial, mensajes)
+ALERT_TYPES = {
+    "DROWSINESS": (0.40, 0.70, (0.00, 0.50, 0.40, 0.10), (
+        "Driver is drowsy", "Micro-sueño detectado", "Ojos cerrados prolongados", "Bostezos repetidos",
+    )),
+    "LOOKING-AWAY": (0.48, 0.25, (0.30, 0.60, 0.10, 0.00), (
+        "Driver looking away", "Mirada fuera de la vía",
+    )),
+    "DISTRACTION": (0.12, 0.05, (0.70, 0.30, 0.00, 0.00), (
+        "Uso de teléfono detectado", "Conductor distraído",
+    )),
+}
+TRIP_START_MESSAGE = "Trip iniciado automáticamente por alerta TRIP"
+TRIP_END_MESSAGE = "Trip finalizado automáticamente por alerta TRIP"
+# tipo -> (peso, descripciones)
+ISSUE_TYPES = {
+    "MECHANICAL": (0.45, ("Ruido en frenos delanteros", "Falla en luces traseras", "Llanta con baja presión",
+                          "Revisión de motor pendiente", "Fuga de aceite")),
+    "SAFETY": (0.40, ("Cinturón no utilizado durante parte del trayecto", "Exceso de velocidad reportado",
+                      "Conducción con somnolencia reiterada", "Pausa de descanso omitida")),
+    "OTHER": (0.15, ("Revisión general pendiente", "Cámara del dispositivo desalineada",
+                     "Retraso por bloqueo en carretera")),
+}
+# Peso de cada hora del día para el inicio de los viajes
+TRIP_START_HOURS = (1, 1, 1, 1, 2, 5, 9, 10, 9, 7, 6, 5, 5, 6, 6, 6, 7, 7, 5, 4, 3, 2, 2, 1)
+NIGHT_HOURS = {22, 23, 0, 1, 2, 3, 4, 5}
+
+
+def alert_time_factor(hour: int) -> float:
+    """Multiplicador de la tasa de alertas por hora del día (máximo 2.5)."""
+    if 0 <= hour < 6:
+        return 2.5
+    if hour >= 22:
+        return 1.8
+    if 13 <= hour < 16:
+        return 1.5
+    return 1.0
+
+
+MAX_TIME_FACTOR = 2.5
+# Aumento de la tasa por hora de manejo acumulada (fatiga)
+FATIGUE_PER_HOUR = 0.3
+
+
+def poisson(rng: random.Random, lam: float) -> int:
+    threshold, k, p = math.exp(-lam), 0, rng.random()
+    while p > threshold:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def ascii_slug(text: str) -> str:
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", text.lower()) if c.isascii() and (c.isalnum() or c == " ")
+    ).replace(" ", "")
+
+
+def _tsv(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, str):
+        return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+    return str(value)
+
+
+class Loader:
+    """
+    Junta filas por tabla y las carga por lotes de batch_rows en su propia
+    conexión (un COMMIT por lote). Con conn=None sólo cuenta (--dry-run).
+    """
+
+    def __init__(self, conn, method: str, batch_rows: int) -> None:
+        self.conn = conn
+        self.method = method
+        self.batch_rows = batch_rows
+        self.buffers: Dict[str, List[Sequence[Any]]] = {table: [] for table in TABLES}
+        self.loaded: Counter = Counter()
+        self.tmpdir = tempfile.mkdtemp(prefix="autoawake_dataset_") if conn is not None else None
+
+    def add(self, table: str, row: Sequence[Any]) -> None:
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_rows:
+            self.flush(table)
+
+    def flush(self, table: str) -> None:
+        rows, self.buffers[table] = self.buffers[table], []
+        if not rows:
+            return
+        if self.conn is not None:
+            if self.method == "load-data":
+                try:
+                    self._load_data(table, rows)
+                except Error as e:
+                    if e.errno not in LOCAL_INFILE_ERRORS:
+                        raise
+                    print(f"LOAD DATA LOCAL INFILE not available ({e.msg}); falling back to multi-row INSERT")
+                    self.conn.rollback()
+                    self.method = "insert"
+            if self.method == "insert":
+                self._insert(table, rows)
+            self.conn.commit()
+        self.loaded[table] += len(rows)
+
+    def flush_all(self) -> None:
+        for table in TABLES:
+            self.flush(table)
+
+    def _load_data(self, table: str, rows: List[Sequence[Any]]) -> None:
+        path = os.path.join(self.tmpdir, f"{table}.tsv")
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.writelines("\t".join(map(_tsv, row)) + "\n" for row in rows)
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 ({', '.join(TABLES[table])})",
+                (path,),
+            )
+            loaded = cursor.rowcount
+            # Con LOCAL los errores por fila son warnings y la fila se saltea
+            if loaded != len(rows):
+                cursor.execute("SHOW WARNINGS LIMIT 5")
+                raise RuntimeError(f"{table}: loaded {loaded} of {len(rows)} rows: {cursor.fetchall()}")
+
+    def _insert(self, table: str, rows: List[Sequence[Any]]) -> None:
+        columns = TABLES[table]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        # Sin microsegundos, como en el TSV (MySQL redondearía al guardar en DATETIME)
+        rows = [tuple(v.replace(microsecond=0) if isinstance(v, datetime) else v for v in row) for row in rows]
+        with self.conn.cursor() as cursor:
+            for start in range(0, len(rows), INSERT_CHUNK_ROWS):
+                cursor.executemany(query, rows[start:start + INSERT_CHUNK_ROWS])
+
+    def close(self) -> None:
+        if self.tmpdir:
+            shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+# -----------------------------
+# Triggers
+# -----------------------------
+def suspend_triggers(conn, backup_path: str) -> List[Dict[str, Any]]:
+    """Guarda en backup_path y borra los triggers de INSERT de las tablas cargadas."""
+    tables = tuple(TABLES)
+    with conn.cursor(dictionary=True) as cursor:
+        cursor.execute(
+            f"""
+            SELECT
+                TRIGGER_NAME       AS name,
+                EVENT_OBJECT_TABLE AS table_name,
+                ACTION_TIMING      AS timing,
+                EVENT_MANIPULATION AS event,
+                ACTION_STATEMENT   AS statement,
+                SQL_MODE           AS sql_mode
+            FROM information_schema.TRIGGERS
+            WHERE TRIGGER_SCHEMA = DATABASE()
+              AND EVENT_MANIPULATION = 'INSERT'
+              AND EVENT_OBJECT_TABLE IN ({', '.join(['%s'] * len(tables))})
+            ORDER BY EVENT_OBJECT_TABLE, ACTION_TIMING, ACTION_ORDER
+            """,
+            tables,
+        )
+        triggers = cursor.fetchall()
+    with open(backup_path, "w") as f:
+        json.dump(triggers, f, indent=2)
+    with conn.cursor() as cursor:
+        for trigger in triggers:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger['name']}")
+    print(f"suspended {len(triggers)} insert triggers (backup in {backup_path})")
+    return triggers
+
+
+def restore_triggers(conn, triggers: List[Dict[str, Any]]) -> None:
+    """Recrea los triggers en su orden original, cada uno con su sql_mode."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT @@SESSION.sql_mode")
+        (sql_mode,) = cursor.fetchone()
+        restored = 0
+        for trigger in triggers:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME = %s",
+                (trigger["name"],),
+            )
+            if cursor.fetchall():
+                continue
+            cursor.execute("SET SESSION sql_mode = %s", (trigger["sql_mode"],))
+            cursor.execute(
+                f"CREATE TRIGGER {trigger['name']} {trigger['timing']} {trigger['event']} "
+                f"ON {trigger['table_name']} FOR EACH ROW {trigger['statement']}"
+            )
+            restored += 1
+        cursor.execute("SET SESSION sql_mode = %s", (sql_mode,))
+    print(f"restored {restored} triggers")
+
+
+# -----------------------------
+# Preparación
+# -----------------------------
+def connect_loader(config: DBConfig):
+    conn = mysql.connector.connect(
+        host=config.host,
+        port=config.port,
+        user=config.user,
+        password=config.password,
+        database=config.database,
+        charset="utf8mb4",
+        collation="utf8mb4_unicode_ci",
+        allow_local_infile=True,
+        autocommit=False,
+    )
+    with conn.cursor() as cursor:
+        cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+    return conn
+
+
+def truncate(conn, db: Database) -> None:
+    """Vacía las tablas de datos en la conexión de carga (foreign_key_checks apagado)."""
+    with conn.cursor() as cursor:
+        for table in TRUNCATE_TABLES:
+            if table_exists(db, table):
+                cursor.execute(f"TRUNCATE TABLE {table}")
+        cursor.execute("UPDATE alert_rollup_watermark SET last_alert_id = 0, settled_alert_id = 0")
+        # Las sesiones se borran en cascada
+        cursor.execute("DELETE FROM users WHERE email LIKE %s", ("%." + EMAIL_DOMAIN,))
+    conn.commit()
+
+
+def next_ids(db: Database) -> Dict[str, int]:
+    return {
+        table: int(db.fetch_one(f"SELECT COALESCE(MAX({column}), 0) + 1 AS next_id FROM {table}")["next_id"])
+        for table, column in ID_COLUMNS.items()
+    }
+
+
+def role_ids(db: Database) -> Dict[str, int]:
+    return {row["name"]: row["role_id"] for row in db.fetch_all("SELECT role_id, name FROM roles")}
+
+
+def prepare_partitions(db: Database, start: datetime) -> None:
+    """Particiones mensuales de alerts desde el mes de start hasta la primera existente."""
+    partitions = list_alert_partitions(db)
+    if not partitions:
+        return
+    first = partitions[0]
+    try:
+        first_month = date(int(first["name"][1:5]), int(first["name"][5:7]), 1)
+    except ValueError:
+        return
+    months, month = [], date(start.year, start.month, 1)
+    while month < first_month:
+        following = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+        months.append((f"p{month:%Y%m}", following.isoformat()))
+        month = following
+    if months:
+        add_alert_partitions_before(db, first, months)
+        print(f"added {len(months)} monthly alert partitions before {first['name']}")
+
+
+# -----------------------------
+# Generador
+# -----------------------------
+class Driver:
+    __slots__ = ("driver_id", "user_id", "first_name", "last_name", "since", "until", "risk",
+                 "vehicle", "last_login", "session_day")
+
+    def __init__(self, driver_id: int, first_name: str, last_name: str, since: datetime,
+                 until: Optional[datetime], risk: float) -> None:
+        self.driver_id = driver_id
+        self.user_id = 0
+        self.first_name = first_name
+        self.last_name = last_name
+        self.since = since
+        self.until = until
+        self.risk = risk
+        self.vehicle: Optional["Vehicle"] = None
+        self.last_login: Optional[datetime] = None
+        self.session_day: Optional[datetime] = None
+
+
+class Vehicle:
+    __slots__ = ("vehicle_id", "since", "until", "final_status", "usage", "driver", "assigned_from",
+                 "free_at", "last_seen", "in_trip", "last_alert", "open_issues")
+
+    def __init__(self, vehicle_id: int, since: datetime, until: Optional[datetime], final_status: str,
+                 usage: float) -> None:
+        self.vehicle_id = vehicle_id
+        self.since = since
+        self.until = until
+        self.final_status = final_status
+        self.usage = usage
+        self.driver: Optional[Driver] = None
+        self.assigned_from: Optional[datetime] = None
+        self.free_at = since
+        self.last_seen: Optional[datetime] = None
+        self.in_trip = False
+        # (detected_at, alert_id, alert_type, severity, message)
+        self.last_alert: Optional[Tuple[datetime, int, str, str, str]] = None
+        self.open_issues = 0
+
+
+class FleetGenerator:
+    def __init__(self, args, loader: Loader, ids: Dict[str, int], roles: Dict[str, int],
+                 start: datetime, end: datetime) -> None:
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.loader = loader
+        self.ids = dict(ids)
+        self.roles = roles
+        self.start = start
+        self.end = end
+        self.tag = args.tag.upper()
+        self.drivers: List[Driver] = []
+        self.vehicles: List[Vehicle] = []
+        self.staff: List[Tuple[int, str, str, str, datetime]] = []  # (user_id, full_name, email, role, since)
+        self.staff_last_login: Dict[int, datetime] = {}
+        self.bpm_from = end - timedelta(days=args.bpm_days)
+        self.hour_cum = []
+        total = 0
+        for weight in TRIP_START_HOURS:
+            total += weight
+            self.hour_cum.append(total)
+
+    def _id(self, table: str) -> int:
+        value = self.ids[table]
+        self.ids[table] = value + 1
+        return value
+
+    def _joined(self, share_from_start: float) -> datetime:
+        if self.rng.random() < share_from_start:
+            return self.start
+        return self.start + (self.end - self.start) * self.rng.random() * 0.9
+
+    # --- flota ---
+    def create_fleet(self) -> None:
+        rng, span = self.rng, self.end - self.start
+        vehicle_count = max(2, round(500 * self.args.scale))
+        driver_count = round(vehicle_count * 1.25)
+        used_names = set()
+        for n in range(driver_count):
+            while True:
+                first = rng.choice(FIRST_NAMES)
+                last = f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+                if (first, last) not in used_names or len(used_names) > 0.5 * len(FIRST_NAMES) * len(LAST_NAMES) ** 2:
+                    used_names.add((first, last))
+                    break
+            since = self._joined(0.7)
+            until = since + (self.end - since) * rng.uniform(0.2, 0.95) if rng.random() < 0.06 else None
+            driver = Driver(self._id("drivers"), first, last, since, until, rng.gammavariate(1.5, 1 / 1.5))
+            self.drivers.append(driver)
+            self.loader.add("drivers", (
+                driver.driver_id, first, last, f"{self.tag}-{n + 1:06d}",
+                "INACTIVE" if until else "ACTIVE", since, until or since,
+            ))
+
+        weights = [w for *_, w in VEHICLE_MODELS]
+        for n in range(vehicle_count):
+            since = self._joined(0.75)
+            roll, until, status = rng.random(), None, "ACTIVE"
+            if roll < 0.04:
+                until, status = since + (self.end - since) * rng.uniform(0.3, 0.95), "INACTIVE"
+            elif roll < 0.10:
+                until, status = self.end - timedelta(days=rng.uniform(1, 20)), "MAINTENANCE"
+                if until <= since:
+                    until, status = None, "ACTIVE"
+            brand, model, _ = rng.choices(VEHICLE_MODELS, weights)[0]
+            vehicle = Vehicle(self._id("vehicles"), since, until, status, rng.uniform(0.6, 1.4))
+            self.vehicles.append(vehicle)
+            self.loader.add("vehicles", (
+                vehicle.vehicle_id, f"{self.tag}-{n + 1:05d}", brand, model, status, since, until or since,
+            ))
+
+        for _ in range(2):
+            self._staff("ADMIN", self.start - timedelta(days=rng.uniform(30, 90)))
+        for _ in range(max(2, vehicle_count // 50)):
+            self._staff("MANAGER", self._joined(0.8) - timedelta(days=rng.uniform(0, 10)))
+        for driver in self.drivers:
+            driver.user_id = self._id("users")
+        print(f"fleet: {vehicle_count} vehicles, {driver_count} drivers, {len(self.staff)} staff users "
+              f"from {self.start:%Y-%m-%d} to {self.end:%Y-%m-%d %H:%M}")
+
+    def _staff(self, role: str, since: datetime) -> None:
+        first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+        user_id = self._id("users")
+        email = f"{ascii_slug(first)}.{ascii_slug(last)}.{user_id}@{self.args.tag.lower()}.{EMAIL_DOMAIN}"
+        self.staff.append((user_id, f"{first} {last}", email, role, since))
+
+    # --- asignaciones ---
+    def _close_assignment(self, vehicle: Vehicle, at: datetime) -> None:
+        driver = vehicle.driver
+        self.loader.add("driver_vehicle_assignments", (
+            self._id("driver_vehicle_assignments"), driver.driver_id, vehicle.vehicle_id,
+            vehicle.assigned_from, at, vehicle.assigned_from, at,
+        ))
+        driver.vehicle = None
+        vehicle.driver = None
+
+    def rotate(self, at: datetime) -> None:
+        rng = self.rng
+        for vehicle in self.vehicles:
+            if vehicle.driver and rng.random() < self.args.rotation_share:
+                self._close_assignment(vehicle, at)
+        idle = [
+            d for d in self.drivers
+            if d.vehicle is None and d.since <= at and (d.until is None or d.until > at)
+        ]
+        rng.shuffle(idle)
+        for vehicle in self.vehicles:
+            if not idle:
+                break
+            if vehicle.driver is None and vehicle.since <= at and (vehicle.until is None or vehicle.until > at):
+                # Algunos vehículos quedan sin conductor un período
+                if rng.random() < 0.05:
+                    continue
+                driver = idle.pop()
+                driver.vehicle, vehicle.driver, vehicle.assigned_from = vehicle, driver, at
+
+    def release(self, day_end: datetime) -> None:
+        """Cierra la asignación de bajas (conductor o vehículo) que ocurren antes de day_end."""
+        for vehicle in self.vehicles:
+            driver = vehicle.driver
+            if driver is None:
+                continue
+            until = min(u for u in (vehicle.until, driver.until, day_end + timedelta(days=1)) if u)
+            if until < day_end:
+                self._close_assignment(vehicle, max(until, vehicle.assigned_from))
+
+    # --- sesiones ---
+    def _session(self, user_id: int, at: datetime) -> None:
+        if at >= self.end:
+            return
+        expires = at + timedelta(hours=12)
+        revoked = None
+        if self.rng.random() < 0.4:
+            revoked = min(at + timedelta(minutes=self.rng.uniform(10, 700)), self.end)
+        self.loader.add("user_sessions", (
+            self._id("user_sessions"), user_id, str(uuid.UUID(int=self.rng.getrandbits(128), version=4)),
+            at, expires, revoked,
+        ))
+
+    def staff_sessions(self, day: datetime) -> None:
+        weekday = day.weekday() < 5
+        for user_id, _, _, role, since in self.staff:
+            if since > day:
+                continue
+            if self.rng.random() < (0.85 if weekday else 0.1) * (0.6 if role == "ADMIN" else 1.0):
+                at = day + timedelta(hours=self.rng.uniform(7, 10))
+                self._session(user_id, at)
+                if at < self.end:
+                    self.staff_last_login[user_id] = at
+
+    # --- viajes ---
+    def plan_trips(self, vehicle: Vehicle, day: datetime) -> List[Tuple[datetime, datetime, bool]]:
+        rng, args = self.rng, self.args
+        lam = args.trips_per_day * (1.0 if day.weekday() < 5 else 0.35) * vehicle.usage
+        count = poisson(rng, lam)
+        if not count:
+            return []
+        starts = sorted(
+            day + timedelta(hours=rng.choices(range(24), cum_weights=self.hour_cum)[0] + rng.random())
+            for _ in range(count)
+        )
+        horizon = min(day + timedelta(days=1, hours=6), self.end)
+        trips = []
+        for started in starts:
+            started = max(started, vehicle.free_at + timedelta(minutes=rng.uniform(10, 60)))
+            if started >= horizon:
+                break
+            cancelled = rng.random() < 0.02
+            if cancelled:
+                minutes = rng.uniform(3, 20)
+            else:
+                minutes = min(max(math.exp(rng.gauss(math.log(55), 0.7)), 8), 600)
+            ended = started + timedelta(minutes=minutes)
+            trips.append((started, ended, cancelled))
+            vehicle.free_at = ended
+        return trips
+
+    def trip_alerts(self, driver: Driver, started: datetime, ended: datetime,
+                    finished: bool) -> List[Tuple[datetime, str, str, str]]:
+        rng = self.rng
+        alerts = [(started + timedelta(seconds=rng.uniform(1, 5)), "TRIP", "LOW", TRIP_START_MESSAGE)]
+        horizon = (min(ended, self.end) - started).total_seconds()
+        base = self.args.alert_rate * driver.risk / 3600  # ráfagas por segundo
+        peak = base * MAX_TIME_FACTOR * (1 + FATIGUE_PER_HOUR * horizon / 3600)
+        offset = 0.0
+        while peak > 0:
+            offset += rng.expovariate(peak)
+            if offset >= horizon:
+                break
+            at = started + timedelta(seconds=offset)
+            rate = base * alert_time_factor(at.hour) * (1 + FATIGUE_PER_HOUR * offset / 3600)
+            if rng.random() * peak > rate:
+                continue
+            night = at.hour in NIGHT_HOURS
+            names = list(ALERT_TYPES)
+            alert_type = rng.choices(names, [ALERT_TYPES[n][1 if night else 0] for n in names])[0]
+            _, _, severity_weights, messages = ALERT_TYPES[alert_type]
+            level = rng.choices(range(4), severity_weights)[0]
+            burst = offset
+            while True:
+                alerts.append((started + timedelta(seconds=burst), alert_type, SEVERITIES[level], rng.choice(messages)))
+                if rng.random() > 0.45:
+                    break
+                burst += 3 + rng.expovariate(1 / 20)
+                if burst >= horizon:
+                    break
+                if level < 3 and rng.random() < 0.3:
+                    level += 1
+            offset = burst
+        if finished:
+            alerts.append((ended, "TRIP", "LOW", TRIP_END_MESSAGE))
+        return alerts
+
+    def trip_issue(self, vehicle: Vehicle, driver: Driver, trip_id: int, at: datetime, high_alerts: int) -> None:
+        rng = self.rng
+        chance = 0.004 + (0.03 if high_alerts >= 5 else 0.0)
+        if rng.random() >= chance:
+            return
+        names = list(ISSUE_TYPES)
+        weights = [ISSUE_TYPES[n][0] * (3 if n == "SAFETY" and high_alerts >= 5 else 1) for n in names]
+        issue_type = rng.choices(names, weights)[0]
+        self._issue(vehicle, driver.driver_id, trip_id, issue_type, at + timedelta(minutes=rng.uniform(0, 120)))
+
+    def _issue(self, vehicle: Vehicle, driver_id: Optional[int], trip_id: Optional[int],
+               issue_type: str, reported: datetime) -> None:
+        rng = self.rng
+        if reported >= self.end:
+            return
+        age = (self.end - reported).days
+        roll = rng.random()
+        if (age > 30 and roll < 0.97) or (age <= 30 and roll < 0.25):
+            status = "CLOSED"
+            resolved = min(reported + timedelta(days=rng.expovariate(1 / 3)), self.end)
+        else:
+            status = "OPEN" if rng.random() < 0.65 else "IN_PROGRESS"
+            resolved = None
+            vehicle.open_issues += 1
+        self.loader.add("issues", (
+            self._id("issues"), vehicle.vehicle_id, driver_id, trip_id, issue_type,
+            rng.choice(ISSUE_TYPES[issue_type][1]), status, reported, resolved, reported, resolved or reported,
+        ))
+
+    def bpm_minutes(self, trip_id: int, started: datetime, ended: datetime, alerts) -> None:
+        rng = self.rng
+        minute = started.replace(second=0, microsecond=0)
+        last = min(ended, self.end)
+        drowsy = {a[0].replace(second=0, microsecond=0) for a in alerts if a[1] == "DROWSINESS"}
+        bpm = rng.uniform(62, 85)
+        while minute <= last:
+            bpm = min(max(bpm + rng.gauss(0, 1.5) - (4 if minute in drowsy else 0), 48), 120)
+            samples = rng.randint(50, 60)
+            low, high = round(bpm - rng.uniform(2, 8)), round(bpm + rng.uniform(2, 8))
+            self.loader.add("bpm_minute", (trip_id, minute, samples, low, high, round(bpm * samples)))
+            minute += timedelta(minutes=1)
+
+    def run_day(self, day: datetime) -> Tuple[int, int]:
+        rng = self.rng
+        trips = []
+        for vehicle in self.vehicles:
+            if vehicle.driver is not None:
+                trips.extend((started, ended, cancelled, vehicle) for started, ended, cancelled in
+                             self.plan_trips(vehicle, day))
+        trips.sort(key=lambda t: t[0])
+
+        day_alerts = []
+        for started, ended, cancelled, vehicle in trips:
+            driver = vehicle.driver
+            trip_id = self._id("trips")
+            in_progress = ended > self.end
+            finished = not in_progress and not cancelled
+            alerts = self.trip_alerts(driver, started, ended, finished)
+            high = sum(1 for a in alerts if a[2] in ("HIGH", "CRITICAL"))
+            status = "IN_PROGRESS" if in_progress else "CANCELLED" if cancelled else "FINISHED"
+            self.loader.add("trips", (
+                trip_id, vehicle.vehicle_id, driver.driver_id, started, None if in_progress else ended,
+                rng.choice(PLACES), rng.choice(PLACES), status, len(alerts), high,
+                max(a[0] for a in alerts), started, started if in_progress else ended,
+            ))
+            vehicle.last_seen = self.end if in_progress else ended
+            vehicle.in_trip = in_progress
+            day_alerts.extend((a, trip_id, vehicle, driver) for a in alerts)
+            if not cancelled:
+                self.trip_issue(vehicle, driver, trip_id, min(ended, self.end), high)
+            if started >= self.bpm_from and not cancelled:
+                self.bpm_minutes(trip_id, started, ended, alerts)
+            if driver.session_day != day and rng.random() < 0.5:
+                driver.session_day = day
+                at = started - timedelta(minutes=rng.uniform(5, 40))
+                self._session(driver.user_id, at)
+                if at < self.end:
+                    driver.last_login = at
+
+        # Mantenimiento sin viaje
+        for vehicle in self.vehicles:
+            if vehicle.since <= day and (vehicle.until is None or vehicle.until > day) and rng.random() < 0.0015:
+                self._issue(vehicle, None, None, "MECHANICAL", day + timedelta(hours=rng.uniform(6, 18)))
+
+        day_alerts.sort(key=lambda a: a[0][0])
+        for (detected_at, alert_type, severity, message), trip_id, vehicle, driver in day_alerts:
+            alert_id = self._id("alerts")
+            self.loader.add("alerts", (
+                alert_id, vehicle.vehicle_id, driver.driver_id, trip_id, alert_type, severity, message,
+                detected_at, detected_at, detected_at,
+            ))
+            if vehicle.last_alert is None or detected_at >= vehicle.last_alert[0]:
+                vehicle.last_alert = (detected_at, alert_id, alert_type, severity, message)
+        return len(trips), len(day_alerts)
+
+    def finish(self) -> None:
+        rng = self.rng
+        for vehicle in self.vehicles:
+            if vehicle.driver is not None:
+                driver = vehicle.driver
+                self.loader.add("driver_vehicle_assignments", (
+                    self._id("driver_vehicle_assignments"), driver.driver_id, vehicle.vehicle_id,
+                    vehicle.assigned_from, None, vehicle.assigned_from, vehicle.assigned_from,
+                ))
+            last = vehicle.last_alert
+            self.loader.add("vehicle_status", (
+                vehicle.vehicle_id, last and last[1], last and last[2], last and last[3], last and last[4],
+                last and last[0], vehicle.open_issues,
+            ))
+            if vehicle.in_trip:
+                device_status = "ONLINE"
+            elif vehicle.last_seen is None or vehicle.final_status == "INACTIVE":
+                device_status = "UNKNOWN"
+            else:
+                device_status = "OFFLINE"
+            firmware = FIRMWARE[min(len(FIRMWARE) - 1, int(rng.random() * len(FIRMWARE) + 0.5))]
+            self.loader.add("devices", (
+                self._id("devices"), vehicle.vehicle_id, f"RPI-{self.tag}-{vehicle.vehicle_id:06d}", firmware,
+                vehicle.last_seen, device_status, vehicle.since, vehicle.last_seen or vehicle.since,
+            ))
+
+        for driver in self.drivers:
+            email = (f"{ascii_slug(driver.first_name)}.{ascii_slug(driver.last_name)}.{driver.driver_id}"
+                     f"@{self.args.tag.lower()}.{EMAIL_DOMAIN}")
+            self._user(driver.user_id, f"{driver.first_name} {driver.last_name}", email, "DRIVER",
+                       "DISABLED" if driver.until else "ACTIVE", driver.last_login, driver.since)
+        for user_id, full_name, email, role, since in self.staff:
+            self._user(user_id, full_name, email, role, "ACTIVE", self.staff_last_login.get(user_id), since)
+
+    def _user(self, user_id: int, full_name: str, email: str, role: str, status: str,
+              last_login: Optional[datetime], since: datetime) -> None:
+        salt = str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+        # Igual que sp_register_user / sp_login_user
+        password_hash = hashlib.sha256((self.args.password + salt).encode()).hexdigest().upper()
+        self.loader.add("users", (
+            user_id, full_name, email, password_hash, salt, self.roles[role], status,
+            last_login, since, last_login or since,
+        ))
+
+    def run(self) -> None:
+        self.create_fleet()
+        rotation = timedelta(days=self.args.rotation_days)
+        next_rotation = self.start
+        day = self.start
+        started = time.perf_counter()
+        trips = alerts = 0
+        while day < self.end:
+            if day >= next_rotation:
+                self.rotate(day)
+                next_rotation += rotation
+            self.release(day + timedelta(days=1))
+            self.staff_sessions(day)
+            day_trips, day_alerts = self.run_day(day)
+            trips += day_trips
+            alerts += day_alerts
+            day += timedelta(days=1)
+            if day.day == 1 or day >= self.end:
+                elapsed = time.perf_counter() - started
+                print(f"{(day - timedelta(days=1)):%Y-%m}: {trips} trips, {alerts} alerts "
+                      f"({sum(self.loader.loaded.values()) / elapsed:,.0f} rows/s loaded)")
+        self.finish()
+
+
+def print_summary(loaded: Counter, elapsed: float) -> None:
+    total = sum(loaded.values())
+    print(f"\n{'table':<28}{'rows':>14}")
+    for table in TABLES:
+        if loaded[table]:
+            print(f"{table:<28}{loaded[table]:>14,}")
+    print(f"{'total':<28}{total:>14,}  in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    if loaded["trips"]:
+        print(f"alerts per trip: {loaded['alerts'] / loaded['trips']:.1f}")
+
+
+def main(args) -> None:
+    config = DBConfig(pool_name="generate_dataset", pool_size=2)
+    if args.restore_triggers:
+        with open(args.restore_triggers) as f:
+            triggers = json.load(f)
+        conn = connect_loader(config)
+        try:
+            restore_triggers(conn, triggers)
+        finally:
+            conn.close()
+        os.remove(args.restore_triggers)
+        return
+
+    end = args.end or datetime.now().replace(second=0, microsecond=0)
+    start = (end - timedelta(days=round(args.years * 365))).replace(hour=0, minute=0)
+
+    if args.dry_run:
+        loader = Loader(None, args.method, args.batch)
+        started = time.perf_counter()
+        FleetGenerator(args, loader, {table: 1 for table in ID_COLUMNS}, {"ADMIN": 1, "MANAGER": 2, "DRIVER": 3},
+                       start, end).run()
+        loader.flush_all()
+        print_summary(loader.loaded, time.perf_counter() - started)
+        return
+
+    if os.path.exists(args.triggers_backup):
+        raise SystemExit(f"{args.triggers_backup} exists: a previous run left triggers suspended, "
+                         f"run with --restore-triggers {args.triggers_backup} first")
+    db = Database(config)
+    missing = [t for t in (*TABLES, "alert_rollup_watermark") if not table_exists(db, t)]
+    if missing:
+        raise SystemExit(f"missing tables {', '.join(missing)}: run python init_db.py first")
+
+    conn = connect_loader(config)
+    if args.truncate:
+        if not args.yes and input(f"Truncate the data tables of {config.database}@{config.host}? [y/N] ").lower() != "y":
+            conn.close()
+            return
+        truncate(conn, db)
+    elif db.fetch_one("SELECT 1 AS found FROM drivers WHERE license_number LIKE %s LIMIT 1",
+                      (f"{args.tag.upper()}-%",)):
+        raise SystemExit(f"drivers with tag {args.tag.upper()} already exist: use --truncate or another --tag")
+
+    prepare_partitions(db, start)
+    loader = Loader(conn, args.method, args.batch)
+    triggers = suspend_triggers(conn, args.triggers_backup)
+    started = time.perf_counter()
+    try:
+        FleetGenerator(args, loader, next_ids(db), role_ids(db), start, end).run()
+        loader.flush_all()
+    finally:
+        restore_triggers(conn, triggers)
+        os.remove(args.triggers_backup)
+        loader.close()
+        conn.close()
+    elapsed = time.perf_counter() - started
+    print_summary(loader.loaded, elapsed)
+
+    if not args.skip_rollups:
+        rolled_from, began = None, time.perf_counter()
+        while True:
+            result = rollup_alerts(db, args.rollup_batch, 0)
+            rolled_from = rolled_from if rolled_from is not None else result["from_alert_id"]
+            if result["last_alert_id"] == result["from_alert_id"]:
+                break
+        print(f"rollups: alerts {rolled_from} -> {result['last_alert_id']} in {time.perf_counter() - began:.1f}s")
+
+    began = time.perf_counter()
+    for table in TABLES:
+        db.fetch_all(f"ANALYZE TABLE {table}")
+    print(f"ANALYZE TABLE in {time.perf_counter() - began:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="factor de escala (SF 1 = 500 vehículos)")
+    parser.add_argument("--years", type=float, default=2.0, help="años de historial hasta --end")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="fin del historial (por defecto ahora)")
+    parser.add_argument("--trips-per-day", type=float, default=1.6, help="viajes por vehículo en día hábil")
+    parser.add_argument("--alert-rate", type=float, default=2.5, help="ráfagas de alertas por hora de manejo")
+    parser.add_argument("--rotation-days", type=int, default=90)
+    parser.add_argument("--rotation-share", type=float, default=0.2, help="parte de la flota que rota")
+    parser.add_argument("--bpm-days", type=float, default=7, help="días con bpm_minute (0 = ninguno)")
+    parser.add_argument("--password", default="autoawake123", help="clave de todos los usuarios generados")
+    parser.add_argument("--tag", default="gen", help="prefijo de licencias, patentes, seriales y emails")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--method", choices=("load-data", "insert"), default="load-data")
+    parser.add_argument("--batch", type=int, default=100_000, help="filas por lote y tabla")
+    parser.add_argument("--rollup-batch", type=int, default=200_000)
+    parser.add_argument("--skip-rollups", action="store_true")
+    parser.add_argument("--truncate", action="store_true", help="vaciar las tablas de datos antes de generar")
+    parser.add_argument("--yes", action="store_true", help="no pedir confirmación para --truncate")
+    parser.add_argument("--dry-run", action="store_true", help="generar sin escribir y mostrar los conteos")
+    parser.add_argument("--triggers-backup", default="dataset_triggers.json")
+    parser.add_argument("--restore-triggers", metavar="BACKUP", help="sólo recrear los triggers de un backup")
+    main(parser.parse_args())
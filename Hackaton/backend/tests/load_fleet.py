@@ -0,0 +1,512 @@
+"""
+Generador de carga de punta a punta: simula una flota de Raspberry Pi que
+publica por MQTT contra un broker local, y mide cuánto tarda cada mensaje
+en llegar a MySQL y a la notificación.
+
+Cada vehículo simulado (un hilo con su propia conexión MQTT) hace --trips
+viajes. Cada viaje tiene:
+- un TRIP de inicio;
+- durante --trip-seconds, alertas DROWSINESS / LOOKING-AWAY (llegadas
+  Poisson, --alert-rate por segundo y vehículo) y BPM a --bpm-hz;
+- un TRIP de fin.
+Cada alerta lleva en el mensaje una marca única (load:<run>:<n>) para
+reconocerla en la BD y en la notificación.
+
+Mide:
+- publish -> fila en alerts: un hilo consulta alerts por PK cada --poll-ms,
+  que es la resolución de la medición;
+- publish -> notificación: el script levanta un stand-in de la Bot API de
+  Telegram en --notify-port. El backend tiene que apuntar a él con
+  TELEGRAM_API_URL=http://127.0.0.1:<port>, y TELEGRAM_BOT_TOKEN /
+  TELEGRAM_CHAT_ID con cualquier valor;
+- TRIP inicio/fin -> viaje IN_PROGRESS/terminado en trips;
+- throughput sostenido: alertas guardadas por segundo y muestras BPM
+  guardadas.
+
+Antes de empezar crea los conductores y vehículos LOAD-NNNN que falten y
+cancela los viajes que hayan quedado abiertos de corridas anteriores.
+
+Uso (backend corriendo contra el mismo broker y la misma BD):
+    python -m tests.load_fleet --vehicles 50 --trip-seconds 60 --alert-rate 0.5 --label v1 --report runs/v1.json
+    python -m tests.load_fleet --compare runs/v1.json runs/v2.json
+"""
+import argparse
+import json
+import random
+import re
+import ssl
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import paho.mqtt.client as mqtt
+
+from core.config import settings
+from database.autoawake_db import (
+    Database,
+    DBConfig,
+    bulk_insert_drivers,
+    bulk_insert_vehicles,
+    end_trip,
+    find_drivers_by_license,
+    find_vehicles_by_plate,
+    get_active_trip_by_pair,
+    get_trip_by_id,
+)
+
+PREFIX = "LOAD-"
+# (alert_type, severity, mensaje, peso) como los publica raspberry/main.py
+ALERT_MIX = (
+    ("DROWSINESS", "HIGH", "Driver is drowsy", 0.4),
+    ("LOOKING-AWAY", "MEDIUM", "Driver looking away", 0.6),
+)
+MARK = re.compile(r"load:(\w+):(\d+)")
+# Alertas anteriores a la última vista que se vuelven a mirar (commits fuera de orden)
+POLL_OVERLAP_IDS = 500
+
+
+class Tracker:
+    """Momentos (perf_counter) de publicación y de llegada a la BD / notificación."""
+
+    def __init__(self, run_id: str) -> None:
+        self.run_id = run_id
+        self.lock = threading.Lock()
+        self.published: Dict[int, float] = {}
+        self.stored: Dict[int, float] = {}
+        self.notified: Dict[int, float] = {}
+        self.trip_start: List[float] = []
+        self.trip_end: List[float] = []
+        self.trip_ids: List[int] = []
+        self.trip_timeouts = 0
+        self.bpm_published = 0
+        self._seq = 0
+
+    def next_mark(self) -> Tuple[int, str]:
+        with self.lock:
+            self._seq += 1
+            return self._seq, f"load:{self.run_id}:{self._seq}"
+
+    def seen(self, store: Dict[int, float], text: str, at: float) -> None:
+        for run_id, seq in MARK.findall(text or ""):
+            if run_id == self.run_id:
+                with self.lock:
+                    store.setdefault(int(seq), at)
+
+
+# -----------------------------
+# Stand-in de Telegram
+# -----------------------------
+def start_notify_stand_in(port: int, tracker: Tracker) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            arrived = time.perf_counter()
+            try:
+                text = json.loads(body).get("text", "")
+            except ValueError:
+                text = ""
+            tracker.seen(tracker.notified, text, arrived)
+            reply = b'{"ok": true, "result": {}}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, *args) -> None:
+            return None
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, name="notify-stand-in", daemon=True).start()
+    return server
+
+
+# -----------------------------
+# BD
+# -----------------------------
+def setup_fleet(db: Database, count: int) -> List[Tuple[int, int]]:
+    """Pares (driver_id, vehicle_id) LOAD-NNNN, creando los que falten."""
+    keys = [f"{PREFIX}{i:04d}" for i in range(count)]
+    drivers = find_drivers_by_license(db, keys)
+    bulk_insert_drivers(db, [
+        ("Load", f"Driver {key}", key, "ACTIVE") for key in keys if key.lower() not in drivers
+    ])
+    vehicles = find_vehicles_by_plate(db, keys)
+    bulk_insert_vehicles(db, [
+        (key, "LoadTest", "Pi", "ACTIVE") for key in keys if key.lower() not in vehicles
+    ])
+    drivers = find_drivers_by_license(db, keys)
+    vehicles = find_vehicles_by_plate(db, keys)
+    pairs = [(drivers[key.lower()], vehicles[key.lower()]) for key in keys]
+
+    stale = 0
+    for driver_id, vehicle_id in pairs:
+        trip = get_active_trip_by_pair(db, driver_id, vehicle_id)
+        if trip:
+            end_trip(db, trip["trip_id"], "CANCELLED")
+            stale += 1
+    if stale:
+        print(f"cancelled {stale} trips left open by a previous run")
+    return pairs
+
+
+def max_alert_id(db: Database) -> int:
+    row = db.fetch_one("SELECT COALESCE(MAX(alert_id), 0) AS max_id FROM alerts")
+    return int(row["max_id"])
+
+
+def poll_alerts(db: Database, tracker: Tracker, since_id: int, poll_s: float, stop: threading.Event) -> None:
+    last_id = since_id
+    pattern = f"%load:{tracker.run_id}:%"
+    while not stop.is_set():
+        try:
+            rows = db.fetch_all(
+                """
+                SELECT alert_id, message FROM alerts
+                WHERE alert_id > %s AND message LIKE %s
+                ORDER BY alert_id
+                """,
+                (max(since_id, last_id - POLL_OVERLAP_IDS), pattern),
+            )
+        except Exception as e:
+            print(f"alert poller error: {e}")
+            rows = []
+        now = time.perf_counter()
+        for row in rows:
+            last_id = max(last_id, row["alert_id"])
+            tracker.seen(tracker.stored, row["message"], now)
+        stop.wait(poll_s)
+
+
+def wait_for(check: Callable[[], Any], timeout: float, poll_s: float) -> Optional[Any]:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        result = check()
+        if result:
+            return result
+        time.sleep(poll_s)
+    return None
+
+
+def count_bpm(db: Database, trip_ids: List[int]) -> int:
+    if not trip_ids:
+        return 0
+    placeholders = ", ".join(["%s"] * len(trip_ids))
+    row = db.fetch_one(
+        f"SELECT COUNT(*) AS samples FROM bpm_samples WHERE trip_id IN ({placeholders})",
+        tuple(trip_ids),
+    )
+    return int(row["samples"])
+
+
+# -----------------------------
+# Vehículos simulados
+# -----------------------------
+def connect(client_id: str) -> mqtt.Client:
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION1, client_id=client_id)
+    if settings.mqtt_user and settings.mqtt_password:
+        client.username_pw_set(settings.mqtt_user, settings.mqtt_password)
+    if settings.mqtt_port == 8883:
+        client.tls_set(cert_reqs=ssl.CERT_NONE)
+        client.tls_insecure_set(True)
+    client.connect(settings.mqtt_broker, settings.mqtt_port, 60)
+    client.loop_start()
+    return client
+
+
+def pick_alert(rng: random.Random) -> Tuple[str, str, str]:
+    roll = rng.random() * sum(weight for *_, weight in ALERT_MIX)
+    for alert_type, severity, message, weight in ALERT_MIX:
+        roll -= weight
+        if roll <= 0:
+            return alert_type, severity, message
+    return ALERT_MIX[-1][:3]
+
+
+def run_vehicle(args, index: int, driver_id: int, vehicle_id: int, db: Database, tracker: Tracker) -> None:
+    rng = random.Random(args.seed * 100003 + index)
+    client = connect(f"load-{tracker.run_id}-{index}")
+    poll_s = args.poll_ms / 1000
+    trip_msg = {"alert_type": "TRIP", "driver_id": driver_id, "vehicle_id": vehicle_id, "severity": "LOW"}
+    try:
+        # Arranques escalonados, como una flota que no enciende toda a la vez
+        time.sleep(rng.uniform(0, args.ramp_seconds))
+        for _ in range(args.trips):
+            published = time.perf_counter()
+            client.publish(settings.mqtt_topic_alerts, json.dumps({**trip_msg, "message": "Load test trip start"}), qos=args.qos)
+            trip = wait_for(lambda: get_active_trip_by_pair(db, driver_id, vehicle_id), args.trip_timeout, poll_s)
+            if not trip:
+                with tracker.lock:
+                    tracker.trip_timeouts += 1
+                continue
+            with tracker.lock:
+                tracker.trip_start.append(time.perf_counter() - published)
+                tracker.trip_ids.append(trip["trip_id"])
+            trip_id = trip["trip_id"]
+
+            now = time.perf_counter()
+            end_at = now + args.trip_seconds
+            next_alert = now + rng.expovariate(args.alert_rate) if args.alert_rate > 0 else float("inf")
+            next_bpm = now + 1 / args.bpm_hz if args.bpm_hz > 0 else float("inf")
+            bpm = rng.uniform(65, 85)
+            while True:
+                wake = min(next_alert, next_bpm, end_at)
+                time.sleep(max(0.0, wake - time.perf_counter()))
+                now = time.perf_counter()
+                if now >= end_at:
+                    break
+                if now >= next_bpm:
+                    bpm = min(max(bpm + rng.gauss(0, 1.5), 45), 130)
+                    client.publish(settings.mqtt_topic_bpm, json.dumps({
+                        "trip_id": trip_id,
+                        "timestamp": datetime.now().isoformat(),
+                        "bpm": round(bpm),
+                    }), qos=args.qos)
+                    with tracker.lock:
+                        tracker.bpm_published += 1
+                    next_bpm += 1 / args.bpm_hz
+                if now >= next_alert:
+                    alert_type, severity, text = pick_alert(rng)
+                    seq, mark = tracker.next_mark()
+                    with tracker.lock:
+                        tracker.published[seq] = time.perf_counter()
+                    client.publish(settings.mqtt_topic_alerts, json.dumps({
+                        "trip_id": trip_id,
+                        "alert_type": alert_type,
+                        "severity": severity,
+                        "message": f"{text} [{mark}]",
+                        "timestamp": datetime.now().isoformat(),
+                    }), qos=args.qos)
+                    next_alert += rng.expovariate(args.alert_rate)
+
+            published = time.perf_counter()
+            client.publish(settings.mqtt_topic_alerts, json.dumps({**trip_msg, "message": "Load test trip end"}), qos=args.qos)
+            ended = wait_for(
+                lambda: (get_trip_by_id(db, trip_id) or {}).get("status") not in (None, "IN_PROGRESS"),
+                args.trip_timeout,
+                poll_s,
+            )
+            if ended:
+                with tracker.lock:
+                    tracker.trip_end.append(time.perf_counter() - published)
+            else:
+                with tracker.lock:
+                    tracker.trip_timeouts += 1
+    except Exception as e:
+        print(f"vehicle {index} stopped: {e}")
+    finally:
+        client.loop_stop()
+        client.disconnect()
+
+
+# -----------------------------
+# Reporte
+# -----------------------------
+def summarize(samples: List[float]) -> Optional[Dict[str, float]]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered) * 1000, 1),
+        "p50": round(pct(0.50), 1),
+        "p95": round(pct(0.95), 1),
+        "p99": round(pct(0.99), 1),
+        "max": round(ordered[-1] * 1000, 1),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def build_report(args, tracker: Tracker, elapsed: float, bpm_stored: int) -> Dict[str, Any]:
+    alert_db = [tracker.stored[s] - t for s, t in tracker.published.items() if s in tracker.stored]
+    alert_notify = [tracker.notified[s] - t for s, t in tracker.published.items() if s in tracker.notified]
+    stored_times = sorted(tracker.stored.values())
+    # Throughput sostenido: alertas guardadas entre la primera y la última vista
+    window = stored_times[-1] - stored_times[0] if len(stored_times) > 1 else 0.0
+    published_msgs = len(tracker.published) + tracker.bpm_published + 2 * len(tracker.trip_ids)
+    return {
+        "label": args.label,
+        "run_id": tracker.run_id,
+        "git_revision": git_revision(),
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "vehicles": args.vehicles,
+            "trips": args.trips,
+            "trip_seconds": args.trip_seconds,
+            "alert_rate": args.alert_rate,
+            "bpm_hz": args.bpm_hz,
+            "qos": args.qos,
+            "poll_ms": args.poll_ms,
+        },
+        "elapsed_s": round(elapsed, 1),
+        "published": {
+            "alerts": len(tracker.published),
+            "bpm": tracker.bpm_published,
+            "trips": len(tracker.trip_ids),
+            "msgs_per_s": round(published_msgs / elapsed, 1) if elapsed else 0.0,
+        },
+        "stored": {
+            "alerts": len(tracker.stored),
+            "alerts_missing": len(tracker.published) - len(alert_db),
+            "bpm": bpm_stored,
+            "alerts_per_s": round(len(stored_times) / window, 1) if window else 0.0,
+        },
+        "notified": {
+            "alerts": len(alert_notify),
+            "alerts_missing": len(tracker.published) - len(alert_notify),
+        },
+        "trip_timeouts": tracker.trip_timeouts,
+        "latency_ms": {
+            "alert_db": summarize(alert_db),
+            "alert_notify": summarize(alert_notify),
+            "trip_start": summarize(tracker.trip_start),
+            "trip_end": summarize(tracker.trip_end),
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\nrun {report['run_id']} ({report['label'] or 'sin label'}, rev {report['git_revision']}) in {report['elapsed_s']}s")
+    print(f"published: {report['published']}")
+    print(f"stored:    {report['stored']}")
+    print(f"notified:  {report['notified']}  trip timeouts: {report['trip_timeouts']}")
+    print(f"{'latency ms':<14}{'count':>8}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, stats in report["latency_ms"].items():
+        if stats:
+            print(f"{name:<14}{stats['count']:>8}" + "".join(f"{stats[k]:>9}" for k in ("mean", "p50", "p95", "p99", "max")))
+        else:
+            print(f"{name:<14}{'-':>8}")
+
+
+# (sección, clave, subclave, mayor es mejor)
+COMPARE_ROWS = (
+    ("published", "msgs_per_s", None, True),
+    ("stored", "alerts_per_s", None, True),
+    ("stored", "alerts_missing", None, False),
+    ("stored", "bpm", None, True),
+    ("notified", "alerts_missing", None, False),
+    ("latency_ms", "alert_db", "p50", False),
+    ("latency_ms", "alert_db", "p95", False),
+    ("latency_ms", "alert_db", "p99", False),
+    ("latency_ms", "alert_notify", "p50", False),
+    ("latency_ms", "alert_notify", "p95", False),
+    ("latency_ms", "alert_notify", "p99", False),
+    ("latency_ms", "trip_start", "p95", False),
+    ("latency_ms", "trip_end", "p95", False),
+)
+
+
+def compare(paths: List[str]) -> None:
+    reports = []
+    for path in paths:
+        with open(path) as f:
+            reports.append(json.load(f))
+    names = [r.get("label") or r["run_id"] for r in reports]
+    print(f"{'metric':<28}" + "".join(f"{name:>14}" for name in names) + (f"{'delta':>10}" if len(reports) > 1 else ""))
+    configs = {json.dumps(r["config"], sort_keys=True) for r in reports}
+    for section, key, sub, higher_better in COMPARE_ROWS:
+        values = []
+        for report in reports:
+            value = report.get(section, {}).get(key)
+            if sub is not None:
+                value = (value or {}).get(sub)
+            values.append(value)
+        label = f"{key}.{sub}" if sub else f"{section}.{key}"
+        row = f"{label:<28}" + "".join(f"{'-' if v is None else v:>14}" for v in values)
+        first, last = values[0], values[-1]
+        if len(values) > 1 and first and last is not None:
+            change = (last - first) / first * 100
+            better = (change > 0) == higher_better
+            row += f"{change:>+9.1f}%" + ("" if abs(change) < 1 else " better" if better else " worse")
+        print(row)
+    if len(configs) > 1:
+        print("\nwarning: the runs used different load settings (config)")
+
+
+def main(args) -> None:
+    if args.compare:
+        compare(args.compare)
+        return
+
+    db = Database(DBConfig(pool_name="load_fleet", pool_size=args.db_pool))
+    tracker = Tracker(uuid.uuid4().hex[:8])
+    pairs = setup_fleet(db, args.vehicles)
+    notify = start_notify_stand_in(args.notify_port, tracker) if args.notify_port else None
+
+    stop = threading.Event()
+    poller = threading.Thread(
+        target=poll_alerts, args=(db, tracker, max_alert_id(db), args.poll_ms / 1000, stop), daemon=True
+    )
+    poller.start()
+
+    print(f"run {tracker.run_id}: {args.vehicles} vehicles x {args.trips} trips of {args.trip_seconds}s "
+          f"({args.alert_rate} alerts/s, {args.bpm_hz} BPM/s per vehicle) against {settings.mqtt_broker}:{settings.mqtt_port}")
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=run_vehicle, args=(args, i, d, v, db, tracker), name=f"vehicle-{i}", daemon=True)
+        for i, (d, v) in enumerate(pairs)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # Margen para lo que quedó en cola (MQTT, buffer de BPM, Telegram)
+    deadline = time.perf_counter() + args.settle_seconds
+    while time.perf_counter() < deadline and len(tracker.stored) < len(tracker.published):
+        time.sleep(0.2)
+    time.sleep(min(args.settle_seconds, settings.bpm_flush_seconds + 1))
+    stop.set()
+    poller.join()
+    if notify:
+        notify.shutdown()
+
+    report = build_report(args, tracker, elapsed, count_bpm(db, tracker.trip_ids))
+    print_report(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"report written to {args.report}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vehicles", type=int, default=10)
+    parser.add_argument("--trips", type=int, default=1, help="viajes por vehículo")
+    parser.add_argument("--trip-seconds", type=float, default=60)
+    parser.add_argument("--alert-rate", type=float, default=0.2, help="alertas por segundo y vehículo")
+    parser.add_argument("--bpm-hz", type=float, default=1.0, help="muestras BPM por segundo y vehículo")
+    parser.add_argument("--ramp-seconds", type=float, default=5, help="arranque escalonado de los vehículos")
+    parser.add_argument("--qos", type=int, default=0, choices=(0, 1, 2))
+    parser.add_argument("--poll-ms", type=int, default=50, help="intervalo de consulta a la BD (resolución)")
+    parser.add_argument("--trip-timeout", type=float, default=30)
+    parser.add_argument("--settle-seconds", type=float, default=15)
+    parser.add_argument("--notify-port", type=int, default=8099, help="stand-in de Telegram (0 = sin medir)")
+    parser.add_argument("--db-pool", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", help="nombre de la corrida en el reporte (p. ej. la versión del backend)")
+    parser.add_argument("--report", help="guardar el resultado en este JSON")
+    parser.add_argument("--compare", nargs="+", metavar="REPORT", help="comparar reportes JSON en lugar de correr")
+    main(parser.parse_args())
@@ -5,7 +5,10 @@ DELIMITER $$
 
 -- =========================================================
 -- SP: Iniciar viaje (crea trips IN_PROGRESS y devuelve trip_id)
+--   - trip_id sale en el OUT y también como result set, para
+--     leerlo en el mismo round trip del CALL.
 -- =========================================================
+DROP PROCEDURE IF EXISTS sp_start_trip$$
 CREATE PROCEDURE sp_start_trip (
     IN  p_vehicle_id   BIGINT UNSIGNED,
     IN  p_driver_id    BIGINT UNSIGNED,
@@ -31,6 +34,7 @@ BEGIN
     );
 
     SET p_trip_id = LAST_INSERT_ID();
+    SELECT p_trip_id AS trip_id;
 END$$
 
 -- =========================================================
@@ -38,6 +42,7 @@ END$$
 --   - Si p_status es NULL o vacío, el trigger se encargará
 --     de poner FINISHED si corresponde.
 -- =========================================================
+DROP PROCEDURE IF EXISTS sp_end_trip$$
 CREATE PROCEDURE sp_end_trip (
     IN p_trip_id BIGINT UNSIGNED,
     IN p_status  VARCHAR(20)
@@ -58,7 +63,10 @@ END$$
 -- =========================================================
 -- SP: Registrar alerta asociada a un trip
 --   - Recupera vehicle_id y driver_id desde trips
+--   - Devuelve la alerta creada como result set (para el estado
+--     en memoria del backend, sin otra consulta)
 -- =========================================================
+DROP PROCEDURE IF EXISTS sp_log_alert$$
 CREATE PROCEDURE sp_log_alert (
     IN p_trip_id    BIGINT UNSIGNED,
     IN p_alert_type VARCHAR(50),
@@ -96,11 +104,19 @@ BEGIN
         p_message,
         NOW()
     );
+
+    SELECT
+        LAST_INSERT_ID() AS alert_id,
+        v_vehicle_id     AS vehicle_id,
+        v_driver_id      AS driver_id,
+        p_trip_id        AS trip_id,
+        NOW()            AS detected_at;
 END$$
 
 -- =========================================================
 -- SP: Crear issue (incidencia)
 -- =========================================================
+DROP PROCEDURE IF EXISTS sp_open_issue$$
 CREATE PROCEDURE sp_open_issue (
     IN p_vehicle_id   BIGINT UNSIGNED,
     IN p_driver_id    BIGINT UNSIGNED,
@@ -131,6 +147,7 @@ END$$
 -- =========================================================
 -- SP: Cerrar issue
 -- =========================================================
+DROP PROCEDURE IF EXISTS sp_close_issue$$
 CREATE PROCEDURE sp_close_issue (
     IN p_issue_id BIGINT UNSIGNED
 )
@@ -145,6 +162,7 @@ END$$
 -- SP: Actualizar estado del dispositivo (ONLINE/OFFLINE)
 --   - Si se marca ONLINE, el trigger ya actualiza last_seen_at
 -- =========================================================
+DROP PROCEDURE IF EXISTS sp_update_device_status$$
 CREATE PROCEDURE sp_update_device_status (
     IN p_device_id BIGINT UNSIGNED,
     IN p_status    VARCHAR(10),
@@ -159,7 +177,9 @@ END$$
 
 -- =========================================================
 -- SP: Registrar usuario (hash en BD + validación de rol)
+--   - user_id sale en el OUT y también como result set
 -- =========================================================
+DROP PROCEDURE IF EXISTS sp_register_user$$
 CREATE PROCEDURE sp_register_user (
     IN  p_full_name       VARCHAR(120),
     IN  p_email           VARCHAR(150),
@@ -202,10 +222,12 @@ BEGIN
     );
 
     SET p_user_id = LAST_INSERT_ID();
+    SELECT p_user_id AS user_id;
 END$$
 
 -- =========================================================
 -- SP: Login de usuario (genera token de sesión)
+--   - Devuelve user_id, rol, token y expiración como result set
 -- =========================================================
 DROP PROCEDURE IF EXISTS sp_login_user$$
 CREATE PROCEDURE sp_login_user (
@@ -263,11 +285,21 @@ BEGIN
     SET p_session_token = UUID();
     INSERT INTO user_sessions (user_id, token)
     VALUES (p_user_id, p_session_token);
+
+    SELECT
+        p_user_id       AS user_id,
+        p_role_name     AS role_name,
+        p_session_token AS session_token,
+        LOWER(p_email)  AS email,
+        s.expires_at
+    FROM user_sessions s
+    WHERE s.session_id = LAST_INSERT_ID();
 END$$
 
 -- =========================================================
 -- SP: Cerrar sesión (revocar token)
 -- =========================================================
+DROP PROCEDURE IF EXISTS sp_logout_session$$
 CREATE PROCEDURE sp_logout_session (
     IN p_session_token CHAR(36)
 )
@@ -0,0 +1,20 @@
+-- Índices para keyset pagination (cursor sobre (fecha, id) DESC)
+-- Los listados ahora filtran con (ts, id) < (cursor) y ordenan por ts DESC, id DESC.
+-- En InnoDB cada índice secundario incluye la PK al final, así que
+-- idx_alerts_vehicle (vehicle_id, detected_at) ya cubre (vehicle_id, detected_at, alert_id)
+-- y sirve para recorrer la página siguiente sin filesort ni OFFSET.
+-- Aquí sólo se agregan los índices de los listados que no tenían uno por fecha.
+-- Ejecuta este script después de 01_schema.sql
+
+USE AutoAwakeAI;
+
+-- GET /alerts/ sin filtros (y con rango de fechas)
+ALTER TABLE alerts ADD INDEX idx_alerts_detected (detected_at);
+
+-- GET /trips/ (con y sin ?status=)
+ALTER TABLE trips ADD INDEX idx_trips_started (started_at);
+ALTER TABLE trips ADD INDEX idx_trips_status_started (status, started_at);
+
+-- GET /issues/ (con y sin ?status=)
+ALTER TABLE issues ADD INDEX idx_issues_reported (reported_at);
+ALTER TABLE issues ADD INDEX idx_issues_status_reported (status, reported_at);
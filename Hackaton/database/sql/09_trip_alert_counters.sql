@@ -0,0 +1,88 @@
+-- Contadores de alertas por viaje mantenidos al insertar
+-- Reemplaza el LEFT JOIN alerts + COUNT/SUM/GROUP BY de v_trip_alerts_summary
+-- y de GET /trips/stats/active: los dashboards leen O(viajes) filas en vez
+-- de agregar toda la tabla alerts en cada poll.
+-- Ejecuta este script después de 01_schema.sql (y de cargar datos, hace backfill)
+
+USE AutoAwakeAI;
+
+ALTER TABLE trips
+    ADD COLUMN total_alerts  INT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN high_alerts   INT UNSIGNED NOT NULL DEFAULT 0,
+    ADD COLUMN last_alert_at DATETIME     NULL;
+
+-- Backfill con las alertas ya existentes
+UPDATE trips t
+JOIN (
+    SELECT
+        trip_id,
+        COUNT(*)                            AS total_alerts,
+        SUM(severity IN ('HIGH', 'CRITICAL')) AS high_alerts,
+        MAX(detected_at)                    AS last_alert_at
+    FROM alerts
+    GROUP BY trip_id
+) s ON s.trip_id = t.trip_id
+SET t.total_alerts  = s.total_alerts,
+    t.high_alerts   = s.high_alerts,
+    t.last_alert_at = s.last_alert_at;
+
+DELIMITER $$
+
+-- =========================================================
+-- Trigger 9:
+-- Sumar la alerta en los contadores del viaje
+-- (cubre sp_log_alert y cualquier INSERT directo del ingest)
+-- =========================================================
+DROP TRIGGER IF EXISTS trg_alerts_count_after_insert$$
+CREATE TRIGGER trg_alerts_count_after_insert
+AFTER INSERT ON alerts
+FOR EACH ROW
+BEGIN
+    UPDATE trips
+    SET total_alerts  = total_alerts + 1,
+        high_alerts   = high_alerts + (NEW.severity IN ('HIGH', 'CRITICAL')),
+        last_alert_at = GREATEST(COALESCE(last_alert_at, NEW.detected_at), NEW.detected_at)
+    WHERE trip_id = NEW.trip_id;
+END$$
+
+-- =========================================================
+-- Trigger 10:
+-- Descontar la alerta si se borra
+-- (last_alert_at se recalcula sólo si era la más reciente)
+-- =========================================================
+DROP TRIGGER IF EXISTS trg_alerts_count_after_delete$$
+CREATE TRIGGER trg_alerts_count_after_delete
+AFTER DELETE ON alerts
+FOR EACH ROW
+BEGIN
+    UPDATE trips
+    SET total_alerts  = GREATEST(total_alerts, 1) - 1,
+        high_alerts   = GREATEST(high_alerts, (OLD.severity IN ('HIGH', 'CRITICAL')))
+                        - (OLD.severity IN ('HIGH', 'CRITICAL')),
+        last_alert_at = IF(
+            last_alert_at > OLD.detected_at,
+            last_alert_at,
+            (SELECT MAX(a.detected_at) FROM alerts a WHERE a.trip_id = OLD.trip_id)
+        )
+    WHERE trip_id = OLD.trip_id;
+END$$
+
+DELIMITER ;
+
+-- La vista mantiene sus columnas pero ya no agrega alerts
+CREATE OR REPLACE VIEW v_trip_alerts_summary AS
+SELECT
+    t.trip_id,
+    t.vehicle_id,
+    v.plate AS vehicle_plate,
+    t.driver_id,
+    CONCAT(d.first_name, ' ', d.last_name) AS driver_name,
+    t.started_at,
+    t.ended_at,
+    t.status,
+    t.total_alerts,
+    t.high_alerts AS critical_or_high_alerts,
+    t.last_alert_at
+FROM trips t
+JOIN vehicles v ON v.vehicle_id = t.vehicle_id
+JOIN drivers  d ON d.driver_id  = t.driver_id;
@@ -0,0 +1,222 @@
+-- Estado materializado por vehículo: última alerta + issues abiertos
+-- Reemplaza el MAX(detected_at) sobre toda la tabla alerts de v_vehicle_last_alert
+-- y el COUNT(*) correlacionado sobre issues de v_vehicle_health.
+-- Se mantiene con triggers en vehicles, alerts e issues, así el costo de las
+-- vistas depende del tamaño de la flota y no del historial.
+-- Ejecuta este script después de 09_trip_alert_counters.sql (hace backfill)
+
+USE AutoAwakeAI;
+
+CREATE TABLE IF NOT EXISTS vehicle_status (
+    vehicle_id              BIGINT UNSIGNED NOT NULL,
+    last_alert_id           BIGINT UNSIGNED NULL,
+    last_alert_type         VARCHAR(50)     NULL,
+    last_alert_severity     ENUM('LOW', 'MEDIUM', 'HIGH', 'CRITICAL') NULL,
+    last_alert_message      VARCHAR(255)    NULL,
+    last_alert_detected_at  DATETIME        NULL,
+    open_issues_count       INT UNSIGNED    NOT NULL DEFAULT 0,
+    updated_at              TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP
+                                                     ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (vehicle_id),
+    CONSTRAINT fk_vehicle_status_vehicle
+        FOREIGN KEY (vehicle_id) REFERENCES vehicles(vehicle_id)
+        ON UPDATE CASCADE ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Backfill: una fila por vehículo
+INSERT IGNORE INTO vehicle_status (vehicle_id)
+SELECT vehicle_id FROM vehicles;
+
+UPDATE vehicle_status vs
+JOIN (
+    SELECT
+        a.*,
+        ROW_NUMBER() OVER (
+            PARTITION BY a.vehicle_id
+            ORDER BY a.detected_at DESC, a.alert_id DESC
+        ) AS rn
+    FROM alerts a
+) la ON la.vehicle_id = vs.vehicle_id AND la.rn = 1
+SET vs.last_alert_id          = la.alert_id,
+    vs.last_alert_type        = la.alert_type,
+    vs.last_alert_severity    = la.severity,
+    vs.last_alert_message     = la.message,
+    vs.last_alert_detected_at = la.detected_at;
+
+UPDATE vehicle_status vs
+JOIN (
+    SELECT vehicle_id, COUNT(*) AS open_issues
+    FROM issues
+    WHERE vehicle_id IS NOT NULL
+      AND status IN ('OPEN', 'IN_PROGRESS')
+    GROUP BY vehicle_id
+) oi ON oi.vehicle_id = vs.vehicle_id
+SET vs.open_issues_count = oi.open_issues;
+
+DELIMITER $$
+
+-- =========================================================
+-- Trigger 11:
+-- Crear la fila de vehicle_status al dar de alta un vehículo
+-- =========================================================
+DROP TRIGGER IF EXISTS trg_vehicles_status_after_insert$$
+CREATE TRIGGER trg_vehicles_status_after_insert
+AFTER INSERT ON vehicles
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO vehicle_status (vehicle_id) VALUES (NEW.vehicle_id);
+END$$
+
+-- =========================================================
+-- Trigger 12:
+-- Guardar la alerta como última del vehículo si es la más reciente
+-- (detected_at viene del dispositivo y puede llegar desordenado)
+-- =========================================================
+DROP TRIGGER IF EXISTS trg_alerts_vehicle_status_after_insert$$
+CREATE TRIGGER trg_alerts_vehicle_status_after_insert
+AFTER INSERT ON alerts
+FOR EACH ROW
+BEGIN
+    INSERT INTO vehicle_status (
+        vehicle_id,
+        last_alert_id,
+        last_alert_type,
+        last_alert_severity,
+        last_alert_message,
+        last_alert_detected_at
+    ) VALUES (
+        NEW.vehicle_id,
+        NEW.alert_id,
+        NEW.alert_type,
+        NEW.severity,
+        NEW.message,
+        NEW.detected_at
+    )
+    ON DUPLICATE KEY UPDATE
+        -- Las asignaciones se evalúan en orden: last_alert_detected_at va al final
+        last_alert_id          = IF(last_alert_detected_at IS NULL OR NEW.detected_at >= last_alert_detected_at,
+                                    NEW.alert_id, last_alert_id),
+        last_alert_type        = IF(last_alert_detected_at IS NULL OR NEW.detected_at >= last_alert_detected_at,
+                                    NEW.alert_type, last_alert_type),
+        last_alert_severity    = IF(last_alert_detected_at IS NULL OR NEW.detected_at >= last_alert_detected_at,
+                                    NEW.severity, last_alert_severity),
+        last_alert_message     = IF(last_alert_detected_at IS NULL OR NEW.detected_at >= last_alert_detected_at,
+                                    NEW.message, last_alert_message),
+        last_alert_detected_at = IF(last_alert_detected_at IS NULL OR NEW.detected_at >= last_alert_detected_at,
+                                    NEW.detected_at, last_alert_detected_at);
+END$$
+
+-- =========================================================
+-- Trigger 13:
+-- Si se borra la última alerta del vehículo, recalcularla
+-- =========================================================
+DROP TRIGGER IF EXISTS trg_alerts_vehicle_status_after_delete$$
+CREATE TRIGGER trg_alerts_vehicle_status_after_delete
+AFTER DELETE ON alerts
+FOR EACH ROW
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM vehicle_status
+        WHERE vehicle_id = OLD.vehicle_id
+          AND last_alert_id = OLD.alert_id
+    ) THEN
+        UPDATE vehicle_status vs
+        LEFT JOIN (
+            SELECT a.alert_id, a.alert_type, a.severity, a.message, a.detected_at
+            FROM alerts a
+            WHERE a.vehicle_id = OLD.vehicle_id
+            ORDER BY a.detected_at DESC, a.alert_id DESC
+            LIMIT 1
+        ) la ON 1 = 1
+        SET vs.last_alert_id          = la.alert_id,
+            vs.last_alert_type        = la.alert_type,
+            vs.last_alert_severity    = la.severity,
+            vs.last_alert_message     = la.message,
+            vs.last_alert_detected_at = la.detected_at
+        WHERE vs.vehicle_id = OLD.vehicle_id;
+    END IF;
+END$$
+
+-- =========================================================
+-- Trigger 14:
+-- Contador de issues abiertos (OPEN / IN_PROGRESS) por vehículo
+-- Cubre sp_open_issue, sp_close_issue y los UPDATE directos de status
+-- =========================================================
+DROP TRIGGER IF EXISTS trg_issues_vehicle_status_after_insert$$
+CREATE TRIGGER trg_issues_vehicle_status_after_insert
+AFTER INSERT ON issues
+FOR EACH ROW
+BEGIN
+    IF NEW.vehicle_id IS NOT NULL AND NEW.status IN ('OPEN', 'IN_PROGRESS') THEN
+        UPDATE vehicle_status
+        SET open_issues_count = open_issues_count + 1
+        WHERE vehicle_id = NEW.vehicle_id;
+    END IF;
+END$$
+
+DROP TRIGGER IF EXISTS trg_issues_vehicle_status_after_update$$
+CREATE TRIGGER trg_issues_vehicle_status_after_update
+AFTER UPDATE ON issues
+FOR EACH ROW
+BEGIN
+    DECLARE v_was_open TINYINT(1) DEFAULT (OLD.vehicle_id IS NOT NULL AND OLD.status IN ('OPEN', 'IN_PROGRESS'));
+    DECLARE v_is_open  TINYINT(1) DEFAULT (NEW.vehicle_id IS NOT NULL AND NEW.status IN ('OPEN', 'IN_PROGRESS'));
+
+    IF v_was_open AND NOT (v_is_open AND NEW.vehicle_id = OLD.vehicle_id) THEN
+        UPDATE vehicle_status
+        SET open_issues_count = GREATEST(open_issues_count, 1) - 1
+        WHERE vehicle_id = OLD.vehicle_id;
+    END IF;
+
+    IF v_is_open AND NOT (v_was_open AND NEW.vehicle_id = OLD.vehicle_id) THEN
+        UPDATE vehicle_status
+        SET open_issues_count = open_issues_count + 1
+        WHERE vehicle_id = NEW.vehicle_id;
+    END IF;
+END$$
+
+DROP TRIGGER IF EXISTS trg_issues_vehicle_status_after_delete$$
+CREATE TRIGGER trg_issues_vehicle_status_after_delete
+AFTER DELETE ON issues
+FOR EACH ROW
+BEGIN
+    IF OLD.vehicle_id IS NOT NULL AND OLD.status IN ('OPEN', 'IN_PROGRESS') THEN
+        UPDATE vehicle_status
+        SET open_issues_count = GREATEST(open_issues_count, 1) - 1
+        WHERE vehicle_id = OLD.vehicle_id;
+    END IF;
+END$$
+
+DELIMITER ;
+
+-- Las vistas mantienen sus columnas pero leen vehicle_status
+CREATE OR REPLACE VIEW v_vehicle_last_alert AS
+SELECT
+    v.vehicle_id,
+    v.plate AS vehicle_plate,
+    vs.last_alert_id          AS alert_id,
+    vs.last_alert_type        AS alert_type,
+    vs.last_alert_severity    AS severity,
+    vs.last_alert_message     AS message,
+    vs.last_alert_detected_at AS detected_at
+FROM vehicles v
+LEFT JOIN vehicle_status vs ON vs.vehicle_id = v.vehicle_id;
+
+CREATE OR REPLACE VIEW v_vehicle_health AS
+SELECT
+    v.vehicle_id,
+    v.plate,
+    v.brand,
+    v.model,
+    v.status AS vehicle_status,
+    d.device_id,
+    d.status AS device_status,
+    d.last_seen_at,
+    vs.last_alert_id,
+    vs.last_alert_type,
+    vs.last_alert_severity,
+    vs.last_alert_detected_at,
+    COALESCE(vs.open_issues_count, 0) AS open_issues_count
+FROM vehicles v
+LEFT JOIN devices d ON d.vehicle_id = v.vehicle_id
+LEFT JOIN vehicle_status vs ON vs.vehicle_id = v.vehicle_id;
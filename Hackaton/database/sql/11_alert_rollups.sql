@@ -0,0 +1,218 @@
+-- Rollups de alertas por hora y por día (reportes / gráficos de tendencia)
+-- Conteos por driver, vehículo, tipo y severidad en buckets fijos, así los
+-- reportes leen O(buckets) filas en vez de filtrar y agregar la tabla alerts.
+-- Se llenan de forma incremental con sp_rollup_alerts (job del backend):
+-- una marca (alert_rollup_watermark.last_alert_id) indica hasta qué alerta
+-- ya se agregó, así nunca se vuelve a recorrer el historial.
+-- Los alert_id se asignan al insertar, no al hacer commit: una alerta con id
+-- menor que la marca puede aparecer después. Por eso las últimas
+-- p_rescan_ids alertas detrás de la marca se vuelven a revisar en cada
+-- corrida; las ya contadas quedan en alert_rollup_recent y settled_alert_id
+-- marca hasta dónde el conteo es definitivo.
+-- Ejecuta este script después de 10_vehicle_status.sql. No hace backfill:
+-- el job procesa las alertas existentes por lotes desde alert_id = 0.
+
+USE AutoAwakeAI;
+
+CREATE TABLE IF NOT EXISTS alert_rollup_hourly (
+    bucket_start DATETIME        NOT NULL,  -- inicio de la hora
+    driver_id    BIGINT UNSIGNED NOT NULL,
+    vehicle_id   BIGINT UNSIGNED NOT NULL,
+    alert_type   VARCHAR(50)     NOT NULL,
+    severity     ENUM('LOW', 'MEDIUM', 'HIGH', 'CRITICAL') NOT NULL,
+    alert_count  INT UNSIGNED    NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_start, driver_id, vehicle_id, alert_type, severity),
+    KEY idx_rollup_hourly_driver (driver_id, bucket_start),
+    KEY idx_rollup_hourly_vehicle (vehicle_id, bucket_start)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4;  -- misma collation que alerts (default de la base)
+
+CREATE TABLE IF NOT EXISTS alert_rollup_daily (
+    bucket_date  DATE            NOT NULL,
+    driver_id    BIGINT UNSIGNED NOT NULL,
+    vehicle_id   BIGINT UNSIGNED NOT NULL,
+    alert_type   VARCHAR(50)     NOT NULL,
+    severity     ENUM('LOW', 'MEDIUM', 'HIGH', 'CRITICAL') NOT NULL,
+    alert_count  INT UNSIGNED    NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_date, driver_id, vehicle_id, alert_type, severity),
+    KEY idx_rollup_daily_driver (driver_id, bucket_date),
+    KEY idx_rollup_daily_vehicle (vehicle_id, bucket_date)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4;  -- misma collation que alerts (default de la base)
+
+CREATE TABLE IF NOT EXISTS alert_rollup_watermark (
+    name          VARCHAR(50)     NOT NULL,
+    last_alert_id BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    settled_alert_id BIGINT UNSIGNED NOT NULL DEFAULT 0,  -- ids <= ya no se re-escanean
+    updated_at    TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP
+                                           ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (name)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4;  -- misma collation que alerts (default de la base)
+
+-- Alertas ya agregadas entre settled_alert_id y last_alert_id
+CREATE TABLE IF NOT EXISTS alert_rollup_recent (
+    alert_id BIGINT UNSIGNED NOT NULL,
+    PRIMARY KEY (alert_id)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4;
+
+INSERT IGNORE INTO alert_rollup_watermark (name, last_alert_id) VALUES ('alerts', 0);
+
+DELIMITER $$
+
+-- =========================================================
+-- SP: Agregar el siguiente lote de alertas en los rollups
+--   - Toma la marca con FOR UPDATE: si hay varios workers,
+--     sólo uno agrega a la vez.
+--   - Sólo avanza sobre alertas con más de p_lag_seconds de
+--     antigüedad, así casi todos los INSERT en vuelo ya hicieron
+--     commit cuando la marca los pasa.
+--   - Los que igual quedan detrás (commit tardío) se agregan en
+--     una corrida posterior: se re-escanean las p_rescan_ids
+--     alertas anteriores a la marca que no estén en
+--     alert_rollup_recent. Más atrás que eso se da por cerrado.
+--   - Devuelve from_alert_id / last_alert_id; si son iguales
+--     no había nada nuevo.
+-- =========================================================
+DROP PROCEDURE IF EXISTS sp_rollup_alerts$$
+CREATE PROCEDURE sp_rollup_alerts (
+    IN p_batch_size  INT,
+    IN p_lag_seconds INT,
+    IN p_rescan_ids  INT
+)
+BEGIN
+    DECLARE v_from    BIGINT UNSIGNED;
+    DECLARE v_to      BIGINT UNSIGNED;
+    DECLARE v_settled BIGINT UNSIGNED;
+    DECLARE v_rescan  BIGINT UNSIGNED;
+    DECLARE v_last    BIGINT UNSIGNED;
+
+    CREATE TEMPORARY TABLE IF NOT EXISTS tmp_rollup_ids (
+        alert_id BIGINT UNSIGNED NOT NULL PRIMARY KEY
+    ) ENGINE = MEMORY;
+    DELETE FROM tmp_rollup_ids;
+
+    START TRANSACTION;
+
+    SELECT last_alert_id, settled_alert_id INTO v_from, v_settled
+    FROM alert_rollup_watermark
+    WHERE name = 'alerts'
+    FOR UPDATE;
+
+    -- Ventana de re-escaneo: nunca más de p_rescan_ids detrás de la marca
+    SET v_rescan = GREATEST(v_settled, CAST(v_from AS SIGNED) - p_rescan_ids);
+
+    -- Commits tardíos: alertas detrás de la marca que todavía no se contaron
+    INSERT INTO tmp_rollup_ids (alert_id)
+    SELECT a.alert_id
+    FROM alerts a
+    WHERE a.alert_id > v_rescan AND a.alert_id <= v_from
+      AND NOT EXISTS (
+          SELECT 1 FROM alert_rollup_recent r WHERE r.alert_id = a.alert_id
+      );
+
+    -- Lote por PK (alert_id > marca), no por rango de ids: tolera huecos
+    SELECT MAX(b.alert_id) INTO v_to
+    FROM (
+        SELECT alert_id, detected_at
+        FROM alerts
+        WHERE alert_id > v_from
+        ORDER BY alert_id
+        LIMIT p_batch_size
+    ) b
+    WHERE b.detected_at < NOW() - INTERVAL p_lag_seconds SECOND;
+
+    IF v_to IS NOT NULL THEN
+        INSERT INTO tmp_rollup_ids (alert_id)
+        SELECT alert_id
+        FROM alerts
+        WHERE alert_id > v_from AND alert_id <= v_to;
+    END IF;
+
+    SET v_last = COALESCE(v_to, v_from);
+
+    IF EXISTS (SELECT 1 FROM tmp_rollup_ids) THEN
+        INSERT INTO alert_rollup_hourly (
+            bucket_start, driver_id, vehicle_id, alert_type, severity, alert_count
+        )
+        SELECT
+            TIMESTAMP(DATE(detected_at), MAKETIME(HOUR(detected_at), 0, 0)),
+            driver_id,
+            vehicle_id,
+            alert_type,
+            severity,
+            COUNT(*)
+        FROM alerts a
+        JOIN tmp_rollup_ids t ON t.alert_id = a.alert_id
+        GROUP BY 1, 2, 3, 4, 5
+        ON DUPLICATE KEY UPDATE alert_count = alert_count + VALUES(alert_count);
+
+        INSERT INTO alert_rollup_daily (
+            bucket_date, driver_id, vehicle_id, alert_type, severity, alert_count
+        )
+        SELECT
+            DATE(detected_at),
+            driver_id,
+            vehicle_id,
+            alert_type,
+            severity,
+            COUNT(*)
+        FROM alerts a
+        JOIN tmp_rollup_ids t ON t.alert_id = a.alert_id
+        GROUP BY 1, 2, 3, 4, 5
+        ON DUPLICATE KEY UPDATE alert_count = alert_count + VALUES(alert_count);
+
+        INSERT INTO alert_rollup_recent (alert_id)
+        SELECT alert_id FROM tmp_rollup_ids;
+    END IF;
+
+    -- Lo que sale de la ventana ya no se re-escanea
+    SET v_settled = GREATEST(v_settled, CAST(v_last AS SIGNED) - p_rescan_ids);
+    DELETE FROM alert_rollup_recent WHERE alert_id <= v_settled;
+
+    UPDATE alert_rollup_watermark
+    SET last_alert_id = v_last,
+        settled_alert_id = v_settled
+    WHERE name = 'alerts';
+
+    COMMIT;
+
+    DELETE FROM tmp_rollup_ids;
+
+    SELECT v_from AS from_alert_id, v_last AS last_alert_id;
+END$$
+
+-- =========================================================
+-- Trigger 15:
+-- Descontar de los rollups una alerta borrada que ya estaba
+-- agregada: hasta settled_alert_id todas, dentro de la
+-- ventana de re-escaneo sólo las de alert_rollup_recent
+-- =========================================================
+DROP TRIGGER IF EXISTS trg_alerts_rollup_after_delete$$
+CREATE TRIGGER trg_alerts_rollup_after_delete
+AFTER DELETE ON alerts
+FOR EACH ROW
+BEGIN
+    IF OLD.alert_id <= (
+        SELECT settled_alert_id FROM alert_rollup_watermark WHERE name = 'alerts'
+    ) OR EXISTS (
+        SELECT 1 FROM alert_rollup_recent WHERE alert_id = OLD.alert_id
+    ) THEN
+        DELETE FROM alert_rollup_recent WHERE alert_id = OLD.alert_id;
+
+        UPDATE alert_rollup_hourly
+        SET alert_count = GREATEST(alert_count, 1) - 1
+        WHERE bucket_start = TIMESTAMP(DATE(OLD.detected_at), MAKETIME(HOUR(OLD.detected_at), 0, 0))
+          AND driver_id = OLD.driver_id
+          AND vehicle_id = OLD.vehicle_id
+          AND alert_type = OLD.alert_type
+          AND severity = OLD.severity;
+
+        UPDATE alert_rollup_daily
+        SET alert_count = GREATEST(alert_count, 1) - 1
+        WHERE bucket_date = DATE(OLD.detected_at)
+          AND driver_id = OLD.driver_id
+          AND vehicle_id = OLD.vehicle_id
+          AND alert_type = OLD.alert_type
+          AND severity = OLD.severity;
+    END IF;
+END$$
+
+DELIMITER ;
@@ -0,0 +1,92 @@
+-- Particionado mensual de alerts por detected_at
+-- alerts crece con cada evento de cada vehículo. Particionada por mes:
+--   * las consultas con rango de fechas (GET /alerts/?start_date=, dashboard,
+--     rollups, ventanas recientes) sólo leen las particiones del rango;
+--   * borrar/archivar un mes es un DROP/EXCHANGE PARTITION instantáneo en vez
+--     de un DELETE fila por fila.
+-- El backend (alert_partition_service) crea las particiones futuras y
+-- archiva las que superan ALERTS_RETENTION_MONTHS.
+--
+-- Restricciones de MySQL para tablas particionadas:
+--   * toda clave única debe incluir la columna de partición:
+--     la PK pasa a ser (alert_id, detected_at);
+--   * InnoDB no admite FOREIGN KEYs en tablas particionadas: se eliminan
+--     fk_alerts_vehicle / fk_alerts_driver / fk_alerts_trip. sp_log_alert
+--     ya valida el viaje y resuelve vehicle/driver desde trips; borrar un
+--     viaje ya no borra sus alertas en cascada (el backend no borra viajes).
+-- Los DROP/EXCHANGE PARTITION no disparan triggers: los contadores de trips,
+-- vehicle_status y los rollups conservan las alertas archivadas.
+--
+-- Ejecuta este script después de 11_alert_rollups.sql. Es re-ejecutable:
+-- si alerts ya está particionada no cambia nada.
+
+USE AutoAwakeAI;
+
+DELIMITER $$
+
+-- =========================================================
+-- SP: Particionar alerts por mes (una vez)
+--   - Quita las FKs y cambia la PK si todavía existen.
+--   - Crea una partición por mes desde la alerta más antigua
+--     hasta p_months_ahead meses adelante, más p_future
+--     (MAXVALUE) para fechas fuera de rango.
+-- =========================================================
+DROP PROCEDURE IF EXISTS sp_alerts_partition_init$$
+CREATE PROCEDURE sp_alerts_partition_init (
+    IN p_months_ahead INT
+)
+BEGIN
+    DECLARE v_month DATE;
+    DECLARE v_last  DATE;
+    DECLARE v_parts TEXT DEFAULT '';
+
+    IF NOT EXISTS (
+        SELECT 1
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = 'alerts'
+          AND PARTITION_NAME IS NOT NULL
+    ) THEN
+        IF EXISTS (
+            SELECT 1
+            FROM information_schema.TABLE_CONSTRAINTS
+            WHERE CONSTRAINT_SCHEMA = DATABASE()
+              AND TABLE_NAME = 'alerts'
+              AND CONSTRAINT_TYPE = 'FOREIGN KEY'
+        ) THEN
+            ALTER TABLE alerts
+                DROP FOREIGN KEY fk_alerts_vehicle,
+                DROP FOREIGN KEY fk_alerts_driver,
+                DROP FOREIGN KEY fk_alerts_trip;
+        END IF;
+
+        ALTER TABLE alerts
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (alert_id, detected_at);
+
+        SET v_month = DATE_FORMAT(COALESCE((SELECT MIN(detected_at) FROM alerts), NOW()), '%Y-%m-01');
+        SET v_last  = DATE_FORMAT(NOW() + INTERVAL p_months_ahead MONTH, '%Y-%m-01');
+
+        WHILE v_month <= v_last DO
+            SET v_parts = CONCAT(
+                v_parts,
+                'PARTITION p', DATE_FORMAT(v_month, '%Y%m'),
+                ' VALUES LESS THAN (''', v_month + INTERVAL 1 MONTH, '''), '
+            );
+            SET v_month = v_month + INTERVAL 1 MONTH;
+        END WHILE;
+
+        SET @alerts_partition_ddl = CONCAT(
+            'ALTER TABLE alerts PARTITION BY RANGE COLUMNS (detected_at) (',
+            v_parts,
+            'PARTITION p_future VALUES LESS THAN (MAXVALUE))'
+        );
+        PREPARE stmt FROM @alerts_partition_ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END$$
+
+DELIMITER ;
+
+CALL sp_alerts_partition_init(3);
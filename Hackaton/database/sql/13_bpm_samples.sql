@@ -0,0 +1,31 @@
+-- Ritmo cardíaco (BPM) por viaje
+-- El reloj publica muestras en autoawake/bpm; el backend las agrupa en
+-- lotes (bpm_ingest_service) y las guarda en dos tablas:
+--   * bpm_samples: muestras crudas, sólo por BPM_RAW_RETENTION_HOURS
+--     (el backend borra las viejas por lotes);
+--   * bpm_minute: min / suma / max / cantidad por minuto y viaje, de largo
+--     plazo. Guardar suma y cantidad (no el promedio) permite sumar minutos
+--     al agregar en resoluciones más gruesas.
+-- Las PK empiezan por trip_id: la serie de un viaje es un rango contiguo
+-- del índice clustered. Sin FKs para no pagar la validación por muestra.
+-- Ejecuta este script después de 12_alerts_partitioning.sql
+
+USE AutoAwakeAI;
+
+CREATE TABLE IF NOT EXISTS bpm_samples (
+    trip_id    BIGINT UNSIGNED   NOT NULL,
+    sampled_at DATETIME(3)       NOT NULL,
+    bpm        SMALLINT UNSIGNED NOT NULL,
+    PRIMARY KEY (trip_id, sampled_at),
+    KEY idx_bpm_samples_sampled (sampled_at)  -- purga de la ventana cruda
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4;
+
+CREATE TABLE IF NOT EXISTS bpm_minute (
+    trip_id      BIGINT UNSIGNED   NOT NULL,
+    minute_start DATETIME          NOT NULL,
+    samples      INT UNSIGNED      NOT NULL,
+    bpm_min      SMALLINT UNSIGNED NOT NULL,
+    bpm_max      SMALLINT UNSIGNED NOT NULL,
+    bpm_sum      INT UNSIGNED      NOT NULL,
+    PRIMARY KEY (trip_id, minute_start)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4;
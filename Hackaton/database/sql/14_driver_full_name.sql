@@ -0,0 +1,21 @@
+-- Búsqueda de conductores por nombre completo
+-- Las alertas TRIP pueden traer driver_name en lugar de driver_id. Antes se
+-- buscaba con CONCAT(first_name, ' ', last_name) = ?, que no puede usar
+-- ningún índice y recorría drivers completa en cada alerta.
+-- full_name_norm es una columna generada (VIRTUAL: no ocupa espacio en la
+-- fila, sólo en el índice) con el nombre normalizado: nombre y apellido sin
+-- espacios en los extremos, cada tramo de espacios (también los internos,
+-- p. ej. "Juan  Carlos") reducido a uno y en minúsculas. El backend
+-- normaliza el valor buscado igual (normalize_full_name: " ".join(split()))
+-- y filtra por igualdad sobre idx_drivers_full_name_norm.
+-- No es UNIQUE: puede haber homónimos (se toma el de menor driver_id).
+-- Ejecuta este script después de 01_schema.sql
+
+USE AutoAwakeAI;
+
+ALTER TABLE drivers
+    ADD COLUMN full_name_norm VARCHAR(201)
+        GENERATED ALWAYS AS (
+            LOWER(TRIM(REGEXP_REPLACE(CONCAT(first_name, ' ', last_name), '[[:space:]]+', ' ')))
+        ) VIRTUAL,
+    ADD INDEX idx_drivers_full_name_norm (full_name_norm);
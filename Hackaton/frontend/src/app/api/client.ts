@@ -1,6 +1,6 @@
 import axios, { AxiosHeaders } from "axios";
 
-const API_BASE_URL =
+export const API_BASE_URL =
   import.meta.env.VITE_API_BASE_URL || "http://localhost:3001";
 const TOKEN_KEY = "aa_session_token";
 
@@ -30,7 +30,6 @@ export const AdminAlertsPage = () => {
   const { data, isLoading, isError, refetch, isFetching } = useQuery({
     queryKey: ["alerts", "history", queryParams],
     queryFn: () => fetchAlertHistory(queryParams),
-    refetchInterval: 45_000,
   });
 
   return (
@@ -40,7 +39,7 @@ export const AdminAlertsPage = () => {
           <p className="text-xs uppercase tracking-[0.25em] text-cyan-200">Alertas</p>
           <h1 className="text-2xl font-bold text-white">Historial de alertas</h1>
           <p className="text-sm text-slate-300">
-            Consulta alertas con filtros por fecha. Refresco automático cada 45s.
+            Consulta alertas con filtros por fecha. Se actualiza en vivo con cada alerta nueva.
           </p>
         </div>
         <div className="flex flex-wrap gap-3 text-sm">
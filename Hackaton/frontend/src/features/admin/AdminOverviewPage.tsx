@@ -1,14 +1,7 @@
 import { useMemo } from "react";
-import { useQueries } from "@tanstack/react-query";
+import { useQuery } from "@tanstack/react-query";
 import { Link } from "react-router-dom";
-import {
-  fetchActiveAssignments,
-  fetchActiveTripStats,
-  fetchAlerts,
-  fetchDrivers,
-  fetchOpenIssues,
-  fetchVehicles,
-} from "./api/dashboard";
+import { fetchDashboardOverview } from "./api/dashboard";
 
 const SkeletonPulse = ({ className }: { className?: string }) => (
   <div className={`animate-pulse rounded-md bg-white/10 ${className ?? ""}`} />
@@ -36,31 +29,23 @@ const timeAgo = (iso?: string | null) => {
 };
 
 export const AdminOverviewPage = () => {
-  const [
-    { data: alerts, isLoading: loadingAlerts, isError: errorAlerts },
-    { data: vehicles, isLoading: loadingVehicles },
-    { data: drivers, isLoading: loadingDrivers },
-    { data: assignments, isLoading: loadingAssignments },
-    { data: issues, isLoading: loadingIssues },
-    { data: activeTripsStats, isLoading: loadingTrips },
-  ] = useQueries({
-    queries: [
-      { queryKey: ["alerts", "today"], queryFn: () => fetchAlerts(12), refetchInterval: 15_000 },
-      { queryKey: ["vehicles"], queryFn: fetchVehicles, refetchInterval: 60_000 },
-      { queryKey: ["drivers"], queryFn: fetchDrivers, refetchInterval: 60_000 },
-      { queryKey: ["assignments", "active"], queryFn: fetchActiveAssignments, refetchInterval: 30_000 },
-      { queryKey: ["issues", "open"], queryFn: () => fetchOpenIssues(6), refetchInterval: 45_000 },
-      { queryKey: ["trips", "active-stats"], queryFn: fetchActiveTripStats, refetchInterval: 20_000 },
-    ],
+  // Un solo request agregado; los eventos en vivo (SSE) lo invalidan al llegar alertas/viajes
+  const { data: overview, isLoading, isError } = useQuery({
+    queryKey: ["dashboard", "overview"],
+    queryFn: () => fetchDashboardOverview(12, 6),
+    refetchInterval: 60_000,
   });
+  const counters = overview?.counters;
+  const alerts = overview?.recent_alerts;
+  const issues = overview?.open_issues;
+  const activeTripsStats = overview?.active_trips;
 
   const kpis = useMemo(() => {
-    const alertsTotal = alerts?.length || 0;
-    const critical = alerts?.filter((a) => ["HIGH", "CRITICAL"].includes(a.severity.toUpperCase()))
-      .length || 0;
-    const vehiclesActive = vehicles?.filter((v) => v.status !== "INACTIVE").length || 0;
-    const driversActive = drivers?.filter((d) => d.status === "ACTIVE").length || 0;
-    const onDuty = assignments?.length || 0;
+    const alertsTotal = counters?.alerts_today ?? 0;
+    const critical = counters?.critical_alerts_today ?? 0;
+    const vehiclesActive = counters?.vehicles_operational ?? 0;
+    const driversActive = counters?.drivers_active ?? 0;
+    const onDuty = counters?.drivers_on_duty ?? 0;
     const activeTrips = activeTripsStats?.total_active_trips || 0;
     return [
       {
@@ -84,14 +69,12 @@ export const AdminOverviewPage = () => {
       {
         label: "Vehículos operativos",
         value: vehiclesActive.toString(),
-        trend: `${vehicles?.length ?? 0} en flota`,
+        trend: `${counters?.vehicles_total ?? 0} en flota`,
         tone: "up",
       },
     ];
-  }, [activeTripsStats, alerts, assignments, drivers, vehicles]);
+  }, [activeTripsStats, counters]);
 
-  const loadingKpis =
-    loadingAlerts || loadingVehicles || loadingDrivers || loadingAssignments || loadingTrips;
   const lastAlertTime = alerts?.[0]?.detected_at;
   return (
     <div className="space-y-8">
@@ -120,7 +103,7 @@ export const AdminOverviewPage = () => {
       </header>
 
       <section className="grid gap-4 sm:grid-cols-2 lg:grid-cols-4">
-        {loadingKpis
+        {isLoading
           ? Array.from({ length: 4 }).map((_, idx) => (
               <div
                 key={`kpi-skeleton-${idx}`}
@@ -164,7 +147,7 @@ export const AdminOverviewPage = () => {
               </p>
             </div>
             <span className="rounded-full bg-emerald-400/15 px-3 py-1 text-xs font-semibold text-emerald-200">
-              {loadingAlerts ? "Cargando..." : "En vivo"}
+              {isLoading ? "Cargando..." : "En vivo"}
             </span>
           </div>
 
@@ -178,7 +161,7 @@ export const AdminOverviewPage = () => {
               <span>Hace</span>
             </div>
             <div className="divide-y divide-white/5">
-              {loadingAlerts &&
+              {isLoading &&
                 Array.from({ length: 4 }).map((_, idx) => (
                   <div
                     key={`alerts-skeleton-${idx}`}
@@ -192,7 +175,7 @@ export const AdminOverviewPage = () => {
                     <SkeletonPulse className="h-4 w-10" />
                   </div>
                 ))}
-              {!loadingAlerts && alerts?.length === 0 && (
+              {!isLoading && alerts?.length === 0 && (
                 <div className="px-4 py-3 text-sm text-slate-400">
                   No hay alertas registradas hoy.
                 </div>
@@ -216,7 +199,7 @@ export const AdminOverviewPage = () => {
               ))}
             </div>
           </div>
-          {errorAlerts && (
+          {isError && (
             <p className="mt-3 text-xs text-red-200">
               No se pudieron cargar las alertas. Verifica el backend.
             </p>
@@ -228,18 +211,17 @@ export const AdminOverviewPage = () => {
             <p className="text-xs uppercase tracking-[0.2em] text-white">Estado</p>
             <h3 className="text-lg font-semibold text-white">Checklist rápido</h3>
             <ul className="mt-3 space-y-2 text-sm text-slate-200">
-              <li>• Conductores en turno: {assignments?.length ?? 0}</li>
+              <li>• Conductores en turno: {counters?.drivers_on_duty ?? 0}</li>
               <li>• Viajes activos: {activeTripsStats?.total_active_trips ?? 0}</li>
-              <li>• Alertas críticas hoy:{" "}
-                {alerts?.filter((a) => ["HIGH", "CRITICAL"].includes(a.severity.toUpperCase())).length ?? 0}
-              </li>
+              <li>• Alertas críticas hoy: {counters?.critical_alerts_today ?? 0}</li>
+              <li>• Incidencias abiertas: {counters?.open_issues ?? 0}</li>
             </ul>
           </div>
 
           <div className="rounded-3xl border border-white/10 bg-white/5 p-5 shadow-lg shadow-slate-900/40">
             <p className="text-xs uppercase tracking-[0.2em] text-slate-400">Incidencias abiertas</p>
             <div className="mt-3 space-y-3">
-              {loadingIssues &&
+              {isLoading &&
                 Array.from({ length: 3 }).map((_, idx) => (
                   <div
                     key={`issue-skeleton-${idx}`}
@@ -253,7 +235,7 @@ export const AdminOverviewPage = () => {
                     <SkeletonPulse className="mt-2 h-3 w-2/3" />
                   </div>
                 ))}
-              {!loadingIssues && (issues?.length ?? 0) === 0 && (
+              {!isLoading && (issues?.length ?? 0) === 0 && (
                 <p className="text-sm text-slate-400">No hay incidencias abiertas.</p>
               )}
               {issues?.map((issue) => (
@@ -288,7 +270,7 @@ export const AdminOverviewPage = () => {
           </p>
         </div>
         <div className="mt-4 grid gap-3 sm:grid-cols-2 lg:grid-cols-3">
-          {loadingTrips &&
+          {isLoading &&
             Array.from({ length: 3 }).map((_, idx) => (
               <div
                 key={`trip-skeleton-${idx}`}
@@ -303,7 +285,7 @@ export const AdminOverviewPage = () => {
                 <SkeletonPulse className="mt-2 h-3 w-2/3" />
               </div>
             ))}
-          {!loadingTrips && (activeTripsStats?.active_trips.length ?? 0) === 0 && (
+          {!isLoading && (activeTripsStats?.active_trips.length ?? 0) === 0 && (
             <p className="text-sm text-slate-400">No hay viajes activos.</p>
           )}
           {activeTripsStats?.active_trips.map((trip) => (
@@ -27,7 +27,6 @@ export const AdminSignalsPage = () => {
   const { data: activeTrips } = useQuery({
     queryKey: ["trips", "active-stats", "signals"],
     queryFn: fetchActiveTripStats,
-    refetchInterval: 30_000,
   });
 
   const latestBpm = bpmSignals[0];
@@ -48,8 +47,8 @@ export const AdminSignalsPage = () => {
           <p className="text-xs uppercase tracking-[0.25em] text-cyan-200">Señales MQTT</p>
           <h1 className="text-3xl font-bold text-white">Alertas en vivo + BPM</h1>
           <p className="text-sm text-slate-300">
-            Suscripción directa al broker MQTT: toasts de alerta inmediatos y bitácora de BPM
-            por viaje (trip_id).
+            Eventos en vivo desde el backend (MQTT → SSE): toasts de alerta inmediatos y
+            bitácora de BPM por viaje (trip_id).
           </p>
         </div>
         <div className="flex flex-wrap gap-2 text-xs font-semibold">
@@ -59,10 +58,10 @@ export const AdminSignalsPage = () => {
             }`}
           >
             <span className={`h-2 w-2 rounded-full ${connected ? "bg-emerald-400" : "bg-amber-300"}`} />
-            {connected ? "Conectado al broker" : "Reconectando MQTT"}
+            {connected ? "Conectado al backend" : "Reconectando eventos"}
           </span>
           <span className="rounded-full border border-white/10 px-3 py-1 text-slate-200">
-            Topic: {import.meta.env.VITE_MQTT_TOPIC_ALERTS ?? "autoawake/bpm"}
+            Stream: /events/stream
           </span>
         </div>
       </header>
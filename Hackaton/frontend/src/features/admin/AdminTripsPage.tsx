@@ -12,7 +12,6 @@ export const AdminTripsPage = () => {
   const { data, isLoading, isError } = useQuery({
     queryKey: ["trips", "list"],
     queryFn: () => fetchTripsList(undefined, 60),
-    refetchInterval: 30_000,
   });
 
   return (
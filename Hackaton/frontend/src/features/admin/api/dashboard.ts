@@ -80,41 +80,31 @@ export type ActiveTripStats = {
   }>;
 };
 
-const formatDateParam = (date: Date) => date.toISOString().slice(0, 19).replace("T", " ");
-
-export const fetchAlerts = async (limit = 10) => {
-  const startOfToday = new Date();
-  startOfToday.setHours(0, 0, 0, 0);
-  const params = { limit, start_date: formatDateParam(startOfToday) };
-  const res = await apiClient.get<AlertItem[]>("/alerts", { params });
-  return res.data;
-};
-
-export const fetchVehicles = async () => {
-  const res = await apiClient.get<VehicleItem[]>("/vehicles");
-  return res.data;
-};
-
-export const fetchDrivers = async () => {
-  const res = await apiClient.get<DriverItem[]>("/drivers");
-  return res.data;
+export type DashboardOverview = {
+  generated_at: string;
+  counters: {
+    alerts_today: number;
+    critical_alerts_today: number;
+    vehicles_total: number;
+    vehicles_operational: number;
+    drivers_total: number;
+    drivers_active: number;
+    drivers_on_duty: number;
+    open_issues: number;
+  };
+  active_trips: ActiveTripStats;
+  recent_alerts: AlertItem[];
+  open_issues: IssueItem[];
 };
 
-export const fetchActiveAssignments = async () => {
-  const res = await apiClient.get<AssignmentItem[]>("/assignments", {
-    params: { active_only: true },
-  });
+export const fetchActiveTripStats = async () => {
+  const res = await apiClient.get<ActiveTripStats>("/trips/stats/active");
   return res.data;
 };
 
-export const fetchOpenIssues = async (limit = 10) => {
-  const res = await apiClient.get<IssueItem[]>("/issues", {
-    params: { status: "OPEN", limit },
+export const fetchDashboardOverview = async (alertsLimit = 12, issuesLimit = 6) => {
+  const res = await apiClient.get<DashboardOverview>("/dashboard/overview", {
+    params: { alerts_limit: alertsLimit, issues_limit: issuesLimit },
   });
   return res.data;
 };
-
-export const fetchActiveTripStats = async () => {
-  const res = await apiClient.get<ActiveTripStats>("/trips/stats/active");
-  return res.data;
-};
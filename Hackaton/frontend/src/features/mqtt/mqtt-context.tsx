@@ -1,15 +1,18 @@
 import type { PropsWithChildren } from "react";
+import type { QueryKey } from "@tanstack/react-query";
 import {
   createContext,
+  useCallback,
   useContext,
   useEffect,
   useMemo,
   useRef,
   useState,
 } from "react";
-import mqtt from "mqtt";
-import type { MqttClient } from "mqtt";
+import { useQueryClient } from "@tanstack/react-query";
 import toast from "react-hot-toast";
+import { API_BASE_URL } from "../../app/api/client";
+import { useAuth } from "../auth/auth-context";
 
 type AlertPayload = {
   trip_id?: number;
@@ -47,20 +50,14 @@ const defaultState: MqttState = {
 
 const MqttContext = createContext<MqttState>(defaultState);
 
-const broker = import.meta.env.VITE_MQTT_BROKER;
-const port = import.meta.env.VITE_MQTT_PORT || "8084"; // EMQX wss default
-const protocol = import.meta.env.VITE_MQTT_PROTOCOL || (port === "8084" ? "wss" : "ws");
-const path = import.meta.env.VITE_MQTT_PATH || "/mqtt";
-const mqttUrl =
-  import.meta.env.VITE_MQTT_URL ||
-  (broker ? `${protocol}://${broker}:${port}${path}` : "ws://localhost:9001");
-const topicAlerts = import.meta.env.VITE_MQTT_TOPIC_ALERTS || "autoawake/bpm";
-const reconnectMs = Number(import.meta.env.VITE_MQTT_RECONNECT_MS ?? 3000);
-const username = import.meta.env.VITE_MQTT_USER;
-const password = import.meta.env.VITE_MQTT_PASSWORD;
-const clientId =
-  import.meta.env.VITE_MQTT_CLIENT_ID ||
-  `autoawake-web-${Math.random().toString(16).slice(2, 8)}`;
+// Los eventos llegan del backend (SSE /events/stream), que mantiene la única
+// suscripción MQTT y reparte alertas, viajes y BPM a todos los dashboards.
+const eventsUrl = `${API_BASE_URL}/events/stream`;
+
+// Las invalidaciones se agrupan: una ráfaga de alertas produce un solo refetch por query
+const INVALIDATE_DELAY_MS = 1000;
+// Si el servidor rechaza el stream (401, 5xx) EventSource no reintenta: se reabre a mano
+const RECONNECT_DELAY_MS = 5000;
 
 const severityColor = (severity?: string) => {
   const level = (severity ?? "").toUpperCase();
@@ -102,83 +99,110 @@ const showAlertToast = (payload: AlertPayload) => {
 };
 
 export const MqttProvider = ({ children }: PropsWithChildren) => {
-  const clientRef = useRef<MqttClient | null>(null);
+  const queryClient = useQueryClient();
+  const { user } = useAuth();
+  const token = user.token;
+  const sourceRef = useRef<EventSource | null>(null);
+  const pendingKeys = useRef(new Map<string, QueryKey>());
+  const flushTimer = useRef<number | null>(null);
+  const [reconnects, setReconnects] = useState(0);
   const [connected, setConnected] = useState(false);
   const [lastAlert, setLastAlert] = useState<AlertPayload | null>(null);
   const [lastError, setLastError] = useState<string | null>(null);
   const [bpmSignals, setBpmSignals] = useState<BpmSignal[]>([]);
 
-  const options = useMemo(
-    () => ({
-      clientId,
-      protocolVersion: 5 as const,
-      username,
-      password,
-      clean: true,
-      reconnectPeriod: reconnectMs,
-      keepalive: 30,
-      connectTimeout: 5000,
-    }),
-    [clientId, password, reconnectMs, username],
+  const scheduleInvalidate = useCallback(
+    (...keys: QueryKey[]) => {
+      keys.forEach((key) => pendingKeys.current.set(JSON.stringify(key), key));
+      if (flushTimer.current !== null) return;
+      flushTimer.current = window.setTimeout(() => {
+        flushTimer.current = null;
+        const batch = [...pendingKeys.current.values()];
+        pendingKeys.current.clear();
+        batch.forEach((queryKey) => queryClient.invalidateQueries({ queryKey }));
+      }, INVALIDATE_DELAY_MS);
+    },
+    [queryClient],
+  );
+
+  useEffect(
+    () => () => {
+      if (flushTimer.current !== null) window.clearTimeout(flushTimer.current);
+    },
+    [],
   );
 
   useEffect(() => {
-    const client = mqtt.connect(mqttUrl, options);
-    clientRef.current = client;
+    // Sin sesión el backend responde 401: no se abre el stream hasta el login
+    if (!token) {
+      setConnected(false);
+      return;
+    }
+    const url = `${eventsUrl}?token=${encodeURIComponent(token)}`;
+    // EventSource reconecta solo y reenvía Last-Event-ID para recuperar lo perdido
+    const source = new EventSource(url);
+    sourceRef.current = source;
+    let retryTimer: number | null = null;
+
+    const parse = (event: MessageEvent): AlertPayload | null => {
+      try {
+        return JSON.parse(event.data);
+      } catch (err) {
+        setLastError(`Error parseando evento: ${String(err)}`);
+        return null;
+      }
+    };
 
-    client.on("connect", () => {
+    source.onopen = () => {
       setConnected(true);
       setLastError(null);
-      client.subscribe(topicAlerts, (err) => {
-        if (err) {
-          setLastError(`No se pudo suscribir a ${topicAlerts}`);
-        }
-      });
-    });
+    };
 
-    client.on("reconnect", () => {
+    source.onerror = () => {
       setConnected(false);
+      setLastError("Conexión de eventos interrumpida, reintentando...");
+      // Con una respuesta de error (p. ej. 401) el navegador cierra el stream para siempre
+      if (source.readyState === EventSource.CLOSED && retryTimer === null) {
+        retryTimer = window.setTimeout(() => setReconnects((n) => n + 1), RECONNECT_DELAY_MS);
+      }
+    };
+
+    source.addEventListener("alert", (event) => {
+      const parsed = parse(event as MessageEvent);
+      if (!parsed) return;
+      setLastAlert(parsed);
+      showAlertToast(parsed);
+      scheduleInvalidate(["alerts"], ["trips", "active-stats"], ["dashboard"]);
     });
 
-    client.on("error", (err) => {
-      setLastError(err?.message ?? "Error MQTT");
-      setConnected(false);
+    source.addEventListener("trip", () => {
+      scheduleInvalidate(["trips"], ["dashboard"]);
     });
 
-    client.on("close", () => {
-      setConnected(false);
+    source.addEventListener("bpm", (event) => {
+      const parsed = parse(event as MessageEvent);
+      if (!parsed || typeof parsed.bpm !== "number" || typeof parsed.trip_id !== "number") return;
+      const entry: BpmSignal = {
+        trip_id: parsed.trip_id,
+        bpm: parsed.bpm,
+        timestamp: parsed.timestamp,
+        receivedAt: Date.now(),
+        raw: parsed,
+      };
+      setBpmSignals((prev) => [entry, ...prev].slice(0, 20));
     });
 
-    client.on("message", (_, payload) => {
-      try {
-        const parsed: AlertPayload = JSON.parse(payload.toString());
-
-        if (typeof parsed.bpm === "number" && typeof parsed.trip_id === "number") {
-          const entry: BpmSignal = {
-            trip_id: parsed.trip_id,
-            bpm: parsed.bpm,
-            timestamp: parsed.timestamp,
-            receivedAt: Date.now(),
-            raw: parsed,
-          };
-          setBpmSignals((prev) => [entry, ...prev].slice(0, 20));
-        }
-
-        if (parsed.alert_type || parsed.message || parsed.severity) {
-          setLastAlert(parsed);
-          showAlertToast(parsed);
-        }
-      } catch (err) {
-        setLastError(`Error parseando payload MQTT: ${String(err)}`);
-      }
+    // El servidor reinició o el hueco ya no está en su buffer: refrescar todo
+    source.addEventListener("reset", () => {
+      queryClient.invalidateQueries();
     });
 
     return () => {
-      client.removeAllListeners();
-      client.end(true);
-      clientRef.current = null;
+      if (retryTimer !== null) window.clearTimeout(retryTimer);
+      source.close();
+      sourceRef.current = null;
     };
-  }, [options]);
+  }, [queryClient, scheduleInvalidate, token, reconnects]);
 
   const value = useMemo(
     () => ({
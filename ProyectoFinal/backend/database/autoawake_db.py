@@ -765,6 +765,25 @@ def get_active_trips(db: Database) -> List[Dict[str, Any]]:
     return db.select_from_view("v_active_trips")
 
 
+def get_dashboard_counters(db: Database) -> Dict[str, Any]:
+    """
+    Contadores del dashboard en una sola consulta: vehículos y conductores
+    activos, alertas de las últimas 24 horas y viajes en curso.
+    """
+    query = """
+        SELECT
+            (SELECT COUNT(*) FROM vehicles WHERE status = 'ACTIVE') AS total_vehicles,
+            (SELECT COUNT(*) FROM drivers WHERE status = 'ACTIVE') AS total_drivers,
+            (SELECT COUNT(*) FROM alerts
+              WHERE detected_at >= NOW() - INTERVAL 24 HOUR) AS alerts_24h,
+            (SELECT COUNT(*) FROM trips WHERE status = 'IN_PROGRESS') AS active_trips
+    """
+    row = db.fetch_one(query) or {}
+    return {key: int(row.get(key) or 0) for key in (
+        "total_vehicles", "total_drivers", "alerts_24h", "active_trips"
+    )}
+
+
 def get_vehicle_last_alert(
     db: Database,
     vehicle_id: Optional[int] = None,
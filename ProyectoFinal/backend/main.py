@@ -15,6 +15,7 @@ from routes.trips_router import router as trips_router
 from routes.alerts_router import router as alerts_router
 from routes.issues_router import router as issues_router
 from routes.devices_router import router as devices_router
+from routes.dashboard_router import router as dashboard_router
 
 # Cargar variables de entorno
 
@@ -67,3 +68,4 @@ app.include_router(trips_router)
 app.include_router(alerts_router)
 app.include_router(issues_router)
 app.include_router(devices_router)
+app.include_router(dashboard_router)
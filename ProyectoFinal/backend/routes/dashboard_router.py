@@ -0,0 +1,39 @@
+import os
+import threading
+import time
+from fastapi import APIRouter, Depends, HTTPException, status
+from database.autoawake_db import Database, get_dashboard_counters
+from utils.security import get_current_user
+from utils.db_instance import get_db_instance
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+# El dashboard se refresca seguido: los contadores se reutilizan unos segundos
+CACHE_SECONDS = float(os.getenv("DASHBOARD_CACHE_SECONDS", "5"))
+_cache = {"data": None, "expires": 0.0}
+_cache_lock = threading.Lock()
+
+@router.get("/overview")
+def get_overview(
+    current_user: dict = Depends(get_current_user),
+    db: Database = Depends(get_db_instance)
+):
+    """
+    Contadores del dashboard (vehículos y conductores activos, alertas de
+    las últimas 24 horas, viajes en curso) calculados en la base, en lugar
+    de descargar el listado completo de alertas y contarlas en el cliente.
+    """
+    with _cache_lock:
+        if _cache["data"] is not None and time.monotonic() < _cache["expires"]:
+            return _cache["data"]
+    try:
+        data = get_dashboard_counters(db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    with _cache_lock:
+        _cache["data"] = data
+        _cache["expires"] = time.monotonic() + CACHE_SECONDS
+    return data
@@ -12,38 +12,23 @@ const getAuthHeaders = () => {
 };
 
 export const dashboardService = {
-  // Get general dashboard statistics using existing endpoints
+  // Get general dashboard statistics (counters computed by the backend)
   getStats: async () => {
     try {
-      // Use existing endpoints to build statistics
-      const [vehicles, drivers] = await Promise.all([
-        vehicleService.getAll('ACTIVE'),
-        driverService.getAll('ACTIVE')
-      ]);
-
-      // Try to get alerts count (if endpoint exists)
-      let alertsCount = 0;
-      try {
-        const alertsResponse = await fetch(`${API_URL}/alerts/`, {
-          method: 'GET',
-          headers: getAuthHeaders()
-        });
-        if (alertsResponse.ok) {
-          const alerts = await alertsResponse.json();
-          // Filter last 24 hours
-          const yesterday = new Date();
-          yesterday.setHours(yesterday.getHours() - 24);
-          alertsCount = alerts.filter(a => new Date(a.detected_at) > yesterday).length;
-        }
-      } catch (err) {
-        console.log('Alerts endpoint not available or no alerts');
+      const response = await fetch(`${API_URL}/dashboard/overview`, {
+        method: 'GET',
+        headers: getAuthHeaders()
+      });
+      if (!response.ok) {
+        throw new Error(`Overview request failed (${response.status})`);
       }
+      const overview = await response.json();
 
       return {
-        total_vehicles: vehicles.length,
-        alerts_24h: alertsCount,
-        active_trips: 0, // Will need trips endpoint
-        total_drivers: drivers.length
+        total_vehicles: overview.total_vehicles,
+        alerts_24h: overview.alerts_24h,
+        active_trips: overview.active_trips,
+        total_drivers: overview.total_drivers
       };
     } catch (error) {
       console.error('Error in getStats:', error);